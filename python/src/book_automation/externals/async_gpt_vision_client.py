@@ -0,0 +1,84 @@
+import asyncio
+import math
+import os
+import random
+from typing import Optional
+
+from PIL import Image
+from dotenv import load_dotenv
+from openai import AsyncOpenAI, RateLimitError, APIConnectionError, InternalServerError
+
+from book_automation.externals.gpt_vision_client import GPTVisionClient
+from book_automation.externals.openai_rate_limiter import OpenAIRateLimiter
+
+
+class AsyncGPTVisionClient:
+    """
+    asyncio counterpart of GPTVisionClient. Requests are gated by an OpenAIRateLimiter fed
+    from the ``x-ratelimit-*`` headers of every response, so concurrency stays just under the
+    account limits instead of relying on blind exponential backoff after 429s.
+    """
+
+    def __init__(self,
+                 model: str = "gpt-4o-mini",
+                 rate_limiter: Optional[OpenAIRateLimiter] = None,
+                 max_attempts: int = 6,
+                 base_url: Optional[str] = None):
+        load_dotenv()
+
+        api_key = os.environ.get("OPENAI_API_KEY")
+        if not api_key:
+            raise ValueError("OpenAI API key not found. Set OPENAI_API_KEY environment variable.")
+
+        # Retries are handled here so every attempt goes through the rate limiter
+        self.client = AsyncOpenAI(api_key=api_key, base_url=base_url, max_retries=0)
+        self.model = model
+        self.rate_limiter = rate_limiter or OpenAIRateLimiter()
+        self.max_attempts = max_attempts
+
+    @staticmethod
+    def estimate_tokens(img: Image.Image, system_prompt: str) -> int:
+        """
+        Rough input-token cost of a high-detail image plus prompt, used to reserve budget
+        before the real usage is known.
+        """
+        width, height = img.size
+        scale = min(1.0, 2048 / max(width, height))
+        width, height = width * scale, height * scale
+        scale = min(1.0, 768 / min(width, height))
+        width, height = width * scale, height * scale
+        tiles = math.ceil(width / 512) * math.ceil(height / 512)
+        return 85 + 170 * tiles + len(system_prompt) // 4
+
+    async def invoke(self, img: Image.Image, system_prompt: str) -> str:
+        tokens = self.estimate_tokens(img, system_prompt)
+        payload = await asyncio.to_thread(GPTVisionClient.build_input, img, system_prompt)
+
+        for attempt in range(1, self.max_attempts + 1):
+            await self.rate_limiter.acquire(tokens)
+            # Every exit from the attempt, other errors and cancellation included, gives
+            # the slot and the reserved tokens back exactly once
+            headers = None
+            backoff = 0.0
+            try:
+                raw = await self.client.responses.with_raw_response.create(
+                    model=self.model,
+                    input=payload
+                )
+                headers = raw.headers
+                return raw.parse().output_text
+            except RateLimitError as e:
+                headers = e.response.headers
+                retry_after = self.rate_limiter.retry_after_seconds(headers)
+                self.rate_limiter.pause(retry_after if retry_after is not None else 2 ** attempt)
+                if attempt == self.max_attempts:
+                    raise
+            except (APIConnectionError, InternalServerError):
+                if attempt == self.max_attempts:
+                    raise
+                backoff = random.uniform(0, min(60, 2 ** attempt))
+            finally:
+                await self.rate_limiter.release(tokens, headers)
+
+            if backoff:
+                await asyncio.sleep(backoff)
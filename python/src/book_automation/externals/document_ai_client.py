@@ -2,22 +2,40 @@
 
 import os
 import io
+import re
+import tempfile
+from pathlib import Path
+from typing import List, Optional, Sequence, Union
+
 from dotenv import load_dotenv
 from PIL import Image
 
 from google.api_core.client_options import ClientOptions
+from google.cloud import storage
 from google.cloud.documentai_v1beta3 import DocumentProcessorServiceClient
 from google.cloud.documentai_v1beta3.types import (
     RawDocument,
     ProcessRequest,
     Document,
-    ProcessOptions
+    ProcessOptions,
+    BatchProcessRequest,
+    BatchProcessMetadata,
+    BatchDocumentsInputConfig,
+    DocumentOutputConfig,
+    GcsDocument,
+    GcsDocuments,
 )
 
+from book_automation.externals.document_ai_pages import chunked, images_to_pdf, map_pages, write_pdf
 from book_automation.processor.converter.pil_image_converter import PilImageConverter
 
 load_dotenv()
 
+# Page limit of an online process_document request for most processors
+MAX_PAGES_PER_REQUEST = 15
+# Pages per PDF uploaded for batch processing
+PAGES_PER_BATCH_DOCUMENT = 200
+
 
 def convert_image_to_pdf(image: Image.Image) -> bytes:
     pdf_bytes_io = io.BytesIO()
@@ -26,10 +44,15 @@ def convert_image_to_pdf(image: Image.Image) -> bytes:
 
 
 class DocumentAIClient:
-    def __init__(self):
+    def __init__(self,
+                 max_pages_per_request: int = MAX_PAGES_PER_REQUEST,
+                 gcs_bucket: Optional[str] = None):
         self.project_id = os.environ["GCP_PROJECT_ID"]
         self.location = os.environ["GCP_LOCATION"]
         self.processor_id = os.environ["GCP_PROCESSOR_ID"]
+        self.max_pages_per_request = max_pages_per_request
+        # Staging bucket for batch_process_images
+        self.gcs_bucket = gcs_bucket or os.environ.get("GCP_DOCUMENTAI_BUCKET")
 
         api_endpoint = f"{self.location}-documentai.googleapis.com"
         self.client = DocumentProcessorServiceClient(
@@ -40,18 +63,110 @@ class DocumentAIClient:
             f"/processors/{self.processor_id}"
         )
 
-    def process_image(self, image: Image.Image) -> Document:
-        pdf_bytes = convert_image_to_pdf(image)
-        raw_document = RawDocument(content=pdf_bytes, mime_type="application/pdf")
-
+    @staticmethod
+    def _process_options() -> ProcessOptions:
         layout_cfg = ProcessOptions.LayoutConfig(
             return_bounding_boxes=True
         )
-        opts = ProcessOptions(layout_config=layout_cfg)
+        return ProcessOptions(layout_config=layout_cfg)
+
+    def _process_pdf(self, pdf_bytes: bytes) -> Document:
+        raw_document = RawDocument(content=pdf_bytes, mime_type="application/pdf")
         request = ProcessRequest(
             name=self.name,
             raw_document=raw_document,
-            process_options=opts,
+            process_options=self._process_options(),
         )
         result = self.client.process_document(request=request)
         return result.document
+
+    def process_image(self, image: Image.Image) -> Document:
+        return self._process_pdf(convert_image_to_pdf(image))
+
+    def process_images(self, images: Sequence[Image.Image]) -> List[Document.Page]:
+        """
+        Process many images with as few requests as possible: up to
+        ``max_pages_per_request`` images are packed into one multi-page PDF per request.
+
+        Returns:
+            One Document page per image, in the order of ``images``
+        """
+        pages: List[Document.Page] = []
+        for chunk in chunked(list(images), self.max_pages_per_request):
+            document = self._process_pdf(images_to_pdf(chunk))
+            pages.extend(map_pages(document.pages, len(chunk)))
+        return pages
+
+    def batch_process_images(self,
+                             image_paths: Sequence[Union[str, Path]],
+                             gcs_prefix: str,
+                             pages_per_document: int = PAGES_PER_BATCH_DOCUMENT,
+                             timeout: float = 3600) -> List[Document.Page]:
+        """
+        Process a whole book through one asynchronous batch request. The pages are
+        packed into PDFs of ``pages_per_document`` pages, uploaded under
+        ``gs://<gcs_bucket>/<gcs_prefix>/input/``, processed into
+        ``<gcs_prefix>/output/`` and read back.
+
+        Returns:
+            One Document page per image, in the order of ``image_paths``
+
+        Raises:
+            ValueError: if no staging bucket is configured
+            RuntimeError: if the batch operation does not succeed
+        """
+        if not self.gcs_bucket:
+            raise ValueError("Batch processing needs a GCS bucket. Set GCP_DOCUMENTAI_BUCKET.")
+        storage_client = storage.Client()
+        bucket = storage_client.bucket(self.gcs_bucket)
+        gcs_prefix = gcs_prefix.strip("/")
+
+        parts = chunked([Path(p) for p in image_paths], pages_per_document)
+        input_uris = []
+        for index, part in enumerate(parts):
+            blob_name = f"{gcs_prefix}/input/part_{index:04d}.pdf"
+            # Streamed to disk a page at a time, so no more than one decoded page is in memory
+            with tempfile.TemporaryDirectory() as tmp:
+                pdf_path = Path(tmp) / "part.pdf"
+                write_pdf(part, pdf_path)
+                bucket.blob(blob_name).upload_from_filename(str(pdf_path), content_type="application/pdf")
+            input_uris.append(f"gs://{self.gcs_bucket}/{blob_name}")
+
+        request = BatchProcessRequest(
+            name=self.name,
+            input_documents=BatchDocumentsInputConfig(
+                gcs_documents=GcsDocuments(documents=[
+                    GcsDocument(gcs_uri=uri, mime_type="application/pdf") for uri in input_uris
+                ])
+            ),
+            document_output_config=DocumentOutputConfig(
+                gcs_output_config=DocumentOutputConfig.GcsOutputConfig(
+                    gcs_uri=f"gs://{self.gcs_bucket}/{gcs_prefix}/output/"
+                )
+            ),
+            process_options=self._process_options(),
+        )
+        operation = self.client.batch_process_documents(request=request)
+        print(f"⏳ Document AI batch {operation.operation.name}: {len(image_paths)} pages in {len(parts)} documents")
+        operation.result(timeout=timeout)
+
+        metadata = BatchProcessMetadata(operation.metadata)
+        if metadata.state != BatchProcessMetadata.State.SUCCEEDED:
+            raise RuntimeError(f"Document AI batch failed: {metadata.state_message}")
+
+        pages: List[Document.Page] = []
+        destinations = {status.input_gcs_source: status.output_gcs_destination
+                        for status in metadata.individual_process_statuses}
+        for uri, part in zip(input_uris, parts):
+            output_bucket, output_prefix = re.match(r"gs://(.*?)/(.*)", destinations[uri]).groups()
+            # Destinations end in the input's index; without the slash .../1 would also
+            # match the outputs of inputs 10, 11, ...
+            output_prefix = output_prefix.rstrip("/") + "/"
+            # Large documents come back as several JSON shards, each with its own pages
+            part_pages = []
+            for blob in storage_client.list_blobs(output_bucket, prefix=output_prefix):
+                if blob.name.endswith(".json"):
+                    shard = Document.from_json(blob.download_as_bytes(), ignore_unknown_fields=True)
+                    part_pages.extend(shard.pages)
+            pages.extend(map_pages(part_pages, len(part)))
+        return pages
@@ -0,0 +1,88 @@
+import io
+import tempfile
+from pathlib import Path
+from typing import Iterable, List, Sequence, TypeVar, Union
+
+from PIL import Image, PdfParser
+
+T = TypeVar("T")
+
+# Modes the PDF writer takes as they are; anything else goes through RGB
+PDF_MODES = {"1", "L", "RGB", "CMYK"}
+
+
+def chunked(items: Sequence[T], size: int) -> List[Sequence[T]]:
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+def _single_page_pdf(page: Union[Image.Image, Path]) -> bytes:
+    img = Image.open(page) if isinstance(page, (str, Path)) else page
+    try:
+        out = io.BytesIO()
+        (img if img.mode in PDF_MODES else img.convert("RGB")).save(out, format="PDF")
+        return out.getvalue()
+    finally:
+        # Only files opened here; images passed in belong to the caller
+        if img is not page:
+            img.close()
+
+
+def write_pdf(pages: Iterable[Union[Image.Image, Path]], path: Union[str, Path]):
+    """
+    Write images (or image files) as the pages of one PDF at ``path``, in order.
+
+    Each page is encoded by Pillow as a PDF of its own, and its image and content streams
+    are copied into the output before the next page is decoded, so memory stays at about
+    one page however long the document is. Pillow's ``save_all`` keeps every page it has
+    written until the end.
+    """
+    pdf = PdfParser.PdfParser(filename=str(path), mode="w+b")
+    try:
+        pdf.start_writing()
+        pdf.write_header()
+        pdf.pages_ref = pdf.next_object_id(0)
+        for page in pages:
+            single = PdfParser.PdfParser(buf=_single_page_pdf(page))
+            source = single.read_indirect(single.pages[0])
+            resources = source[b"Resources"]
+            image = single.read_indirect(resources[b"XObject"][b"image"])
+            contents = single.read_indirect(source[b"Contents"])
+
+            image_ref = pdf.write_obj(None, stream=image.buf, **{
+                key.name_as_str(): value for key, value in image.dictionary.items() if key != b"Length"})
+            contents_ref = pdf.write_obj(None, stream=contents.buf)
+            pdf.pages.append(pdf.write_page(
+                None,
+                Resources=PdfParser.PdfDict(ProcSet=resources[b"ProcSet"],
+                                            XObject=PdfParser.PdfDict(image=image_ref)),
+                MediaBox=source[b"MediaBox"],
+                Contents=contents_ref,
+            ))
+
+        root_ref = pdf.write_obj(None, Type=PdfParser.PdfName(b"Catalog"), Pages=pdf.pages_ref)
+        pdf.write_obj(pdf.pages_ref, Type=PdfParser.PdfName(b"Pages"), Count=len(pdf.pages), Kids=pdf.pages)
+        pdf.write_xref_and_trailer(root_ref)
+    finally:
+        pdf.close()
+
+
+def images_to_pdf(images: Iterable[Union[Image.Image, Path]]) -> bytes:
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "pages.pdf"
+        write_pdf(images, path)
+        return path.read_bytes()
+
+
+def map_pages(pages, count: int) -> list:
+    """
+    Order Document AI pages (1-based ``page_number``) by the source image they came
+    from, for a PDF made of ``count`` images.
+
+    Raises:
+        ValueError: if a source image has no page in the response
+    """
+    by_number = {page.page_number: page for page in pages}
+    missing = [n for n in range(1, count + 1) if n not in by_number]
+    if missing:
+        raise ValueError(f"Document AI returned no page for PDF page(s) {missing}")
+    return [by_number[n] for n in range(1, count + 1)]
@@ -1,6 +1,7 @@
 import base64
 import io
 import os
+from typing import List, Dict
 
 from PIL import Image
 from dotenv import load_dotenv
@@ -16,24 +17,31 @@ class GPTVisionClient:
         api_key = os.environ.get("OPENAI_API_KEY")
         if not api_key:
             raise ValueError("OpenAI API key not found. Set OPENAI_API_KEY environment variable.")
-        
+
         self.client = OpenAI(api_key=api_key)
         self.model = model
 
-    @retry(wait=wait_random_exponential(min=1, max=60), stop=stop_after_attempt(6))
-    def invoke(self, img: Image.Image, system_prompt: str) -> str:
+    @staticmethod
+    def build_input(img: Image.Image, system_prompt: str) -> List[Dict]:
+        """
+        Build the Responses API ``input`` payload for a single image and prompt.
+        """
         buffer = io.BytesIO()
         img.save(buffer, format="PNG")
         b64 = base64.b64encode(buffer.getvalue()).decode()
 
+        return [{
+            "role": "user",
+            "content": [
+                {"type": "input_text", "text": system_prompt},
+                {"type": "input_image", "image_url": f"data:image/png;base64,{b64}"}
+            ]
+        }]
+
+    @retry(wait=wait_random_exponential(min=1, max=60), stop=stop_after_attempt(6))
+    def invoke(self, img: Image.Image, system_prompt: str) -> str:
         response = self.client.responses.create(
             model=self.model,
-            input=[{
-                "role": "user",
-                "content": [
-                    {"type": "input_text", "text": system_prompt},
-                    {"type": "input_image", "image_url": f"data:image/png;base64,{b64}"}
-                ]
-            }]
+            input=self.build_input(img, system_prompt)
         )
         return response.output_text
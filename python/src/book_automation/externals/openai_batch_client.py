@@ -0,0 +1,104 @@
+import json
+import os
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+from PIL import Image
+from dotenv import load_dotenv
+from openai import OpenAI
+
+from book_automation.externals.gpt_vision_client import GPTVisionClient
+
+TERMINAL_BATCH_STATUSES = {"completed", "failed", "expired", "cancelled"}
+
+
+class OpenAIBatchClient:
+    """
+    Thin wrapper around the OpenAI Batch API for vision requests: build JSONL request lines,
+    submit a batch, poll it and read back ``custom_id -> output_text``.
+    """
+
+    def __init__(self,
+                 model: str = "gpt-4o-mini",
+                 base_url: Optional[str] = None,
+                 completion_window: str = "24h"):
+        load_dotenv()
+
+        api_key = os.environ.get("OPENAI_API_KEY")
+        if not api_key:
+            raise ValueError("OpenAI API key not found. Set OPENAI_API_KEY environment variable.")
+
+        self.client = OpenAI(api_key=api_key, base_url=base_url)
+        self.model = model
+        self.completion_window = completion_window
+
+    def build_request_line(self, custom_id: str, img: Image.Image, system_prompt: str) -> str:
+        return json.dumps({
+            "custom_id": custom_id,
+            "method": "POST",
+            "url": "/v1/responses",
+            "body": {
+                "model": self.model,
+                "input": GPTVisionClient.build_input(img, system_prompt)
+            }
+        })
+
+    def submit(self, jsonl_path: Path) -> str:
+        with open(jsonl_path, "rb") as f:
+            input_file = self.client.files.create(file=f, purpose="batch")
+
+        batch = self.client.batches.create(
+            input_file_id=input_file.id,
+            endpoint="/v1/responses",
+            completion_window=self.completion_window
+        )
+        return batch.id
+
+    def wait_for_completion(self, batch_id: str, poll_interval: float = 60):
+        print(f"Waiting for batch {batch_id} to complete...")
+        while True:
+            batch = self.client.batches.retrieve(batch_id)
+            counts = batch.request_counts
+            if counts:
+                print(f"Batch {batch_id}: {batch.status} ({counts.completed}/{counts.total})")
+            if batch.status in TERMINAL_BATCH_STATUSES:
+                return batch
+            time.sleep(poll_interval)
+
+    @staticmethod
+    def _output_text(body: Dict) -> str:
+        if body.get("output_text"):
+            return body["output_text"]
+        return "".join(
+            content.get("text", "")
+            for item in body.get("output", [])
+            for content in item.get("content", []) or []
+            if content.get("type") == "output_text"
+        )
+
+    def fetch_results(self, batch) -> Dict[str, Optional[str]]:
+        """
+        Map each request's custom_id to its output text, or None if that request failed.
+        """
+        results: Dict[str, Optional[str]] = {}
+
+        if batch.output_file_id:
+            content = self.client.files.content(batch.output_file_id).text
+            for line in content.splitlines():
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                response = record.get("response") or {}
+                if response.get("status_code") == 200:
+                    results[record["custom_id"]] = self._output_text(response.get("body", {}))
+                else:
+                    results[record["custom_id"]] = None
+
+        if batch.error_file_id:
+            content = self.client.files.content(batch.error_file_id).text
+            for line in content.splitlines():
+                if line.strip():
+                    results.setdefault(json.loads(line)["custom_id"], None)
+
+        return results
@@ -0,0 +1,183 @@
+import asyncio
+import math
+import re
+import time
+from typing import Mapping, Optional
+
+_DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+
+
+def parse_reset_duration(value: Optional[str]) -> Optional[float]:
+    """
+    Parse OpenAI reset durations such as "1s", "6m0s", "20ms" or "1h2m3.5s" into seconds.
+    """
+    if not value:
+        return None
+
+    value = value.strip()
+    try:
+        return float(value)
+    except ValueError:
+        pass
+
+    parts = _DURATION_PART.findall(value)
+    if not parts:
+        return None
+
+    multipliers = {"h": 3600.0, "m": 60.0, "s": 1.0, "ms": 0.001}
+    return sum(float(amount) * multipliers[unit] for amount, unit in parts)
+
+
+class OpenAIRateLimiter:
+    """
+    Request/token budget driven by OpenAI's ``x-ratelimit-*`` response headers.
+
+    Every request reserves one request slot and an estimated number of tokens before it is
+    sent. The budget is refreshed from the headers of each response, and requests wait
+    (instead of failing with 429) whenever the remaining budget would drop below the
+    ``headroom`` fraction of the limit. When a reset time passes the budget is optimistically
+    refilled until the next response reports the real numbers.
+    """
+
+    def __init__(self,
+                 max_concurrency: int = 64,
+                 headroom: float = 0.9,
+                 clock=time.monotonic):
+        self.max_concurrency = max_concurrency
+        self.headroom = headroom
+        self._clock = clock
+
+        self.limit_requests: Optional[int] = None
+        self.limit_tokens: Optional[int] = None
+        self.remaining_requests: Optional[int] = None
+        self.remaining_tokens: Optional[int] = None
+        self.reset_requests_at: Optional[float] = None
+        self.reset_tokens_at: Optional[float] = None
+        self.paused_until: float = 0.0
+
+        self.in_flight = 0
+        self.reserved_tokens = 0
+        self._condition: Optional[asyncio.Condition] = None
+        self._condition_loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @property
+    def condition(self) -> asyncio.Condition:
+        # Created lazily, and again for every new event loop: the limiter can be built
+        # outside a loop and shared by callers that each run their own (asyncio.run)
+        loop = asyncio.get_running_loop()
+        if self._condition is None or self._condition_loop is not loop:
+            self._condition = asyncio.Condition()
+            self._condition_loop = loop
+        return self._condition
+
+    def update_from_headers(self, headers: Mapping[str, str]) -> None:
+        now = self._clock()
+
+        def header_int(name: str) -> Optional[int]:
+            value = headers.get(name)
+            try:
+                return int(value) if value is not None else None
+            except ValueError:
+                return None
+
+        self.limit_requests = header_int("x-ratelimit-limit-requests") or self.limit_requests
+        self.limit_tokens = header_int("x-ratelimit-limit-tokens") or self.limit_tokens
+
+        remaining_requests = header_int("x-ratelimit-remaining-requests")
+        if remaining_requests is not None:
+            self.remaining_requests = remaining_requests
+        remaining_tokens = header_int("x-ratelimit-remaining-tokens")
+        if remaining_tokens is not None:
+            self.remaining_tokens = remaining_tokens
+
+        reset_requests = parse_reset_duration(headers.get("x-ratelimit-reset-requests"))
+        if reset_requests is not None:
+            self.reset_requests_at = now + reset_requests
+        reset_tokens = parse_reset_duration(headers.get("x-ratelimit-reset-tokens"))
+        if reset_tokens is not None:
+            self.reset_tokens_at = now + reset_tokens
+
+    def pause(self, seconds: float) -> None:
+        """
+        Block every new request for ``seconds``, e.g. after a 429 with a ``retry-after`` header.
+        """
+        self.paused_until = max(self.paused_until, self._clock() + seconds)
+
+    @staticmethod
+    def retry_after_seconds(headers: Mapping[str, str]) -> Optional[float]:
+        retry_after_ms = headers.get("retry-after-ms")
+        if retry_after_ms is not None:
+            try:
+                return float(retry_after_ms) / 1000
+            except ValueError:
+                pass
+        return parse_reset_duration(headers.get("retry-after"))
+
+    def _reserve(self, limit: Optional[int]) -> int:
+        if not limit:
+            return 0
+        return int(math.ceil(limit * (1 - self.headroom)))
+
+    def _refill(self, now: float) -> None:
+        if self.reset_requests_at is not None and now >= self.reset_requests_at:
+            self.remaining_requests = self.limit_requests
+            self.reset_requests_at = None
+        if self.reset_tokens_at is not None and now >= self.reset_tokens_at:
+            self.remaining_tokens = self.limit_tokens
+            self.reset_tokens_at = None
+
+    def wait_time(self, tokens: int) -> float:
+        """
+        Seconds until a request costing ``tokens`` fits the budget; 0 if it can go now.
+        """
+        now = self._clock()
+        self._refill(now)
+
+        if now < self.paused_until:
+            return self.paused_until - now
+
+        if self.in_flight >= self.max_concurrency:
+            return math.inf
+
+        waits = []
+        if self.remaining_requests is not None:
+            available = self.remaining_requests - self.in_flight
+            if available <= self._reserve(self.limit_requests):
+                waits.append(self.reset_requests_at - now if self.reset_requests_at else math.inf)
+
+        if self.remaining_tokens is not None:
+            available = self.remaining_tokens - self.reserved_tokens
+            # A single request larger than the reserve must still be able to go once alone
+            if available - tokens < self._reserve(self.limit_tokens) and self.in_flight > 0:
+                waits.append(self.reset_tokens_at - now if self.reset_tokens_at else math.inf)
+
+        if not waits:
+            return 0.0
+        wait = max(waits)
+        # Nothing in flight will release capacity, so re-probe instead of waiting forever
+        if math.isinf(wait) and self.in_flight == 0:
+            return 1.0
+        return wait
+
+    async def acquire(self, tokens: int) -> None:
+        async with self.condition:
+            while True:
+                wait = self.wait_time(tokens)
+                if wait <= 0:
+                    break
+                timeout = None if math.isinf(wait) else wait
+                try:
+                    await asyncio.wait_for(self.condition.wait(), timeout=timeout)
+                except asyncio.TimeoutError:
+                    pass
+
+            self.in_flight += 1
+            self.reserved_tokens += tokens
+
+    async def release(self, tokens: int, headers: Optional[Mapping[str, str]] = None) -> None:
+        async with self.condition:
+            self.in_flight -= 1
+            self.reserved_tokens -= tokens
+            if headers is not None:
+                self.update_from_headers(headers)
+            self.condition.notify_all()
@@ -1,14 +1,33 @@
 import json
 import os
+import random
 import subprocess
 import time
+from typing import Dict, Optional
 
 import requests
+from tqdm import tqdm
+
+TERMINAL_STATUSES = ("completed", "error")
 
 
 class RealESRGANClient:
-    def __init__(self, server_url):
+    def __init__(self,
+                 server_url,
+                 request_timeout: float = 30,
+                 min_poll_interval: float = 0.5,
+                 max_poll_interval: float = 10,
+                 max_consecutive_errors: int = 5,
+                 event_idle_timeout: float = 60):
         self.server_url = server_url.rstrip("/")
+        self.request_timeout = request_timeout
+        self.min_poll_interval = min_poll_interval
+        self.max_poll_interval = max_poll_interval
+        # A pod that stops answering fails the wait after this many errors in a row
+        self.max_consecutive_errors = max_consecutive_errors
+        self.event_idle_timeout = event_idle_timeout
+        # Unknown until the first wait; older servers have no /events endpoint
+        self._events_supported: Optional[bool] = None
 
     def create_job(self, input_filename, model_name, gcs_credentials_path, gcs_bucket_name):
         with open(gcs_credentials_path) as f:
@@ -20,23 +39,103 @@ class RealESRGANClient:
             "gcs_credentials_json": gcs_credentials_json,
             "gcs_bucket_name": gcs_bucket_name
         }
-        response = requests.post(f"{self.server_url}/jobs", json=payload)
+        response = requests.post(f"{self.server_url}/jobs", json=payload, timeout=self.request_timeout)
         response.raise_for_status()
         return response.json()["job_id"]
 
+    def is_healthy(self, timeout=10) -> bool:
+        try:
+            return requests.get(f"{self.server_url}/health", timeout=timeout).status_code == 200
+        except requests.RequestException:
+            return False
+
     def get_job_status(self, job_id):
-        response = requests.get(f"{self.server_url}/jobs/{job_id}/status")
+        response = requests.get(f"{self.server_url}/jobs/{job_id}/status", timeout=self.request_timeout)
         response.raise_for_status()
         return response.json()
 
-    def wait_for_completion(self, job_id, poll_interval=10):
+    def wait_for_completion(self, job_id, poll_interval=None, timeout: Optional[float] = None,
+                            show_progress: bool = True) -> Dict:
+        """
+        Block until the job is completed or errored and return its final status.
+
+        Follows the server's ``/jobs/{id}/events`` stream when it has one. Otherwise the
+        status is polled, starting at ``min_poll_interval`` and backing off (with jitter) to
+        ``poll_interval`` or ``max_poll_interval`` while nothing changes, so short jobs
+        return almost immediately. Raises TimeoutError after ``timeout`` seconds and
+        ConnectionError when the server stops answering.
+        """
         print(f"Waiting for job {job_id} to complete...")
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with tqdm(desc=f"Job {job_id}", unit="page", leave=False, disable=not show_progress) as progress:
+            if self._events_supported is not False:
+                status = self._wait_with_events(job_id, deadline, progress)
+                if status is not None:
+                    return status
+            return self._poll(job_id, deadline, progress, poll_interval or self.max_poll_interval)
+
+    def _wait_with_events(self, job_id, deadline: Optional[float], progress: tqdm) -> Optional[Dict]:
+        url = f"{self.server_url}/jobs/{job_id}/events"
+        try:
+            with requests.get(url, stream=True, headers={"Accept": "text/event-stream"},
+                              timeout=(self.request_timeout, self.event_idle_timeout)) as response:
+                if (response.status_code in (404, 405, 501)
+                        or "text/event-stream" not in response.headers.get("Content-Type", "")):
+                    self._events_supported = False
+                    return None
+                response.raise_for_status()
+                self._events_supported = True
+
+                for line in response.iter_lines(decode_unicode=True):
+                    if deadline is not None and time.monotonic() >= deadline:
+                        raise TimeoutError(f"Job {job_id} did not finish in time")
+                    if not line or not line.startswith("data:"):
+                        continue
+                    status = json.loads(line[len("data:"):].strip())
+                    self._update_progress(progress, status)
+                    if status.get("status") in TERMINAL_STATUSES:
+                        return status
+        except requests.RequestException as e:
+            # Stream dropped (idle proxy, restart); polling takes over and decides if the pod is gone
+            print(f"Event stream for job {job_id} ended: {e}")
+        return None
+
+    def _poll(self, job_id, deadline: Optional[float], progress: tqdm, max_interval: float) -> Dict:
+        interval = self.min_poll_interval
+        errors = 0
+        last_processed = None
         while True:
-            status = self.get_job_status(job_id)
-            print(f"Status: {status['status']}")
-            if status['status'] in ["completed", "error"]:
-                return status
-            time.sleep(poll_interval)
+            try:
+                status = self.get_job_status(job_id)
+                errors = 0
+            except requests.RequestException as e:
+                errors += 1
+                if errors >= self.max_consecutive_errors:
+                    raise ConnectionError(f"Job {job_id}: server unreachable after {errors} attempts: {e}") from e
+                status = None
+
+            if status is not None:
+                self._update_progress(progress, status)
+                if status["status"] in TERMINAL_STATUSES:
+                    return status
+                # Poll quickly again while the job is visibly moving
+                if status.get("processed") != last_processed:
+                    last_processed = status.get("processed")
+                    interval = self.min_poll_interval
+
+            if deadline is not None and time.monotonic() >= deadline:
+                raise TimeoutError(f"Job {job_id} did not finish in time")
+            time.sleep(interval * random.uniform(0.8, 1.2))
+            interval = min(interval * 1.5, max_interval)
+
+    @staticmethod
+    def _update_progress(progress: tqdm, status: Dict):
+        # Servers that report page counts get a per-page bar; others only show the status
+        if status.get("total") is not None:
+            progress.total = status["total"]
+        if status.get("processed") is not None:
+            progress.n = status["processed"]
+        progress.set_postfix_str(str(status.get("status")), refresh=True)
 
     def download_output(self, url, output_dir="./downloads") -> str:
         os.makedirs(output_dir, exist_ok=True)
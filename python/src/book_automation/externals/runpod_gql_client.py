@@ -11,7 +11,7 @@ class RunPodGraphQlClient:
         if not self.api_key:
             raise EnvironmentError("RUNPOD_API_KEY is missing. Set it in your .env file.")
 
-        self.endpoint = "https://api.runpod.io/graphql"
+        self.endpoint = os.getenv("RUNPOD_GRAPHQL_URL", "https://api.runpod.io/graphql")
         self.session = requests.Session()
         self.session.headers.update({
             "Authorization": f"Bearer {self.api_key}",
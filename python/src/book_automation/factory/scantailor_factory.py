@@ -28,6 +28,8 @@ class ScanTailorFactory:
         dpi = config.get('dpi', 600)
         compression = config.get('compression', 'lzw')
         output_dir = config.get('output_dir', None)
+        shards = config.get('shards', 1)
+        incremental = config.get('incremental', False)
         
         # Create and return the service with explicit parameters
         return ScanTailorService(
@@ -36,5 +38,7 @@ class ScanTailorFactory:
             color_mode=color_mode,
             force_color=force_color,
             dpi=dpi,
-            compression=compression
+            compression=compression,
+            shards=shards,
+            incremental=incremental
         )
\ No newline at end of file
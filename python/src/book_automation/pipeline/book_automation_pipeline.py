@@ -1,23 +1,35 @@
+import asyncio
+import glob
 import os
+import shutil
 import time
 from pathlib import Path
-from typing import Dict
+from typing import Dict, List, Optional
 
 from batch_image_processor.processors.batch.batch_processor import BatchProcessor
 from batch_image_processor.processors.image.border_processor import BorderProcessor
 from batch_image_processor.processors.image.deskew import Deskew
 from batch_image_processor.processors.image.image_mode_converter import ImageModeConverter
-from batch_image_processor.processors.image.page_cropper import PageCropper
 from batch_image_processor.processors.image.threshold_processor import ThresholdProcessor
 from batch_image_processor.processors.pipeline import ImagePipeline
 from dotenv import load_dotenv
 
 from book_automation.downloader.archive_downloader import ArchiveDownloader
-from book_automation.externals.gpt_vision_client import GPTVisionClient
+from book_automation.externals.async_gpt_vision_client import AsyncGPTVisionClient
+from book_automation.externals.openai_batch_client import OpenAIBatchClient
 from book_automation.scantailor.scantailor_service import ScanTailorService
+from book_automation.sorter.classifier.async_gpt_vision_page_type_classifier import \
+    AsyncGPTVisionPageTypeClassifier
+from book_automation.sorter.batch_image_sorter import BatchImageSorter
+from book_automation.sorter.classifier.confidence_fallback_page_type_classifier import \
+    ConfidenceFallbackPageTypeClassifier
 from book_automation.sorter.classifier.gpt_vision_page_type_classifier import \
     GPTVisionPageTypeClassifier
-from book_automation.sorter.image_sorter import ImageSorter
+from book_automation.sorter.classifier.local_page_type_classifier import LocalPageTypeClassifier
+from book_automation.sorter.image_sorter import ImageSorter, SortMode
+from book_automation.sorter.sequence_image_sorter import SequenceImageSorter
+from book_automation.sorter.sort_index import SortIndex, INDEX_FILENAME
+from book_automation.util.stage_report import StageReport
 from book_automation.util.zip_util import ZipUtil
 
 # Load environment variables
@@ -25,18 +37,62 @@ load_dotenv()
 
 from book_automation.pipeline.threaded_book_runner import ThreadedBookRunner
 from book_automation.processor.cloud.runpod.runpod_batch_runner import RunPodBatchRunner
+from book_automation.processor.cloud.runpod.runpod_pod_pool import RunPodPodPool
+from book_automation.processor.cloud.upscale_manifest import UpscaleManifest
+from book_automation.processor.upscaler.upscale_preflight import UpscalePreflight
+from book_automation.processor.upscaler.upscaler_policy import UpscalerBackend, UpscalerPolicy
+from book_automation.processor.converter.bilevel_image_converter import BilevelImageConverter
 from book_automation.processor.converter.pil_image_converter import PilImageConverter
 from book_automation.processor.csv_generator.image_folder_csv_creator import ImageFolderCsvCreator
+from book_automation.processor.image.adaptive_threshold_processor import AdaptiveThresholdProcessor, \
+    ThresholdMethod
+from book_automation.processor.image.content_bounds_cropper import ContentBoundsCropper
+from book_automation.processor.image.fast_deskew_processor import FastDeskewProcessor
 from book_automation.records.page_type import PageType
 
 
 class BookAutomationPipeline:
 
-    def __init__(self, config: Dict):
+    def __init__(self, config: Dict, pod_pool: Optional[RunPodPodPool] = None):
         self.book_id = config['book_id']
         self.book_title = config['book_title']
         self.book_projects_path = config['book_projects_path']
-        self.runpod_pod_id = config['runpod_pod_id']
+        # A single pod id, or a list to spread a large book's shards over several pods
+        self.runpod_pod_id = config.get('runpod_pod_id')
+        self.runpod_pod_count = config.get('runpod_pod_count', 1)
+        # "runpod", "cpu", or "auto" to let the policy pick by page count; "auto" needs
+        # an ONNX model for the CPU upscaler, otherwise RunPod is used
+        self.upscaler = config.get('upscaler', 'auto')
+        self.cpu_upscaler_model = config.get('cpu_upscaler_model')
+        self.upscaler_policy = UpscalerPolicy(**config.get('upscaler_policy', {}))
+        # Opt-in: with a dict of UpscalePreflight options ({} for the defaults), pages already
+        # at target resolution skip the upscaler. Unset, every page is upscaled as-is
+        preflight_config = config.get('upscale_preflight')
+        self.upscale_preflight = UpscalePreflight(**preflight_config) if preflight_config is not None else None
+        # "async" classifies page by page under the rate limiter; "batch" goes through the
+        # Batch API for cheaper, slower overnight runs; "sequence" only classifies run
+        # boundaries and samples of uniform runs
+        self.classification_mode = config.get('classification_mode', 'async')
+        # Optional model from scripts/train_page_classifier.py; only pages it is unsure
+        # about are sent to GPT
+        self.local_classifier_model = config.get('local_classifier_model')
+        self.local_classifier_min_confidence = config.get('local_classifier_min_confidence', 0.9)
+        # Pages are moved into sorted/<type> by default; "hardlink" or "index" record them in
+        # sorted/index.jsonl instead, so a crashed sort leaves deskewed/ intact and resumes
+        self.sort_mode = SortMode(config.get('sort_mode', SortMode.MOVE.value))
+        # "fixed" keeps the hand-tuned ThresholdProcessor; "otsu" or "sauvola" pick the
+        # threshold per page (or per window) in one pass straight to 1-bit
+        self.threshold_method = config.get('threshold_method', 'fixed')
+        # "classic" runs Deskew() on the full page; "fast" estimates the angle on a
+        # thumbnail, rotates once and logs every angle to deskew_angles.jsonl
+        self.deskew_method = config.get('deskew_method', 'classic')
+        # Crop every page to its content before deskewing, so later stages and uploads
+        # skip the scanner bed and margins; crop boxes go to crop_boxes.jsonl
+        self.crop_to_content = config.get('crop_to_content', False)
+        # Format of the final bilevel pages: "png", "tiff" (CCITT Group 4) or "pbm"
+        self.final_format = config.get('final_format', 'png')
+        # Shared across pipelines of a batch of books so the upscale pod stays warm between them
+        self.pod_pool = pod_pool
 
     def run(self):
         book_dir = os.path.join(self.book_projects_path, self.book_title)
@@ -76,54 +132,168 @@ class BookAutomationPipeline:
             BatchProcessor(
                 input_dir=png_path,
                 output_dir=deskewed_path,
-                processors=[
-                    # PageCropper(),
-                    Deskew()
+                processors=self._crop_processors(os.path.join(book_dir, "crop_boxes.jsonl")) + [
+                    self._deskew_processor(os.path.join(book_dir, "deskew_angles.jsonl"))
                 ],
                 pipeline_class=ImagePipeline,
                 parallel=True
             ).batch_process()
 
-        if not os.path.exists(sorted_path):
-            ImageSorter(
-                input_dir=Path(deskewed_path),
-                output_dir=Path(sorted_path),
-                classifier=GPTVisionPageTypeClassifier(
-                    types=[PageType.BLANK_PAGE, PageType.CONTENT_PAGE],
-                    vision_client=GPTVisionClient()
-                )
-            ).sort()
+        if not self._sort_complete(deskewed_path, sorted_path):
+            self._sort(deskewed_path, sorted_path)
 
-        if not os.path.exists(content_upscaled_path):
-            RunPodBatchRunner(
-                runpod_pod_id=self.runpod_pod_id,
-                input_dir=Path(content_path),
-                output_dir=Path(content_upscaled_path),
-            ).run()
+        if not self._upscale_complete(content_upscaled_path):
+            self._upscale(content_path, content_upscaled_path, sorted_path)
 
         if not os.path.exists(threshold_path):
             BatchProcessor(
                 input_dir=content_upscaled_path,
                 output_dir=threshold_path,
-                processors=[
-                    ThresholdProcessor(threshold_value=120),
-                    ImageModeConverter(mode="1"),
+                processors=self._threshold_processors(fixed_value=120) + [
                     BorderProcessor(top=20, bottom=20, left=20, right=20)
                 ],
                 pipeline_class=ImagePipeline,
                 parallel=True
             ).batch_process()
 
+        self._write_final_format(threshold_path)
+
         if not os.path.exists(csv_path):
             ImageFolderCsvCreator(
                 img_dir=Path(threshold_path),
                 csv_path=Path(csv_path)
             ).create()
 
+    def _write_final_format(self, final_path: str):
+        # The threshold stage writes PNG; other formats replace those pages in place
+        if self.final_format == "png" or not glob.glob(os.path.join(final_path, "*.png")):
+            return
+        ThreadedBookRunner(
+            processor=BilevelImageConverter(output_format=self.final_format),
+            input_dir=final_path,
+            file_pattern="*.png").run()
+
+    def _crop_processors(self, log_path: str) -> List:
+        return [ContentBoundsCropper(log_path=log_path)] if self.crop_to_content else []
+
+    def _deskew_processor(self, log_path: str):
+        if self.deskew_method == "fast":
+            return FastDeskewProcessor(log_path=log_path)
+        return Deskew()
+
+    def _threshold_processors(self, fixed_value: int) -> List:
+        if self.threshold_method == "fixed":
+            return [ThresholdProcessor(threshold_value=fixed_value), ImageModeConverter(mode="1")]
+        return [AdaptiveThresholdProcessor(method=ThresholdMethod(self.threshold_method))]
+
+    def _sort_complete(self, input_path: str, sorted_path: str) -> bool:
+        if not os.path.exists(sorted_path):
+            return False
+
+        page_paths = [p for p in Path(input_path).iterdir() if p.is_file()]
+        index_path = Path(sorted_path) / INDEX_FILENAME
+        if index_path.exists():
+            return SortIndex(index_path).covers(page_paths)
+        # Moved pages: anything left in the input folder was never sorted
+        return not page_paths
+
+    def _select_pages(self, sorted_path: str, page_type: PageType):
+        # Only index-only sorts need an explicit selection; otherwise sorted/<type> has the pages
+        if self.sort_mode != SortMode.INDEX:
+            return None
+        return SortIndex(Path(sorted_path) / INDEX_FILENAME).select(page_type)
+
+    def _upscale_complete(self, upscaled_path: str) -> bool:
+        if not os.path.exists(upscaled_path):
+            return False
+        # RunPod runs leave a manifest; a run that failed part-way is resumed from it
+        manifest = UpscaleManifest.for_output_dir(Path(upscaled_path))
+        return manifest.complete if manifest.path.exists() else True
 
+    def _upscaler_backend(self, page_count: int) -> UpscalerBackend:
+        if self.upscaler != "auto":
+            return UpscalerBackend(self.upscaler)
+        if not self.cpu_upscaler_model:
+            return UpscalerBackend.RUNPOD
+        return self.upscaler_policy.choose(
+            page_count,
+            pod_available=bool(self.runpod_pod_id),
+            pod_warm=self.pod_pool is not None and self.pod_pool.has_warm_pod()
+        )
 
+    def _upscale(self, content_path: str, content_upscaled_path: str, sorted_path: str):
+        pages = self._select_pages(sorted_path, PageType.CONTENT_PAGE)
+        if pages is None:
+            pages = sorted(p for p in Path(content_path).iterdir() if p.is_file())
 
+        bypassed = []
+        staging_dir = Path(sorted_path).parent / "upscale_staging"
+        if self.upscale_preflight:
+            report = StageReport("Upscale preflight")
+            pages, bypassed = self.upscale_preflight.run(pages, staging_dir, stage_report=report)
+            print(report.summary())
 
+        scale = 1.0
+        if pages:
+            self._run_upscaler(pages, content_path, content_upscaled_path)
+            scale = UpscalePreflight.output_scale(pages, Path(content_upscaled_path)) or scale
+        UpscalePreflight.merge_bypassed(bypassed, Path(content_upscaled_path), scale)
+        shutil.rmtree(staging_dir, ignore_errors=True)
+
+    def _run_upscaler(self, pages: List[Path], content_path: str, content_upscaled_path: str):
+        backend = self._upscaler_backend(len(pages))
+        print(f"Upscaling {len(pages)} pages with {backend.value}")
+        if backend == UpscalerBackend.CPU:
+            # onnxruntime is only needed when upscaling locally
+            from book_automation.processor.upscaler.cpu_upscaler import CpuUpscaler
+
+            upscaler = CpuUpscaler(
+                model_path=Path(self.cpu_upscaler_model),
+                input_dir=Path(content_path),
+                output_dir=Path(content_upscaled_path),
+                input_files=pages
+            )
+        else:
+            upscaler = RunPodBatchRunner(
+                runpod_pod_id=self.runpod_pod_id,
+                input_dir=Path(content_path),
+                output_dir=Path(content_upscaled_path),
+                input_files=pages,
+                pod_pool=self.pod_pool,
+                pod_count=self.runpod_pod_count,
+            )
+        upscaler.run()
+
+    def _sort(self, input_path: str, sorted_path: str):
+        types = [PageType.BLANK_PAGE, PageType.CONTENT_PAGE]
+
+        if self.classification_mode == "batch":
+            BatchImageSorter(
+                input_dir=Path(input_path),
+                output_dir=Path(sorted_path),
+                classifier=GPTVisionPageTypeClassifier(types=types, vision_client=None),
+                batch_client=OpenAIBatchClient(),
+                sort_mode=self.sort_mode
+            ).sort()
+        else:
+            classifier = AsyncGPTVisionPageTypeClassifier(
+                types=types,
+                vision_client=AsyncGPTVisionClient()
+            )
+            if self.local_classifier_model:
+                classifier = ConfidenceFallbackPageTypeClassifier(
+                    local_classifier=LocalPageTypeClassifier.load(Path(self.local_classifier_model)),
+                    fallback_classifier=classifier,
+                    min_confidence=self.local_classifier_min_confidence
+                )
+
+            sorter_class = SequenceImageSorter if self.classification_mode == "sequence" else ImageSorter
+            asyncio.run(sorter_class(
+                input_dir=Path(input_path),
+                output_dir=Path(sorted_path),
+                classifier=classifier,
+                sort_mode=self.sort_mode
+            ).sort_async())
 
 
 if __name__ == "__main__":
@@ -135,4 +305,11 @@ if __name__ == "__main__":
 
         config = yaml.safe_load(file)
 
-    BookAutomationPipeline(config).run()
+    if 'books' in config:
+        # A batch of books: warm pods are shared by every book's upscale step
+        pod_ids = config['runpod_pod_id']
+        with RunPodPodPool([pod_ids] if isinstance(pod_ids, str) else pod_ids) as pod_pool:
+            for book in config['books']:
+                BookAutomationPipeline({**config, **book}, pod_pool=pod_pool).run()
+    else:
+        BookAutomationPipeline(config).run()
@@ -1,21 +1,28 @@
+import glob
 import os
 import time
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Dict
+from typing import Dict, List
 
 from batch_image_processor.processors.batch.batch_processor import BatchProcessor
 from batch_image_processor.processors.image.border_processor import BorderProcessor
 from batch_image_processor.processors.image.deskew import Deskew
 from batch_image_processor.processors.image.image_mode_converter import ImageModeConverter
-from batch_image_processor.processors.image.page_cropper import PageCropper
 from batch_image_processor.processors.image.threshold_processor import ThresholdProcessor
 from batch_image_processor.processors.pipeline import ImagePipeline
 from dotenv import load_dotenv
 
 from book_automation.downloader.archive_downloader import ArchiveDownloader
 from book_automation.pipeline.threaded_book_runner import ThreadedBookRunner
+from book_automation.processor.converter.bilevel_image_converter import BilevelImageConverter
+from book_automation.processor.converter.bilevel_page_converter import BilevelPageConverter
 from book_automation.processor.converter.pil_image_converter import PilImageConverter
 from book_automation.processor.csv_generator.image_folder_csv_creator import ImageFolderCsvCreator
+from book_automation.processor.image.adaptive_threshold_processor import AdaptiveThresholdProcessor, \
+    ThresholdMethod
+from book_automation.processor.image.content_bounds_cropper import ContentBoundsCropper
+from book_automation.processor.image.fast_deskew_processor import FastDeskewProcessor
 from book_automation.util.zip_util import ZipUtil
 
 # Load environment variables
@@ -28,16 +35,32 @@ class BookAutomationPipelineSimple:
     This pipeline contains the following steps:
     1. Download the book archive
     2. Extract the archive
-    3. Convert JP2 images to PNG
+    3. Convert JP2 images to PNG (with fast_path, steps 3-5 run as one pass per page)
     4. Deskew and crop the images
     5. Apply threshold and border processing directly on the deskewed images
-    6. Generate CSV file for the processed images
+    6. Rewrite the processed images in the final bilevel format (PNG, G4 TIFF or PBM)
+    7. Generate CSV file for the processed images
     """
 
     def __init__(self, config: Dict):
         self.book_id = config['book_id']
         self.book_title = config['book_title']
         self.book_projects_path = config['book_projects_path']
+        # "fixed" keeps the hand-tuned ThresholdProcessor; "otsu" or "sauvola" pick the
+        # threshold per page (or per window) in one pass straight to 1-bit
+        self.threshold_method = config.get('threshold_method', 'fixed')
+        # "classic" runs Deskew() on the full page; "fast" estimates the angle on a
+        # thumbnail, rotates once and logs every angle to deskew_angles.jsonl
+        self.deskew_method = config.get('deskew_method', 'classic')
+        # Crop every page to its content before deskewing, so later stages and uploads
+        # skip the scanner bed and margins; crop boxes go to crop_boxes.jsonl
+        self.crop_to_content = config.get('crop_to_content', False)
+        # Format of the final bilevel pages: "png", "tiff" (CCITT Group 4) or "pbm"
+        self.final_format = config.get('final_format', 'png')
+        # Text-only books can skip the intermediate PNG folders: each worker decodes the
+        # JP2 to grayscale, crops, deskews (fast deskew) and binarizes, writing only the
+        # final bilevel page
+        self.fast_path = config.get('fast_path', False)
 
     def run(self):
         book_dir = os.path.join(self.book_projects_path, self.book_title)
@@ -66,8 +89,13 @@ class BookAutomationPipelineSimple:
         processed_path = os.path.join(book_dir, "processed")
         csv_path = os.path.join(processed_path, "out.csv")
 
+        # Steps 3-5 in one pass for text-only books (if enabled and needed)
+        if self.fast_path and not os.path.exists(processed_path):
+            print("Converting JP2 images straight to bilevel pages...")
+            self._run_fast_path(image_path, processed_path, book_dir)
+
         # Step 3: Convert JP2 images to PNG (if needed)
-        if not os.path.exists(png_path):
+        if not self.fast_path and not os.path.exists(png_path):
             print("Converting JP2 images to PNG...")
             ThreadedBookRunner(
                 processor=PilImageConverter(),
@@ -76,14 +104,13 @@ class BookAutomationPipelineSimple:
                 file_pattern="*.jp2").run()
 
         # Step 4: Deskew and crop the images (if needed)
-        if not os.path.exists(deskewed_path):
+        if not self.fast_path and not os.path.exists(deskewed_path):
             print("Deskewing and cropping images...")
             BatchProcessor(
                 input_dir=png_path,
                 output_dir=deskewed_path,
-                processors=[
-                    # PageCropper(),
-                    Deskew()
+                processors=self._crop_processors(os.path.join(book_dir, "crop_boxes.jsonl")) + [
+                    self._deskew_processor(os.path.join(book_dir, "deskew_angles.jsonl"))
                 ],
                 pipeline_class=ImagePipeline,
                 parallel=True
@@ -96,16 +123,17 @@ class BookAutomationPipelineSimple:
             BatchProcessor(
                 input_dir=deskewed_path,
                 output_dir=processed_path,
-                processors=[
-                    ThresholdProcessor(threshold_value=190),
-                    ImageModeConverter(mode="1"),
+                processors=self._threshold_processors(fixed_value=190) + [
                     # BorderProcessor(top=350, bottom=400, left=300, right=450)
                 ],
                 pipeline_class=ImagePipeline,
                 parallel=True
             ).batch_process()
 
-        # Step 6: Generate CSV file for the processed images (if needed)
+        # Step 6: Rewrite the processed pages in the final bilevel format (if needed)
+        self._write_final_format(processed_path)
+
+        # Step 7: Generate CSV file for the processed images (if needed)
         if not os.path.exists(csv_path):
             print("Generating CSV file...")
             ImageFolderCsvCreator(
@@ -115,6 +143,40 @@ class BookAutomationPipelineSimple:
             
         print(f"Processing complete. Final images and CSV available at: {processed_path}")
 
+    def _run_fast_path(self, image_path: str, processed_path: str, book_dir: str):
+        processors = self._crop_processors(os.path.join(book_dir, "crop_boxes.jsonl")) + [
+            FastDeskewProcessor(log_path=os.path.join(book_dir, "deskew_angles.jsonl"))
+        ] + self._threshold_processors(fixed_value=190)
+        ThreadedBookRunner(
+            processor=BilevelPageConverter(processors=processors, output_format=self.final_format),
+            input_dir=image_path,
+            output_dir=processed_path,
+            file_pattern="*.jp2",
+            max_workers=os.cpu_count(),
+            executor_class=ProcessPoolExecutor).run()
+
+    def _write_final_format(self, final_path: str):
+        # The threshold stage writes PNG; other formats replace those pages in place
+        if self.final_format == "png" or not glob.glob(os.path.join(final_path, "*.png")):
+            return
+        ThreadedBookRunner(
+            processor=BilevelImageConverter(output_format=self.final_format),
+            input_dir=final_path,
+            file_pattern="*.png").run()
+
+    def _crop_processors(self, log_path: str) -> List:
+        return [ContentBoundsCropper(log_path=log_path)] if self.crop_to_content else []
+
+    def _deskew_processor(self, log_path: str):
+        if self.deskew_method == "fast":
+            return FastDeskewProcessor(log_path=log_path)
+        return Deskew()
+
+    def _threshold_processors(self, fixed_value: int) -> List:
+        if self.threshold_method == "fixed":
+            return [ThresholdProcessor(threshold_value=fixed_value), ImageModeConverter(mode="1")]
+        return [AdaptiveThresholdProcessor(method=ThresholdMethod(self.threshold_method))]
+
 
 if __name__ == "__main__":
     config_path = "/Users/iankonradjohnson/base/abacus/BookDownloader/config/automation/pipeline.yml"
@@ -1,7 +1,7 @@
 import os
 import concurrent.futures
 import logging
-from typing import List, Optional
+from typing import List, Optional, Type
 import glob
 from tqdm import tqdm
 
@@ -16,6 +16,7 @@ class ThreadedBookRunner:
         output_dir: Optional[str] = None,
         file_pattern: str = "*",
         max_workers: int = 8,
+        executor_class: Type[concurrent.futures.Executor] = concurrent.futures.ThreadPoolExecutor,
     ):
         """
         Initialize the ThreadedBookRunner.
@@ -26,12 +27,16 @@ class ThreadedBookRunner:
             output_dir: Optional directory to save processed images to (if None, replace originals)
             file_pattern: Glob pattern to match files (e.g., "*.jp2")
             max_workers: Maximum number of worker threads to use
+            executor_class: Executor to run the processor in; ProcessPoolExecutor for
+                            processors that spend their time in Python/NumPy rather than
+                            in I/O or GIL-releasing decoders (the processor must be picklable)
         """
         self.processor = processor
         self.input_dir = input_dir
         self.output_dir = output_dir
         self.file_pattern = file_pattern
         self.max_workers = max_workers
+        self.executor_class = executor_class
         self.logger = logging.getLogger(__name__)
     
     def _find_files(self) -> List[str]:
@@ -76,7 +81,7 @@ class ThreadedBookRunner:
         self.logger.info(f"Processing {len(files)} files with {self.max_workers} workers")
         
         # Process files in parallel
-        with concurrent.futures.ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+        with self.executor_class(max_workers=self.max_workers) as executor:
             # Submit all processing tasks
             future_to_file = {}
             
@@ -10,6 +10,13 @@ class FileUploader(ABC):
     def upload_file(self, local_path: Path) -> str:
         pass
 
+    def remote_exists(self, remote_path: str) -> bool:
+        """
+        Whether a previously uploaded file is still on the pod. Uploaders that can't tell
+        report False, so the file is sent again.
+        """
+        return False
+
 
 class SCPFileUploader(FileUploader):
     def __init__(self, host: str, port, user: str):
@@ -35,6 +42,17 @@ class SCPFileUploader(FileUploader):
         print(f"✅ File uploaded to pod at {remote_path}")
         return remote_path
 
+    def remote_exists(self, remote_path: str) -> bool:
+        args = [
+            "ssh",
+            "-p", str(self.port),
+            "-o", "StrictHostKeyChecking = no",
+            "-i", "~/.ssh/id_ed25519",
+            f"{self.user}@{self.host}",
+            f"test -f {remote_path}"
+        ]
+        return subprocess.run(args, capture_output=True).returncode == 0
+
 
 class RunPodCtlFileUploader(FileUploader):
     def upload_file(self, local_path: Path) -> str:
@@ -1,67 +1,262 @@
 import os
 import shutil
-import tempfile
+import threading
+import time
+import zipfile
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+from dataclasses import replace
 from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
 
 from dotenv import load_dotenv
 
+from book_automation.externals.runpod_gql_client import RunPodGraphQlClient
+from book_automation.processor.cloud.runpod.runpod_client_session import RunPodClientSession
+from book_automation.processor.cloud.runpod.runpod_pod_pool import RunPodPodPool
 from book_automation.processor.cloud.runpod.runpod_session_factory import \
     RunPodClientSessionFactory, FileUploadMethod
+from book_automation.processor.cloud.shard_scheduler import ShardScheduler, gpu_headroom, worker_slots
+from book_automation.processor.cloud.shard_uploader import ShardUploader, Shard, iter_shards
+from book_automation.processor.cloud.streaming_zip_fetcher import RangeNotSupported
+from book_automation.processor.cloud.upscale_manifest import UpscaleManifest
+from book_automation.processor.upscaler.upscaler import Upscaler
 from book_automation.util.gcs_signed_url_generator import GcsSignedUrlGenerator
+from book_automation.util.stage_report import StageReport
 
 load_dotenv()
 
-class RunPodBatchRunner:
+class RunPodBatchRunner(Upscaler):
     def __init__(self,
-                 runpod_pod_id,
+                 runpod_pod_id: Union[str, Iterable[str]],
                  input_dir: Path,
                  output_dir: Path,
                  gcs_bucket_name: str = "abacus-upscale-jobs",
                  container_port: int = 5000,
                  model_name: str = "net_g_1000000",
-                 upload_method: FileUploadMethod = FileUploadMethod.SCP):
-        self.runpod_pod_id = runpod_pod_id
-        self.input_dir = input_dir
-        self.output_dir = output_dir
+                 upload_method: FileUploadMethod = FileUploadMethod.SCP,
+                 input_files: Optional[Iterable[Path]] = None,
+                 shard_size: int = 50,
+                 parallel_transfers: int = 4,
+                 max_concurrent_shards: int = 8,
+                 stage_report: Optional[StageReport] = None,
+                 pod_pool: Optional[RunPodPodPool] = None,
+                 pod_count: int = 1,
+                 download_connections: int = 8,
+                 url_generator: Optional[GcsSignedUrlGenerator] = None,
+                 hash_workers: int = 8):
+        super().__init__(input_dir, output_dir, input_files)
+        # One pod id or several; shards are spread across all of them
+        self.pod_ids = [runpod_pod_id] if isinstance(runpod_pod_id, str) else list(runpod_pod_id)
         self.gcs_bucket_name = gcs_bucket_name
         self.container_port = container_port
         self.model_name = model_name
         self.upload_method = upload_method
+        self.shard_size = shard_size
+        self.parallel_transfers = parallel_transfers
+        # Shards between upload and download at once; beyond the transfer slots these are
+        # shards waiting on the GPU
+        self.max_concurrent_shards = max_concurrent_shards
+        self.stage_report = stage_report or StageReport("RunPod upscale")
+        # When set, pod_count sessions come from (and go back to) the pool and
+        # runpod_pod_id is unused
+        self.pod_pool = pod_pool
+        self.pod_count = pod_count
+        # Range requests per shard output, each streaming one page into output_dir
+        self.download_connections = download_connections
+        # Anything with generate_signed_url/blob_exists; defaults to the real bucket
+        self.url_generator = url_generator
+        # Pages hashed at once when checking the manifest; reads and SHA-256 release the GIL
+        self.hash_workers = hash_workers
 
         gcs_credentials_path = os.getenv("GCS_CREDENTIALS_PATH")
         if not gcs_credentials_path:
             raise ValueError("GCS_CREDENTIALS_PATH not set in .env file")
         self.gcs_credentials_path = Path(gcs_credentials_path)
 
+    def _start_sessions(self) -> List[RunPodClientSession]:
+        if self.pod_pool:
+            def start(_):
+                return self.pod_pool.acquire()
+            targets = range(min(self.pod_count, self.pod_pool.size))
+        else:
+            def start(pod_id):
+                return RunPodClientSessionFactory.create_session(
+                    pod_id=pod_id,
+                    container_port=self.container_port,
+                    upload_method=self.upload_method
+                )
+            targets = self.pod_ids
+
+        # Cold starts are mostly waiting, so bring all pods up at once
+        with ThreadPoolExecutor(max_workers=len(targets)) as executor:
+            futures = [executor.submit(start, target) for target in targets]
+            sessions, errors = [], []
+            for future in futures:
+                try:
+                    sessions.append(future.result())
+                except Exception as e:
+                    errors.append(e)
+        if not sessions:
+            raise RuntimeError(f"No RunPod pod could be started: {errors}")
+        for e in errors:
+            print(f"⚠️ Continuing without a pod that failed to start: {e}")
+        return sessions
+
+    def _end_sessions(self, sessions: List[RunPodClientSession], dead_pods: Iterable[str] = ()):
+        dead_pods = set(dead_pods)
+        for session in sessions:
+            if self.pod_pool:
+                # The pool keeps the pod warm for the next book, unless it stopped responding
+                self.pod_pool.release(session, healthy=session.pod_id not in dead_pods)
+            else:
+                print(f"🧹 Cleaning up: Stopping pod {session.pod_id}...")
+                session.stop_pod()
+
+    def _pod_weights(self, sessions: List[RunPodClientSession]) -> Dict[str, float]:
+        if len(sessions) == 1:
+            return {sessions[0].pod_id: 1.0}
+        try:
+            gql_client = RunPodGraphQlClient()
+            return {s.pod_id: gpu_headroom(gql_client.get_pod_info(s.pod_id)) for s in sessions}
+        except Exception as e:
+            print(f"⚠️ Could not read GPU utilisation, splitting shards evenly: {e}")
+            return {s.pod_id: 1.0 for s in sessions}
+
+    def _checked_pages(self, pages: Iterable[Path]) -> Iterator[Tuple[Path, bool]]:
+        """
+        Yields ``(page, done)`` in page order, hashing up to ``hash_workers`` pages at a time
+        a little ahead of the consumer, so shards can be queued while later pages hash.
+        """
+        executor = ThreadPoolExecutor(max_workers=self.hash_workers)
+        ahead = deque()
+        try:
+            for page in map(Path, pages):
+                ahead.append((page, executor.submit(self.manifest.page_done, page, self.output_dir)))
+                if len(ahead) > 2 * self.hash_workers:
+                    page, done = ahead.popleft()
+                    yield page, done.result()
+            while ahead:
+                page, done = ahead.popleft()
+                yield page, done.result()
+        finally:
+            # A consumer that stops early doesn't wait for pages it never looks at
+            for _, done in ahead:
+                done.cancel()
+            executor.shutdown()
+
+    def _pending_pages(self, pages: Iterable[Path]) -> Iterator[Path]:
+        skipped = 0
+        for page, done in self._checked_pages(pages):
+            if done:
+                skipped += 1
+            else:
+                yield page
+        if skipped:
+            print(f"⏭️ {skipped} pages already upscaled in an earlier run")
+
     def run(self):
-        print("🗜️ Zipping input directory...")
-        tmp_zip_dir = Path(tempfile.mkdtemp())
-        zip_name = self.input_dir.name + ".zip"
-        input_zip = tmp_zip_dir / zip_name
-
-        shutil.make_archive(
-            input_zip.with_suffix('').as_posix(),
-            'zip',
-            root_dir=self.input_dir.parent,
-            base_dir=self.input_dir.name
-        )
-        print(f"✅ Input zipped to {input_zip}")
+        self.manifest = UpscaleManifest.for_output_dir(self.output_dir)
+        pages = self._pages()
+        # Stops at the first page still to do; hashes stay cached for the feeding loop
+        if isinstance(pages, list) and all(done for _, done in self._checked_pages(pages)):
+            print(f"✅ All {len(pages)} pages already upscaled in {self.output_dir}")
+            self.manifest.mark_complete()
+            return
+        self.manifest.mark_complete(False)
 
         print("🚀 Creating RunPod session...")
-        session = RunPodClientSessionFactory.create_session(
-            pod_id=self.runpod_pod_id,
-            container_port=self.container_port,
-            upload_method=self.upload_method
-        )
+        with self.stage_report.stage("pod start") as details:
+            sessions = self._start_sessions()
+            details["pods"] = len(sessions)
 
+        scheduler = ShardScheduler()
         try:
-            print("📤 Uploading input zip to RunPod...")
-            input_path = session.upload_file(input_zip)
-            print(f"✅ File uploaded: {input_path}")
+            self._transfer_slots = threading.Semaphore(self.parallel_transfers)
+            slots = worker_slots(self._pod_weights(sessions), self.max_concurrent_shards)
+
+            # Every shard runs upload -> job -> download on its own, so while one shard is
+            # computing on the GPU the next is uploading and a finished one is downloading.
+            # Workers of all pods pull from one queue, so faster pods take more shards
+            with self.stage_report.stage("shards") as details, ExitStack() as uploaders:
+                with ThreadPoolExecutor(max_workers=sum(slots.values())) as executor:
+                    for session in sessions:
+                        # Closed when the stage ends, taking the shard zips' work dir with it
+                        uploader = uploaders.enter_context(ShardUploader(
+                            session.file_uploader,
+                            arc_dir=self.input_dir.name,
+                            parallel_transfers=self.parallel_transfers
+                        ))
+                        print(f"🖥️ Pod {session.pod_id}: {slots[session.pod_id]} concurrent shards")
+                        for _ in range(slots[session.pod_id]):
+                            executor.submit(self._pod_worker, session, uploader, scheduler)
+
+                    shards = []
+                    try:
+                        for shard in iter_shards(self._pending_pages(pages), self.shard_size,
+                                                 prefix=self.input_dir.name):
+                            shards.append(shard)
+                            scheduler.add(shard)
+                    finally:
+                        # Reading a page can fail part-way; the workers must still be let go,
+                        # or leaving the executor waits on them forever
+                        scheduler.close()
 
-            client = session.client
+                details["shards"] = len(shards)
+                details["pages"] = sum(len(shard.pages) for shard in shards)
+
+            failed = scheduler.unfinished()
+            if failed:
+                raise RuntimeError(f"{len(failed)} of {len(shards)} shards failed: "
+                                   f"{', '.join(shard.name for shard in failed)}")
+            self.manifest.mark_complete()
+            print(f"✅ Output downloaded to {self.output_dir}")
+
+        finally:
+            self._end_sessions(sessions, scheduler.dead_pods)
+            print(self.stage_report.summary())
+
+    def _pod_worker(self, session: RunPodClientSession, uploader: ShardUploader, scheduler: ShardScheduler):
+        while True:
+            shard = scheduler.take(session.pod_id)
+            if shard is None:
+                return
+            try:
+                self._process_shard(session, uploader, shard)
+                scheduler.done(shard)
+            except Exception as e:
+                if session.client.is_healthy():
+                    print(f"❌ Shard {shard.name} failed on pod {session.pod_id}: {e}")
+                    scheduler.fail(shard)
+                else:
+                    print(f"💀 Pod {session.pod_id} stopped responding, reassigning {shard.name}: {e}")
+                    scheduler.pod_died(session.pod_id, shard)
+                    return
+
+    def _process_shard(self, session, uploader: ShardUploader, shard: Shard):
+        client = session.client
+        # Content-addressed, so a re-run finds the same zip on the pod and job in the bucket.
+        # A copy: the scheduler's shard keeps its name for a retry on another pod
+        key = self.manifest.shard_key(shard)
+        shard = replace(shard, name=f"{shard.name}_{key[:12]}")
+        done = self.manifest.shard(key)
+        url_generator = self.url_generator or GcsSignedUrlGenerator()
+
+        job_id = done.get("job_id")
+        if job_id and url_generator.blob_exists(self.gcs_bucket_name, f"jobs/{job_id}_out.zip"):
+            print(f"⏭️ {shard.name} was upscaled by job {job_id}, downloading its output")
+        else:
+            input_path = done.get("remote_path")
+            if input_path and uploader.file_uploader.remote_exists(input_path):
+                print(f"⏭️ {shard.name} is already on the pod at {input_path}")
+            else:
+                with self._transfer_slots:
+                    start = time.perf_counter()
+                    input_path = uploader.upload_shard(shard)
+                    self.stage_report.record_item("upload", time.perf_counter() - start)
+                self.manifest.update_shard(key, remote_path=input_path)
 
-            print("📝 Creating job...")
             # Extract just the filename from the path
             filename = os.path.basename(input_path)
             job_id = client.create_job(
@@ -70,31 +265,49 @@ class RunPodBatchRunner:
                 gcs_credentials_path=self.gcs_credentials_path,
                 gcs_bucket_name=self.gcs_bucket_name
             )
-            print(f"✅ Job submitted: {job_id}")
+            self.manifest.update_shard(key, job_id=job_id)
+            print(f"✅ Job submitted for {shard.name}: {job_id}")
 
+            start = time.perf_counter()
             status = client.wait_for_completion(job_id)
+            self.stage_report.record_item("upscale", time.perf_counter() - start)
+            if status["status"] != "completed":
+                raise RuntimeError(f"job {job_id} failed with error: {status.get('error')}")
 
-            if status["status"] == "completed":
-                print("📥 Downloading output...")
-                download_url = GcsSignedUrlGenerator().generate_signed_url(self.gcs_bucket_name, f"jobs/{job_id}_out.zip")
-
-                output_zip_path = session.download_output_zip(download_url)
-                self._unzip_to_output(output_zip_path)
-                self._delete_zip(output_zip_path)
+        with self._transfer_slots:
+            start = time.perf_counter()
+            download_url = url_generator.generate_signed_url(self.gcs_bucket_name, f"jobs/{job_id}_out.zip")
+            outputs = self._fetch_output(session, download_url)
+            self.stage_report.record_item("download", time.perf_counter() - start)
 
-                print(f"✅ Output downloaded to {self.output_dir}")
-            else:
-                print(f"❌ Job failed with error: {status.get('error')}")
+        self.manifest.record_outputs(shard.pages, outputs)
+        print(f"📥 {shard.name} merged into {self.output_dir}")
 
-        finally:
-            print("🧹 Cleaning up: Stopping pod...")
-            session.stop_pod()
+    def _fetch_output(self, session: RunPodClientSession, download_url: str) -> List[str]:
+        try:
+            return session.stream_output(download_url, self.output_dir, connections=self.download_connections)
+        except RangeNotSupported as e:
+            print(f"⚠️ Streaming download unavailable ({e}), downloading the whole zip")
+            output_zip_path = session.download_output_zip(download_url)
+            outputs = self._unzip_to_output(output_zip_path)
+            self._delete_zip(output_zip_path)
+            return outputs
 
-    def _unzip_to_output(self, zip_path: Path):
+    def _unzip_to_output(self, zip_path: Path) -> List[str]:
         print(f"📂 Unzipping {zip_path} to {self.output_dir}...")
-        shutil.unpack_archive(str(zip_path), extract_dir=str(self.output_dir))
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        # Shard outputs are flattened into one folder, keeping each page's own file name
+        written = []
+        with zipfile.ZipFile(zip_path) as zf:
+            for info in zf.infolist():
+                if info.is_dir():
+                    continue
+                name = Path(info.filename).name
+                with zf.open(info) as src, open(self.output_dir / name, "wb") as dst:
+                    shutil.copyfileobj(src, dst)
+                written.append(name)
+        return written
 
     def _delete_zip(self, zip_path: Path):
         print(f"🗑️ Deleting temporary zip {zip_path}...")
         zip_path.unlink()
-
@@ -3,10 +3,11 @@ import threading
 import time
 from abc import ABC, abstractmethod
 from pathlib import Path
-from typing import Optional
+from typing import List, Optional
 
 from book_automation.externals.real_esrgan_client import RealESRGANClient
 from book_automation.processor.cloud.file_uploader import FileUploader, SCPFileUploader
+from book_automation.processor.cloud.streaming_zip_fetcher import StreamingZipFetcher
 
 
 class RunPodClientSession:
@@ -53,3 +54,9 @@ class RunPodClientSession:
         print(f"✅ Output zip downloaded to {output_zip_path}")
         return output_zip_path
 
+    def stream_output(self, download_url: str, output_dir: Path, connections: int = 8) -> List[str]:
+        """
+        Unpack the output zip into ``output_dir`` while it downloads, without a temporary
+        copy. Raises RangeNotSupported when the URL can't be read in ranges.
+        """
+        return StreamingZipFetcher(output_dir, connections=connections).fetch(download_url)
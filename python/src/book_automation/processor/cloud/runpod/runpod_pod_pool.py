@@ -0,0 +1,194 @@
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, Optional
+
+from book_automation.processor.cloud.runpod.runpod_client_session import RunPodClientSession
+from book_automation.processor.cloud.runpod.runpod_session_factory import \
+    RunPodClientSessionFactory, FileUploadMethod
+
+
+@dataclass
+class _PooledPod:
+    pod_id: str
+    session: Optional[RunPodClientSession] = None
+    started_at: float = 0.0
+    idle_since: float = 0.0
+    in_use: bool = False
+    starting: bool = False
+
+
+class RunPodPodPool:
+    """
+    Keeps RunPod sessions warm across books.
+
+    Runners ``acquire`` a session instead of creating one, and ``release`` it instead of
+    stopping the pod, so a batch of books pays the pod cold start once per pod rather than
+    once per book. Concurrent runners each get their own pod; when every pod is busy,
+    ``acquire`` waits for one to be released.
+
+    A pod is stopped when it has sat idle for ``idle_timeout`` seconds (the queue of books
+    has drained), or on release once it has been running for ``max_lifetime`` seconds, as a
+    guard against a pod left billing for hours. A pod released as unhealthy is stopped
+    right away, so the next book starts a fresh one instead of reusing it. ``shutdown``
+    stops everything that is left.
+    """
+
+    def __init__(self,
+                 pod_ids: Iterable[str],
+                 container_port: int = 5000,
+                 upload_method: FileUploadMethod = FileUploadMethod.SCP,
+                 idle_timeout: float = 600,
+                 max_lifetime: float = 4 * 3600,
+                 reap_interval: float = 30,
+                 session_factory: Optional[Callable[..., RunPodClientSession]] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        self.container_port = container_port
+        self.upload_method = upload_method
+        self.idle_timeout = idle_timeout
+        self.max_lifetime = max_lifetime
+        self.reap_interval = reap_interval
+        self.session_factory = session_factory or RunPodClientSessionFactory.create_session
+        self.clock = clock
+
+        self._pods: Dict[str, _PooledPod] = {pod_id: _PooledPod(pod_id) for pod_id in pod_ids}
+        if not self._pods:
+            raise ValueError("RunPodPodPool needs at least one pod id")
+        self._condition = threading.Condition()
+        self._closed = False
+        self._reaper: Optional[threading.Thread] = None
+
+    @property
+    def size(self) -> int:
+        return len(self._pods)
+
+    def has_warm_pod(self) -> bool:
+        with self._condition:
+            return any(p.session is not None and not p.in_use for p in self._pods.values())
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.shutdown()
+
+    def _take_pod(self) -> Optional[_PooledPod]:
+        # Prefer a warm pod; only start a cold one when none is free
+        free = [p for p in self._pods.values() if not p.in_use and not p.starting]
+        warm = [p for p in free if p.session is not None]
+        pod = (warm or free or [None])[0]
+        if pod is not None:
+            pod.in_use = True
+            pod.starting = pod.session is None
+        return pod
+
+    def acquire(self, timeout: Optional[float] = None) -> RunPodClientSession:
+        deadline = None if timeout is None else self.clock() + timeout
+        with self._condition:
+            while True:
+                if self._closed:
+                    raise RuntimeError("RunPodPodPool has been shut down")
+                pod = self._take_pod()
+                if pod is not None:
+                    break
+                remaining = None if deadline is None else deadline - self.clock()
+                if remaining is not None and remaining <= 0:
+                    raise TimeoutError("No RunPod pod became free in time")
+                self._condition.wait(remaining)
+
+        if pod.session is not None:
+            print(f"♻️ Reusing warm pod {pod.pod_id}")
+            return pod.session
+
+        # Start outside the lock; other runners can keep taking and releasing pods meanwhile
+        try:
+            session = self.session_factory(
+                pod_id=pod.pod_id,
+                container_port=self.container_port,
+                upload_method=self.upload_method
+            )
+        except Exception:
+            with self._condition:
+                pod.in_use = pod.starting = False
+                self._condition.notify_all()
+            raise
+
+        with self._condition:
+            pod.session = session
+            pod.started_at = self.clock()
+            pod.starting = False
+            self._start_reaper()
+        return session
+
+    def release(self, session: RunPodClientSession, healthy: bool = True):
+        with self._condition:
+            pod = self._pods[session.pod_id]
+            pod.in_use = False
+            pod.idle_since = self.clock()
+            # After shutdown the pod has already been stopped
+            expired = not self._closed and self.clock() - pod.started_at >= self.max_lifetime
+            evict = not self._closed and (expired or not healthy)
+            if evict:
+                pod.session = None
+            self._condition.notify_all()
+
+        if evict:
+            if healthy:
+                print(f"⏰ Pod {pod.pod_id} reached its max lifetime")
+            else:
+                print(f"💀 Pod {pod.pod_id} stopped responding, not keeping it warm")
+            session.stop_pod()
+
+    @contextmanager
+    def session(self, timeout: Optional[float] = None):
+        session = self.acquire(timeout)
+        try:
+            yield session
+        finally:
+            self.release(session)
+
+    def reap(self):
+        """
+        Stop warm pods that have been idle for longer than ``idle_timeout``.
+        """
+        to_stop = []
+        with self._condition:
+            now = self.clock()
+            for pod in self._pods.values():
+                if pod.session is not None and not pod.in_use and now - pod.idle_since >= self.idle_timeout:
+                    to_stop.append(pod.session)
+                    pod.session = None
+
+        for session in to_stop:
+            print(f"💤 Pod {session.pod_id} idle for {self.idle_timeout:.0f} s")
+            session.stop_pod()
+
+    def _start_reaper(self):
+        if self._reaper is None:
+            self._reaper = threading.Thread(target=self._reap_loop, name="runpod-pod-reaper", daemon=True)
+            self._reaper.start()
+
+    def _reap_loop(self):
+        while True:
+            with self._condition:
+                if self._closed:
+                    return
+                self._condition.wait(self.reap_interval)
+                if self._closed:
+                    return
+            self.reap()
+
+    def shutdown(self):
+        """
+        Stop every running pod. Sessions still held by runners are stopped as well.
+        """
+        with self._condition:
+            self._closed = True
+            sessions = [p.session for p in self._pods.values() if p.session is not None]
+            for pod in self._pods.values():
+                pod.session = None
+            self._condition.notify_all()
+
+        for session in sessions:
+            session.stop_pod()
@@ -15,6 +15,9 @@ from book_automation.processor.cloud.runpod.runpod_client_session import (
 )
 
 
+PROXY_URL_TEMPLATE = "https://{pod_id}-{port}.proxy.runpod.net/"
+
+
 class FileUploadMethod(Enum):
     SCP = auto()
     RUNPODCTL = auto()
@@ -30,7 +33,8 @@ class RunPodClientSessionFactory:
             ssh_user: str = "root") -> RunPodClientSession:
         RunPodClientSessionFactory._launch_pod(pod_id)
         
-        server_url = f"https://{pod_id}-{container_port}.proxy.runpod.net/"
+        server_url = os.getenv("RUNPOD_PROXY_URL_TEMPLATE", PROXY_URL_TEMPLATE).format(
+            pod_id=pod_id, port=container_port)
         RunPodClientSessionFactory._wait_for_ready(server_url)
         print(f"🌍 Connected to server at {server_url}")
         client = RealESRGANClient(server_url)
@@ -59,8 +63,19 @@ class RunPodClientSessionFactory:
         ])
 
     @staticmethod
-    def _wait_for_ready(server_url):
+    def _wait_for_ready(server_url, timeout: float = 900, max_interval: float = 15):
         url = (server_url + "health")
-        while requests.get(url).status_code != 200:
-            time.sleep(5)
+        deadline = time.monotonic() + timeout
+        interval = 1.0
+        while True:
+            try:
+                if requests.get(url, timeout=10).status_code == 200:
+                    return
+            except requests.RequestException:
+                # The proxy refuses connections until the container is up
+                pass
+            if time.monotonic() >= deadline:
+                raise TimeoutError(f"Server at {server_url} not ready after {timeout:.0f} s")
+            time.sleep(interval)
+            interval = min(interval * 1.5, max_interval)
 
@@ -0,0 +1,113 @@
+import threading
+from collections import Counter, deque
+from typing import Dict, Iterable, List, Optional, Set
+
+from book_automation.processor.cloud.shard_uploader import Shard
+
+
+def gpu_headroom(pod_info: Dict, floor: float = 10.0) -> float:
+    """
+    Free GPU capacity of a pod, in percent summed over its GPUs, from
+    ``RunPodGraphQlClient.get_pod_info``. Never below ``floor`` so a busy pod still gets work.
+    """
+    gpus = ((pod_info or {}).get("runtime") or {}).get("gpus") or []
+    headroom = sum(100.0 - (gpu.get("gpuUtilPercent") or 0.0) for gpu in gpus)
+    return max(floor, headroom) if gpus else floor
+
+
+def worker_slots(weights: Dict[str, float], total_slots: int) -> Dict[str, int]:
+    """
+    Split ``total_slots`` concurrent shards between pods in proportion to their weights,
+    with at least one slot per pod.
+    """
+    weight_sum = sum(weights.values()) or 1.0
+    return {pod_id: max(1, round(total_slots * weight / weight_sum)) for pod_id, weight in weights.items()}
+
+
+class ShardScheduler:
+    """
+    Shared queue of shards for the workers of several pods.
+
+    Workers pull the next shard when they have capacity, so faster pods naturally take
+    more of the book. Shards can be added while workers are already running. A shard that
+    was running on a pod that died is put back at the front of the queue for another pod,
+    up to ``max_attempts`` times; a shard whose job itself failed is not retried.
+    """
+
+    def __init__(self, max_attempts: int = 3):
+        self.max_attempts = max_attempts
+        self.failed: List[Shard] = []
+        self.dead_pods: Set[str] = set()
+        self._condition = threading.Condition()
+        self._queue = deque()
+        self._in_flight = 0
+        self._closed = False
+        self._attempts = Counter()
+
+    def add(self, shard: Shard):
+        with self._condition:
+            self._queue.append(shard)
+            self._condition.notify()
+
+    def add_all(self, shards: Iterable[Shard]):
+        for shard in shards:
+            self.add(shard)
+        self.close()
+
+    def close(self):
+        """
+        No more shards will be added; workers stop once the queue has drained.
+        """
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+
+    def take(self, pod_id: str) -> Optional[Shard]:
+        """
+        Block until a shard is available for ``pod_id``. Returns None once every shard is
+        done, or when the pod has been marked dead.
+        """
+        with self._condition:
+            while True:
+                if pod_id in self.dead_pods:
+                    return None
+                if self._queue:
+                    self._in_flight += 1
+                    shard = self._queue.popleft()
+                    self._attempts[shard.index] += 1
+                    return shard
+                # In-flight shards may still come back if their pod dies
+                if self._closed and self._in_flight == 0:
+                    return None
+                self._condition.wait()
+
+    def done(self, shard: Shard):
+        with self._condition:
+            self._in_flight -= 1
+            self._condition.notify_all()
+
+    def fail(self, shard: Shard):
+        with self._condition:
+            self._in_flight -= 1
+            self.failed.append(shard)
+            self._condition.notify_all()
+
+    def pod_died(self, pod_id: str, shard: Shard):
+        """
+        Mark ``pod_id`` dead and hand the shard it was working on to the remaining pods.
+        """
+        with self._condition:
+            self.dead_pods.add(pod_id)
+            self._in_flight -= 1
+            if self._attempts[shard.index] >= self.max_attempts:
+                self.failed.append(shard)
+            else:
+                self._queue.appendleft(shard)
+            self._condition.notify_all()
+
+    def unfinished(self) -> List[Shard]:
+        """
+        Failed shards plus any left in the queue because every pod died.
+        """
+        with self._condition:
+            return self.failed + list(self._queue)
@@ -0,0 +1,91 @@
+import os
+import shutil
+import tempfile
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from book_automation.processor.cloud.file_uploader import FileUploader
+
+
+@dataclass
+class Shard:
+    index: int
+    name: str
+    pages: List[Path] = field(default_factory=list)
+
+    @property
+    def size_bytes(self) -> int:
+        return sum(os.path.getsize(p) for p in self.pages)
+
+
+def iter_shards(pages: Iterable[Path], shard_size: int, prefix: str) -> Iterator[Shard]:
+    """
+    Group pages into shards of ``shard_size`` as they arrive, so a shard can be shipped
+    while later pages are still being produced.
+    """
+    shard = Shard(0, f"{prefix}_{0:04d}")
+    for page in pages:
+        shard.pages.append(Path(page))
+        if len(shard.pages) == shard_size:
+            yield shard
+            shard = Shard(shard.index + 1, f"{prefix}_{shard.index + 1:04d}")
+    if shard.pages:
+        yield shard
+
+
+class ShardUploader:
+    """
+    Packs shards into stored (uncompressed) zips and uploads them, several at a time.
+
+    PNG/TIFF pages are already compressed, so deflating them costs CPU for almost no size
+    gain; a stored zip is written at disk speed. Each shard zip is removed once uploaded,
+    and a work directory the uploader created itself is removed on ``close``.
+    """
+
+    def __init__(self,
+                 file_uploader: FileUploader,
+                 arc_dir: str,
+                 parallel_transfers: int = 4,
+                 work_dir: Optional[Path] = None):
+        self.file_uploader = file_uploader
+        # Directory name pages are stored under inside each zip, as the job server expects
+        self.arc_dir = arc_dir
+        self.parallel_transfers = parallel_transfers
+        self._owns_work_dir = work_dir is None
+        self.work_dir = Path(work_dir) if work_dir else Path(tempfile.mkdtemp(prefix="shards_"))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        if self._owns_work_dir:
+            shutil.rmtree(self.work_dir, ignore_errors=True)
+
+    def pack(self, shard: Shard) -> Path:
+        shard_zip = self.work_dir / f"{shard.name}.zip"
+        with zipfile.ZipFile(shard_zip, "w", zipfile.ZIP_STORED) as zf:
+            for page in shard.pages:
+                zf.write(page, arcname=f"{self.arc_dir}/{page.name}")
+        return shard_zip
+
+    def upload_shard(self, shard: Shard) -> str:
+        shard_zip = self.pack(shard)
+        try:
+            return self.file_uploader.upload_file(shard_zip)
+        finally:
+            shard_zip.unlink(missing_ok=True)
+
+    def upload(self, shards: Iterable[Shard]) -> List[Tuple[Shard, str]]:
+        """
+        Upload every shard with up to ``parallel_transfers`` concurrent transfers and return
+        ``(shard, remote_path)`` pairs in shard order.
+        """
+        with ThreadPoolExecutor(max_workers=self.parallel_transfers) as executor:
+            futures = [(shard, executor.submit(self.upload_shard, shard)) for shard in shards]
+            return [(shard, future.result()) for shard, future in futures]
@@ -0,0 +1,182 @@
+import io
+import os
+import re
+import struct
+import zipfile
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import List, Optional
+
+import requests
+from tqdm import tqdm
+
+LOCAL_HEADER = struct.Struct("<4sHHHHHIIIHH")
+LOCAL_HEADER_SIGNATURE = b"PK\x03\x04"
+TAIL_BYTES = 1 << 16
+CHUNK_BYTES = 1 << 20
+
+
+class RangeNotSupported(Exception):
+    pass
+
+
+class HttpRangeFile(io.RawIOBase):
+    """
+    Read-only, seekable view of a remote file through HTTP Range requests; enough for
+    ``zipfile`` to read the central directory without downloading the archive. The tail
+    of the file, where the central directory lives, is fetched once up front.
+    """
+
+    def __init__(self, url: str, session: requests.Session, timeout: float = 60):
+        self.url = url
+        self.session = session
+        self.timeout = timeout
+        self._pos = 0
+
+        response = session.get(url, headers={"Range": f"bytes=-{TAIL_BYTES}"}, timeout=timeout)
+        match = re.match(r"bytes (\d+)-\d+/(\d+)", response.headers.get("Content-Range", ""))
+        if response.status_code != 206 or not match:
+            raise RangeNotSupported(f"{url} does not support range requests")
+        self._tail_start = int(match.group(1))
+        self._tail = response.content
+        self.size = int(match.group(2))
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self._pos
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_SET:
+            self._pos = offset
+        elif whence == io.SEEK_CUR:
+            self._pos += offset
+        else:
+            self._pos = self.size + offset
+        return self._pos
+
+    def read(self, size=-1):
+        end = self.size if size is None or size < 0 else min(self.size, self._pos + size)
+        if self._pos >= end:
+            return b""
+        if self._pos >= self._tail_start:
+            data = self._tail[self._pos - self._tail_start:end - self._tail_start]
+        else:
+            response = self.session.get(self.url, headers={"Range": f"bytes={self._pos}-{end - 1}"},
+                                        timeout=self.timeout)
+            response.raise_for_status()
+            data = response.content
+        self._pos += len(data)
+        return data
+
+
+class StreamingZipFetcher:
+    """
+    Unpacks a remote zip straight into ``output_dir`` without first saving the archive.
+
+    The central directory is read from the end of the file, then every member is fetched
+    with its own Range request, several at a time, and inflated into ``output_dir`` while
+    its bytes arrive. Each page is written to a ``.part`` file and renamed once its CRC
+    matches, so an interrupted fetch resumes by skipping pages that are already complete.
+    Member paths are flattened to their file names.
+    """
+
+    def __init__(self,
+                 output_dir: Path,
+                 connections: int = 8,
+                 session: Optional[requests.Session] = None,
+                 timeout: float = 60):
+        self.output_dir = output_dir
+        self.connections = connections
+        self.session = session or requests.Session()
+        self.timeout = timeout
+
+    def fetch(self, url: str) -> List[str]:
+        """
+        Returns:
+            Names of the files in ``output_dir`` that came from the archive
+
+        Raises:
+            RangeNotSupported: if the server can't serve byte ranges
+        """
+        remote = HttpRangeFile(url, self.session, self.timeout)
+        with zipfile.ZipFile(remote) as zf:
+            members = sorted((i for i in zf.infolist() if not i.is_dir()), key=lambda i: i.header_offset)
+            central_directory_start = zf.start_dir
+        for info in members:
+            if info.compress_type not in (zipfile.ZIP_STORED, zipfile.ZIP_DEFLATED):
+                raise RangeNotSupported(f"{info.filename}: unsupported compression {info.compress_type}")
+
+        # A member's local record ends where the next one starts
+        ends = [m.header_offset for m in members[1:]] + [central_directory_start]
+
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        with ThreadPoolExecutor(max_workers=self.connections) as executor:
+            futures = [executor.submit(self._fetch_member, url, info, end) for info, end in zip(members, ends)]
+            for future in tqdm(futures, desc="Downloading pages", unit="page"):
+                future.result()
+        return [Path(info.filename).name for info in members]
+
+    def _complete(self, info: zipfile.ZipInfo, dest: Path) -> bool:
+        if not dest.exists() or dest.stat().st_size != info.file_size:
+            return False
+        crc = 0
+        with open(dest, "rb") as f:
+            for chunk in iter(lambda: f.read(CHUNK_BYTES), b""):
+                crc = zlib.crc32(chunk, crc)
+        return crc == info.CRC
+
+    def _fetch_member(self, url: str, info: zipfile.ZipInfo, end: int):
+        dest = self.output_dir / Path(info.filename).name
+        if self._complete(info, dest):
+            return
+
+        part = dest.with_name(dest.name + ".part")
+        headers = {"Range": f"bytes={info.header_offset}-{end - 1}"}
+        with self.session.get(url, headers=headers, stream=True, timeout=self.timeout) as response:
+            response.raise_for_status()
+            chunks = response.iter_content(CHUNK_BYTES)
+
+            buffer = b""
+            while len(buffer) < LOCAL_HEADER.size:
+                buffer += next(chunks)
+            fields = LOCAL_HEADER.unpack_from(buffer)
+            if fields[0] != LOCAL_HEADER_SIGNATURE:
+                raise IOError(f"{info.filename}: bad local header")
+            name_length, extra_length = fields[9], fields[10]
+            skip = LOCAL_HEADER.size + name_length + extra_length
+            while len(buffer) < skip:
+                buffer += next(chunks)
+
+            decompressor = zlib.decompressobj(-zlib.MAX_WBITS) if info.compress_type == zipfile.ZIP_DEFLATED else None
+            remaining = info.compress_size
+            crc = 0
+            with open(part, "wb") as out:
+                def write(data: bytes):
+                    nonlocal remaining, crc
+                    data = data[:remaining]
+                    remaining -= len(data)
+                    if decompressor:
+                        data = decompressor.decompress(data)
+                    crc = zlib.crc32(data, crc)
+                    out.write(data)
+
+                write(buffer[skip:])
+                for chunk in chunks:
+                    if remaining <= 0:
+                        break
+                    write(chunk)
+                if decompressor:
+                    tail = decompressor.flush()
+                    crc = zlib.crc32(tail, crc)
+                    out.write(tail)
+
+        if remaining > 0 or crc != info.CRC:
+            part.unlink(missing_ok=True)
+            raise IOError(f"{info.filename}: incomplete or corrupt download")
+        os.replace(part, dest)
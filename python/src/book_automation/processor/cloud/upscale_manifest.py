@@ -0,0 +1,104 @@
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List
+
+from book_automation.processor.cloud.shard_uploader import Shard
+
+
+class UpscaleManifest:
+    """
+    Remembers what an upscale run has already done, keyed by content, so a re-run after a
+    partial failure only redoes what is missing.
+
+    For every page it keeps the SHA-256 of its content (re-hashed only when size or mtime
+    change) and the output file it produced. For every shard, keyed by the hashes of its
+    pages, it keeps the remote path of the uploaded zip and the job id, whose output zip
+    stays in the bucket under ``jobs/<job_id>_out.zip``.
+
+    Stored next to the output folder as ``.<output_dir>.upscale_manifest.json``.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._lock = threading.Lock()
+        if path.exists():
+            with open(path) as f:
+                self._data = json.load(f)
+        else:
+            self._data = {"complete": False, "pages": {}, "shards": {}}
+
+    @classmethod
+    def for_output_dir(cls, output_dir: Path) -> "UpscaleManifest":
+        return cls(output_dir.parent / f".{output_dir.name}.upscale_manifest.json")
+
+    @property
+    def complete(self) -> bool:
+        return self._data["complete"]
+
+    def mark_complete(self, complete: bool = True):
+        with self._lock:
+            self._data["complete"] = complete
+            self._save()
+
+    def page_hash(self, page: Path) -> str:
+        stat = page.stat()
+        with self._lock:
+            cached = self._data["pages"].get(page.name)
+        if cached and cached["size"] == stat.st_size and cached["mtime_ns"] == stat.st_mtime_ns:
+            return cached["sha256"]
+
+        digest = hashlib.sha256()
+        with open(page, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                digest.update(chunk)
+        with self._lock:
+            # New content invalidates whatever output the old content produced
+            self._data["pages"][page.name] = {
+                "size": stat.st_size,
+                "mtime_ns": stat.st_mtime_ns,
+                "sha256": digest.hexdigest(),
+            }
+        return digest.hexdigest()
+
+    def page_done(self, page: Path, output_dir: Path) -> bool:
+        """
+        True when this exact page content was upscaled and its output is still there.
+        """
+        self.page_hash(page)
+        with self._lock:
+            output = self._data["pages"][page.name].get("output")
+        return output is not None and (output_dir / output).exists()
+
+    def shard_key(self, shard: Shard) -> str:
+        digest = hashlib.sha256()
+        for page in shard.pages:
+            digest.update(f"{page.name}:{self.page_hash(page)}\n".encode())
+        return digest.hexdigest()
+
+    def shard(self, key: str) -> Dict:
+        with self._lock:
+            return dict(self._data["shards"].get(key, {}))
+
+    def update_shard(self, key: str, **fields):
+        with self._lock:
+            self._data["shards"].setdefault(key, {}).update(fields)
+            self._save()
+
+    def record_outputs(self, pages: Iterable[Path], outputs: List[str]):
+        # Outputs keep the page's stem; the extension may change (e.g. .tif -> .png)
+        by_stem = {Path(name).stem: name for name in outputs}
+        with self._lock:
+            for page in pages:
+                entry = self._data["pages"].get(page.name)
+                if entry is not None and page.stem in by_stem:
+                    entry["output"] = by_stem[page.stem]
+            self._save()
+
+    def _save(self):
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(self._data, f, indent=1)
+        os.replace(tmp_path, self.path)
@@ -15,7 +15,7 @@ class ImageFolderCsvCreator:
         self.csv_path = Path(csv_path)
     
     def _find_images(self) -> List[Path]:
-        extensions = ['.png', '.jpg', '.jpeg', '.tif', '.tiff', '.bmp']
+        extensions = ['.png', '.jpg', '.jpeg', '.tif', '.tiff', '.bmp', '.pbm']
         
         return sorted([
             p for p in self.img_dir.iterdir() 
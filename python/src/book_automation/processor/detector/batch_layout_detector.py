@@ -1,5 +1,8 @@
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, Iterator, List, Tuple
+
 from PIL import Image
 
 from book_automation.processor.detector.layout_detector import LayoutDetector
@@ -9,33 +12,58 @@ from book_automation.records.layout_elements import LayoutElement
 class BatchLayoutDetector:
     """
     Runs layout detection on every image in a directory, using a pluggable LayoutDetector.
+
+    Pages go to the detector's ``detect_batch`` in groups of ``batch_size``. For remote
+    detectors up to ``max_in_flight`` groups are requested concurrently; local detectors
+    get one group at a time. Results stream out in page order from ``detect_iter``, so at
+    most ``max_in_flight`` groups of pages are held in memory.
     """
 
-    def __init__(self, input_dir: Path, detector: LayoutDetector):
+    VALID_SUFFIXES = {'.png', '.jpg', '.jpeg', '.tiff', '.bmp', '.gif'}
+
+    def __init__(self,
+                 input_dir: Path,
+                 detector: LayoutDetector,
+                 batch_size: int = 1,
+                 max_in_flight: int = 8):
         self.input_dir = input_dir
         self.detector = detector
+        self.batch_size = batch_size
+        self.max_in_flight = max_in_flight if detector.remote else 1
 
     def detect(self) -> Dict[Path, List[LayoutElement]]:
         """
         Returns a dict mapping each image path to its list of detected LayoutElements.
         Only standard raster images are processed.
         """
-        results: Dict[Path, List[LayoutElement]] = {}
-        valid_suffixes = {'.png', '.jpg', '.jpeg', '.tiff', '.bmp', '.gif'}
+        return dict(self.detect_iter())
 
-        for img_path in sorted(self.input_dir.iterdir()):
-            if not img_path.is_file() or img_path.suffix.lower() not in valid_suffixes:
-                continue
-
-            # 1) Load and normalize image
-            with Image.open(img_path) as pil_img:
-                img = pil_img.convert("RGB")
-
-            # 2) Detect layout blocks
-            blocks = self.detector.detect(img)
+    def detect_iter(self) -> Iterator[Tuple[Path, List[LayoutElement]]]:
+        """
+        Yields (image path, LayoutElements) for every image, in sorted path order, as
+        soon as its group is done and every earlier group has been yielded.
+        """
+        paths = [p for p in sorted(self.input_dir.iterdir())
+                 if p.is_file() and p.suffix.lower() in self.VALID_SUFFIXES]
+        batches = [paths[i:i + self.batch_size] for i in range(0, len(paths), self.batch_size)]
 
-            # 3) Store results
-            results[img_path] = blocks
+        with ThreadPoolExecutor(max_workers=self.max_in_flight) as executor:
+            pending = deque()
+            for batch in batches:
+                # Submit no further ahead than max_in_flight groups
+                if len(pending) >= self.max_in_flight:
+                    yield from self._results(*pending.popleft())
+                pending.append((batch, executor.submit(self._detect_batch, batch)))
+            while pending:
+                yield from self._results(*pending.popleft())
 
+    @staticmethod
+    def _results(batch: List[Path], future) -> Iterator[Tuple[Path, List[LayoutElement]]]:
+        yield from zip(batch, future.result())
 
-        return results
+    def _detect_batch(self, batch: List[Path]) -> List[List[LayoutElement]]:
+        images = []
+        for img_path in batch:
+            with Image.open(img_path) as pil_img:
+                images.append(pil_img.convert("RGB"))
+        return self.detector.detect_batch(images)
@@ -1,6 +1,8 @@
 # book_automation/processor/detector/document_ai_layout_detector.py
 
-from typing import List
+from pathlib import Path
+from typing import Dict, List, Sequence
+
 from PIL import Image
 
 from book_automation.processor.detector.layout_detector import LayoutDetector
@@ -9,25 +11,42 @@ from book_automation.records.layout_elements import LayoutElement
 
 
 class DocumentAILayoutDetector(LayoutDetector):
+    remote = True
+
     def __init__(self):
         self.client = DocumentAIClient()
 
     def detect(self, image: Image.Image) -> List[LayoutElement]:
         document = self.client.process_image(image)
         elements: List[LayoutElement] = []
-
         for page in document.pages:
-            for paragraph in page.paragraphs:
-                layout = paragraph.layout
-                xs = [v.x for v in layout.bounding_poly.vertices]
-                ys = [v.y for v in layout.bounding_poly.vertices]
-                bbox = (min(xs), min(ys), max(xs), max(ys))
-                elements.append(
-                    LayoutElement(
-                        type="paragraph",
-                        bbox=bbox,
-                        confidence=layout.confidence
-                    )
-                )
+            elements.extend(self._elements(page))
+        return elements
 
+    def detect_batch(self, images: List[Image.Image]) -> List[List[LayoutElement]]:
+        # Up to the processor's page limit per request instead of one request per page
+        return [self._elements(page) for page in self.client.process_images(images)]
+
+    def detect_book(self, image_paths: Sequence[Path], gcs_prefix: str) -> Dict[Path, List[LayoutElement]]:
+        """
+        Detect layout on a whole book with one asynchronous Document AI batch request.
+        """
+        pages = self.client.batch_process_images(image_paths, gcs_prefix)
+        return {Path(path): self._elements(page) for path, page in zip(image_paths, pages)}
+
+    @staticmethod
+    def _elements(page) -> List[LayoutElement]:
+        elements: List[LayoutElement] = []
+        for paragraph in page.paragraphs:
+            layout = paragraph.layout
+            xs = [v.x for v in layout.bounding_poly.vertices]
+            ys = [v.y for v in layout.bounding_poly.vertices]
+            bbox = (min(xs), min(ys), max(xs), max(ys))
+            elements.append(
+                LayoutElement(
+                    type="paragraph",
+                    bbox=bbox,
+                    confidence=layout.confidence
+                )
+            )
         return elements
@@ -7,9 +7,21 @@ from book_automation.records.layout_elements import LayoutElement
 
 
 class LayoutDetector(ABC):
+    # Remote detectors spend their time waiting on the network, so BatchLayoutDetector
+    # keeps several requests in flight; local models run one batch at a time
+    remote: bool = False
+
     @abstractmethod
     def detect(self, image: Image.Image) -> List[LayoutElement]:
         """
         Given a PIL image, returns a list of LayoutElements.
         """
         pass
+
+    def detect_batch(self, images: List[Image.Image]) -> List[List[LayoutElement]]:
+        """
+        Detect layout on several images at once, returning one list per image in the same
+        order. Detectors that can run true batched inference (or pack several pages into
+        one request) override this; the default detects the images one by one.
+        """
+        return [self.detect(image) for image in images]
@@ -0,0 +1,99 @@
+from typing import Optional, Tuple
+
+import numpy as np
+from PIL import Image
+
+from book_automation.processor.image.adaptive_threshold_processor import otsu_threshold
+from book_automation.processor.image.page_log import append_jsonl, page_name
+
+# Nothing lighter than this counts as ink, however the page's histogram splits
+MAX_INK_LEVEL = 160
+
+
+def _trim_bed(profile: np.ndarray, max_ink: float) -> Tuple[int, int]:
+    """
+    Index range left after dropping the mostly-dark rows/columns at both ends of a 1-D
+    ink profile: the scanner bed or the shadow of the page edge, not text.
+    """
+    start, stop = 0, len(profile)
+    while start < stop and profile[start] > max_ink:
+        start += 1
+    while stop > start and profile[stop - 1] > max_ink:
+        stop -= 1
+    return start, stop
+
+
+def _content_span(profile: np.ndarray, min_ink: float) -> Optional[Tuple[int, int]]:
+    content = np.nonzero(profile >= min_ink)[0]
+    if len(content) == 0:
+        return None
+    return int(content[0]), int(content[-1]) + 1
+
+
+class ContentBoundsCropper:
+    """
+    Crops a page to the bounding box of its content plus ``margin`` pixels, so scanner
+    bed and blank margins don't travel through deskew, classification, upscaling and
+    thresholding.
+
+    The box comes from row and column ink profiles of an Otsu-binarized thumbnail whose
+    longer side is ``thumbnail_size`` pixels: rows and columns with at least
+    ``min_ink`` of their pixels dark hold content, and runs of more than ``max_ink`` at
+    the page ends are treated as scanner bed and trimmed. Pages where no content is
+    found are returned uncropped.
+
+    When ``log_path`` is set, every page's crop box (left, top, right, bottom, in source
+    pixels) and source size are appended to it as a JSON line.
+    """
+
+    def __init__(self,
+                 margin: int = 60,
+                 min_ink: float = 0.005,
+                 max_ink: float = 0.6,
+                 thumbnail_size: int = 800,
+                 log_path: Optional[str] = None):
+        self.margin = margin
+        self.min_ink = min_ink
+        self.max_ink = max_ink
+        self.thumbnail_size = thumbnail_size
+        self.log_path = log_path
+
+    def content_box(self, img: Image.Image) -> Optional[Tuple[int, int, int, int]]:
+        thumbnail = img.convert("L")
+        thumbnail.thumbnail((self.thumbnail_size, self.thumbnail_size), Image.BILINEAR)
+        # On a blank page Otsu splits paper noise in two; capping the level keeps that out
+        ink = np.asarray(thumbnail) <= min(otsu_threshold(thumbnail.histogram()), MAX_INK_LEVEL)
+
+        # Trim the bed off one axis before measuring the other, so a dark strip along
+        # one side doesn't register as ink in every row or column across it
+        top, bottom = _trim_bed(ink.mean(axis=1), self.max_ink)
+        left, right = _trim_bed(ink[top:bottom].mean(axis=0), self.max_ink)
+        inner_top, inner_bottom = _trim_bed(ink[top:bottom, left:right].mean(axis=1), self.max_ink)
+        top, bottom = top + inner_top, top + inner_bottom
+        page = ink[top:bottom, left:right]
+        if page.size == 0:
+            return None
+
+        rows = _content_span(page.mean(axis=1), self.min_ink)
+        columns = _content_span(page.mean(axis=0), self.min_ink)
+        if rows is None or columns is None:
+            return None
+        rows = (rows[0] + top, rows[1] + top)
+        columns = (columns[0] + left, columns[1] + left)
+
+        scale_x = img.width / thumbnail.width
+        scale_y = img.height / thumbnail.height
+        return (
+            max(int(columns[0] * scale_x) - self.margin, 0),
+            max(int(rows[0] * scale_y) - self.margin, 0),
+            min(int(np.ceil(columns[1] * scale_x)) + self.margin, img.width),
+            min(int(np.ceil(rows[1] * scale_y)) + self.margin, img.height),
+        )
+
+    def process(self, img: Image.Image) -> Image.Image:
+        box = self.content_box(img)
+        if self.log_path:
+            append_jsonl(self.log_path, {"page": page_name(img), "box": box, "size": list(img.size)})
+        if box is None or box == (0, 0, img.width, img.height):
+            return img
+        return img.crop(box)
@@ -0,0 +1,26 @@
+import json
+import os
+from pathlib import Path
+from typing import Dict
+
+from PIL import Image
+
+# Carried in ``img.info``, which crop/rotate copy to their results, so processors later in
+# a chain still know which page they are looking at
+PAGE_INFO_KEY = "source_page"
+
+
+def page_name(img: Image.Image) -> str:
+    name = img.info.get(PAGE_INFO_KEY) or Path(getattr(img, "filename", "") or "").name
+    img.info[PAGE_INFO_KEY] = name
+    return name
+
+
+def append_jsonl(path: str, record: Dict):
+    line = json.dumps(record) + "\n"
+    # One write on an O_APPEND descriptor, so lines from parallel workers don't interleave
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+    try:
+        os.write(fd, line.encode())
+    finally:
+        os.close(fd)
@@ -0,0 +1,96 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Iterable, Optional
+
+import numpy as np
+import onnxruntime as ort
+from PIL import Image
+from tqdm import tqdm
+
+from book_automation.processor.upscaler.tiling import tiled_inference
+from book_automation.processor.upscaler.upscaler import Upscaler
+
+# One inference session per worker process, created by the pool initializer
+_session: Optional[ort.InferenceSession] = None
+
+
+def _init_worker(model_path: str, threads: int):
+    global _session
+    options = ort.SessionOptions()
+    options.intra_op_num_threads = threads
+    options.inter_op_num_threads = 1
+    _session = ort.InferenceSession(model_path, options, providers=["CPUExecutionProvider"])
+
+
+def _infer(batch: np.ndarray) -> np.ndarray:
+    input_name = _session.get_inputs()[0].name
+    return _session.run(None, {input_name: batch})[0]
+
+
+def _upscale_page(input_path: Path, output_path: Path, tile: int, pad: int) -> Path:
+    with Image.open(input_path) as img:
+        mode = img.mode
+        rgb = np.asarray(img.convert("RGB"), dtype=np.float32) / 255.0
+
+    output = tiled_inference(rgb.transpose(2, 0, 1), _infer, tile=tile, pad=pad)
+    output = (np.clip(output.transpose(1, 2, 0), 0.0, 1.0) * 255.0).round().astype(np.uint8)
+
+    result = Image.fromarray(output)
+    # Grayscale scans stay grayscale; the model itself only takes RGB
+    if mode in ("L", "1"):
+        result = result.convert("L")
+    result.save(output_path)
+    return output_path
+
+
+class CpuUpscaler(Upscaler):
+    """
+    Upscales pages locally with an ONNX export of Real-ESRGAN (or a lighter SR model) on
+    the CPU, for small books or when no pod is available.
+
+    Pages are split across a process pool, one page per process at a time, each running
+    the model tile by tile so memory stays bounded regardless of page size.
+    """
+
+    def __init__(self,
+                 model_path: Path,
+                 input_dir: Path,
+                 output_dir: Path,
+                 input_files: Optional[Iterable[Path]] = None,
+                 tile: int = 256,
+                 tile_pad: int = 16,
+                 workers: Optional[int] = None,
+                 threads_per_worker: int = 1):
+        super().__init__(input_dir, output_dir, input_files)
+        self.model_path = model_path
+        self.tile = tile
+        self.tile_pad = tile_pad
+        self.workers = workers or os.cpu_count()
+        self.threads_per_worker = threads_per_worker
+
+    def run(self):
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        pages = [Path(p) for p in self._pages()]
+        # Output pages keep the input name, as PNG
+        pending = [p for p in pages if not (self.output_dir / f"{p.stem}.png").exists()]
+        print(f"🖥️ Upscaling {len(pending)} of {len(pages)} pages on CPU with {self.workers} workers")
+
+        with ProcessPoolExecutor(max_workers=self.workers,
+                                 initializer=_init_worker,
+                                 initargs=(str(self.model_path), self.threads_per_worker)) as executor:
+            futures = [
+                executor.submit(_upscale_page, page, self.output_dir / f"{page.stem}.png", self.tile, self.tile_pad)
+                for page in pending
+            ]
+            failed = 0
+            for future, page in tqdm(zip(futures, pending), total=len(pending), desc="Upscaling pages"):
+                try:
+                    future.result()
+                except Exception as e:
+                    print(f"❌ Error upscaling {page}: {e}")
+                    failed += 1
+
+        if failed:
+            raise RuntimeError(f"{failed} of {len(pending)} pages failed to upscale")
+        print(f"✅ Output written to {self.output_dir}")
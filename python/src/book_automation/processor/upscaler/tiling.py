@@ -0,0 +1,49 @@
+from typing import Callable
+
+import numpy as np
+
+
+def tiled_inference(image: np.ndarray,
+                    infer: Callable[[np.ndarray], np.ndarray],
+                    tile: int = 256,
+                    pad: int = 16) -> np.ndarray:
+    """
+    Run a super-resolution model over an image tile by tile to bound memory.
+
+    Each tile is cut with ``pad`` pixels of context on every side so the model sees past
+    the tile edge; the padded border is cropped off the output before stitching, which
+    avoids visible seams.
+
+    Args:
+        image: (channels, height, width) float array
+        infer: model call taking a (1, channels, h, w) array and returning
+            (1, channels, h * scale, w * scale)
+        tile: tile size in input pixels
+        pad: context pixels around each tile
+
+    Returns:
+        (channels, height * scale, width * scale) array
+    """
+    channels, height, width = image.shape
+    output = None
+    scale = None
+
+    for top in range(0, height, tile):
+        for left in range(0, width, tile):
+            bottom, right = min(top + tile, height), min(left + tile, width)
+            pad_top, pad_left = max(top - pad, 0), max(left - pad, 0)
+            pad_bottom, pad_right = min(bottom + pad, height), min(right + pad, width)
+
+            result = infer(image[None, :, pad_top:pad_bottom, pad_left:pad_right])[0]
+            if output is None:
+                scale = result.shape[1] // (pad_bottom - pad_top)
+                output = np.zeros((channels, height * scale, width * scale), dtype=result.dtype)
+
+            crop_top, crop_left = (top - pad_top) * scale, (left - pad_left) * scale
+            output[:, top * scale:bottom * scale, left * scale:right * scale] = result[
+                :,
+                crop_top:crop_top + (bottom - top) * scale,
+                crop_left:crop_left + (right - left) * scale,
+            ]
+
+    return output
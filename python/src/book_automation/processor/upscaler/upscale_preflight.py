@@ -0,0 +1,154 @@
+import os
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, List, Optional, Tuple
+
+import numpy as np
+from PIL import Image
+
+from book_automation.util.stage_report import StageReport
+
+# Dpi values below this are placeholders written by scanners/converters, not real resolution
+MIN_PLAUSIBLE_DPI = 100
+# Modes PNG stores as-is; anything else (CMYK, YCbCr) is staged as RGB
+PNG_MODES = ("1", "L", "LA", "P", "RGB", "RGBA", "I;16")
+
+
+@dataclass
+class PagePreflight:
+    source: Path
+    effective_dpi: Optional[float]
+    sharpness: float
+    needs_upscale: bool
+    # Lossless PNG copy to upload, for pages that need upscaling
+    staged: Optional[Path] = None
+
+
+def laplacian_variance(gray: np.ndarray) -> float:
+    """
+    Variance of the 4-neighbour Laplacian, on a 0-255 scale: high for crisp text edges,
+    low for soft or blurry scans.
+    """
+    g = gray.astype(np.float32)
+    lap = (g[:-2, 1:-1] + g[2:, 1:-1] + g[1:-1, :-2] + g[1:-1, 2:]) - 4 * g[1:-1, 1:-1]
+    return float(lap.var()) if lap.size else 0.0
+
+
+class UpscalePreflight:
+    """
+    Decides per page whether super-resolution is worth it before anything is uploaded.
+
+    Pages whose effective resolution already reaches ``target_dpi`` and that are sharp
+    enough bypass the upscaler; ``merge_bypassed`` later resamples them by the upscaler's
+    scale so every page in the output folder has the same pixel density. The rest are
+    re-encoded as maximally compressed PNG: pages whose channels differ by no more than
+    ``gray_tolerance`` anywhere are grey in RGB clothing and go up as ``L`` (a third of
+    the pixels, like grayscale scans already do), true colour pages stay RGB.
+
+    Effective DPI comes from the image's dpi metadata, or from its pixel height and
+    ``page_height_inches`` when the physical page size is known.
+    """
+
+    def __init__(self,
+                 target_dpi: float = 600,
+                 min_sharpness: float = 100.0,
+                 page_height_inches: Optional[float] = None,
+                 workers: Optional[int] = None,
+                 gray_tolerance: int = 2):
+        self.target_dpi = target_dpi
+        self.min_sharpness = min_sharpness
+        self.page_height_inches = page_height_inches
+        self.gray_tolerance = gray_tolerance
+        self.workers = workers or os.cpu_count()
+
+    def effective_dpi(self, img: Image.Image) -> Optional[float]:
+        dpi = img.info.get("dpi")
+        if dpi and min(dpi) >= MIN_PLAUSIBLE_DPI:
+            return float(min(dpi))
+        if self.page_height_inches:
+            return img.height / self.page_height_inches
+        return None
+
+    def check_page(self, page: Path, staging_dir: Path) -> PagePreflight:
+        with Image.open(page) as img:
+            dpi = self.effective_dpi(img)
+            sharpness = laplacian_variance(np.asarray(img.convert("L")))
+            needs_upscale = dpi is None or dpi < self.target_dpi or sharpness < self.min_sharpness
+            result = PagePreflight(page, dpi, sharpness, needs_upscale)
+
+            if needs_upscale:
+                result.staged = staging_dir / f"{page.stem}.png"
+                self.staging_image(img).save(result.staged, format="PNG", compress_level=9)
+        return result
+
+    def staging_image(self, img: Image.Image) -> Image.Image:
+        if img.mode not in PNG_MODES:
+            img = img.convert("RGB")
+        if img.mode == "RGB":
+            rgb = np.asarray(img)
+            if int((rgb.max(axis=2) - rgb.min(axis=2)).max()) <= self.gray_tolerance:
+                return img.convert("L")
+        return img
+
+    def run(self, pages: Iterable[Path], staging_dir: Path,
+            stage_report: Optional[StageReport] = None) -> Tuple[List[Path], List[Path]]:
+        """
+        Returns:
+            The staged pages to upscale and the source pages that bypass it
+        """
+        start = time.perf_counter()
+        staging_dir.mkdir(parents=True, exist_ok=True)
+        pages = [Path(p) for p in pages]
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            results = list(executor.map(self.check_page, pages, [staging_dir] * len(pages), chunksize=8))
+
+        staged = [r.staged for r in results if r.needs_upscale]
+        bypassed = [r.source for r in results if not r.needs_upscale]
+        # Only the pages that go up; bypassed pages are never uploaded
+        source_bytes = sum(r.source.stat().st_size for r in results if r.needs_upscale)
+        staged_bytes = sum(p.stat().st_size for p in staged)
+        print(f"🔎 Preflight: {len(staged)} pages to upscale, {len(bypassed)} bypassed; "
+              f"upload {staged_bytes / 1e6:.1f} MB instead of {source_bytes / 1e6:.1f} MB")
+        if stage_report:
+            stage_report.record("upscale preflight", time.perf_counter() - start,
+                                staged=len(staged), bypassed=len(bypassed),
+                                source_mb=round(source_bytes / 1e6, 1), staged_mb=round(staged_bytes / 1e6, 1))
+        return staged, bypassed
+
+    @staticmethod
+    def output_scale(staged: Iterable[Path], output_dir: Path) -> Optional[float]:
+        """
+        Returns:
+            How much the upscaler enlarged the first staged page it has an output for, or
+            None if it has none
+        """
+        for page in staged:
+            output = output_dir / f"{page.stem}.png"
+            if output.exists():
+                with Image.open(page) as source, Image.open(output) as upscaled:
+                    return upscaled.width / source.width
+        return None
+
+    @staticmethod
+    def merge_bypassed(bypassed: Iterable[Path], output_dir: Path, scale: float = 1.0):
+        """
+        Put bypassed pages into the upscaled folder under the name the upscaler would
+        have given them, resampled by ``scale`` (see ``output_scale``) so they match the
+        size and dpi of the upscaled pages next to them.
+        """
+        output_dir.mkdir(parents=True, exist_ok=True)
+        for page in bypassed:
+            dest = output_dir / f"{page.stem}.png"
+            if scale == 1 and page.suffix.lower() == ".png":
+                shutil.copy2(page, dest)
+                continue
+            with Image.open(page) as img:
+                dpi = img.info.get("dpi")
+                if scale != 1:
+                    size = (round(img.width * scale), round(img.height * scale))
+                    img = img.resize(size, Image.LANCZOS)
+                    dpi = dpi and (dpi[0] * scale, dpi[1] * scale)
+                img.save(dest, format="PNG", **({"dpi": dpi} if dpi else {}))
@@ -0,0 +1,29 @@
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Iterable, Optional
+
+
+class Upscaler(ABC):
+    """
+    Upscales the pages of ``input_dir`` (or an explicit selection of pages) into
+    ``output_dir``, keeping each page's file name.
+    """
+
+    def __init__(self,
+                 input_dir: Path,
+                 output_dir: Path,
+                 input_files: Optional[Iterable[Path]] = None):
+        self.input_dir = input_dir
+        self.output_dir = output_dir
+        # Explicit page selection (e.g. from a SortIndex, or a generator yielding pages as a
+        # previous stage writes them); defaults to everything in input_dir
+        self.input_files = input_files
+
+    def _pages(self) -> Iterable[Path]:
+        if self.input_files is not None:
+            return self.input_files
+        return sorted(p for p in self.input_dir.iterdir() if p.is_file())
+
+    @abstractmethod
+    def run(self):
+        pass
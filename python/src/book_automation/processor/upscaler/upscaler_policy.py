@@ -0,0 +1,42 @@
+from dataclasses import dataclass
+from enum import Enum
+
+
+class UpscalerBackend(Enum):
+    RUNPOD = "runpod"
+    CPU = "cpu"
+
+
+@dataclass
+class UpscalerPolicy:
+    """
+    Picks the upscaling backend for a book from its page count.
+
+    Each backend's run is priced as its dollar cost plus its wall-clock time valued at
+    ``latency_cost_per_hour``; the cheaper one wins. The CPU costs nothing but takes long;
+    a pod pays its start-up and hourly price but is much faster per page, so small books
+    tend to stay local and large ones go to the GPU.
+    """
+    cpu_seconds_per_page: float = 20.0
+    cpu_workers: int = 8
+    gpu_seconds_per_page: float = 1.5
+    pod_start_seconds: float = 180.0
+    pod_cost_per_hour: float = 0.5
+    latency_cost_per_hour: float = 2.0
+
+    def cpu_seconds(self, pages: int) -> float:
+        return pages * self.cpu_seconds_per_page / max(1, self.cpu_workers)
+
+    def gpu_seconds(self, pages: int, pod_warm: bool = False) -> float:
+        return (0.0 if pod_warm else self.pod_start_seconds) + pages * self.gpu_seconds_per_page
+
+    def cost(self, backend: UpscalerBackend, pages: int, pod_warm: bool = False) -> float:
+        if backend == UpscalerBackend.CPU:
+            return self.cpu_seconds(pages) / 3600 * self.latency_cost_per_hour
+        seconds = self.gpu_seconds(pages, pod_warm)
+        return seconds / 3600 * (self.pod_cost_per_hour + self.latency_cost_per_hour)
+
+    def choose(self, pages: int, pod_available: bool = True, pod_warm: bool = False) -> UpscalerBackend:
+        if not pod_available:
+            return UpscalerBackend.CPU
+        return min(UpscalerBackend, key=lambda backend: self.cost(backend, pages, pod_warm))
@@ -0,0 +1,88 @@
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Dict, List, Optional
+
+
+class ScanTailorManifest:
+    """
+    Per-page fingerprints of what a ScanTailor output folder was made from, so a re-run
+    only sends new or changed pages to the CLI.
+
+    A page's fingerprint is the SHA-256 of its content (re-hashed only when size or
+    mtime change) together with a hash of the CLI options; changing any option
+    invalidates every page. Stored next to the output folder as
+    ``.<output_dir>.scantailor_manifest.json``.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        if path.exists():
+            with open(path) as f:
+                self._data = json.load(f)
+        else:
+            self._data = {"pages": {}}
+
+    @classmethod
+    def for_output_dir(cls, output_dir: str) -> "ScanTailorManifest":
+        output_dir = Path(output_dir)
+        return cls(output_dir.parent / f".{output_dir.name}.scantailor_manifest.json")
+
+    @staticmethod
+    def options_hash(options: List[str]) -> str:
+        return hashlib.sha256("\n".join(options).encode()).hexdigest()
+
+    def fingerprint(self, page: Path, options_hash: str) -> str:
+        stat = page.stat()
+        entry = self._data["pages"].setdefault(page.name, {})
+        if entry.get("size") != stat.st_size or entry.get("mtime_ns") != stat.st_mtime_ns:
+            digest = hashlib.sha256()
+            with open(page, "rb") as f:
+                for chunk in iter(lambda: f.read(1 << 20), b""):
+                    digest.update(chunk)
+            entry.update(size=stat.st_size, mtime_ns=stat.st_mtime_ns, sha256=digest.hexdigest())
+        return hashlib.sha256(f"{entry['sha256']}:{options_hash}".encode()).hexdigest()
+
+    def is_current(self, page: Path, options_hash: str, output_dir: str) -> bool:
+        """
+        True when the output in output_dir was made from this page content with these options.
+        """
+        fingerprint = self.fingerprint(page, options_hash)
+        entry = self._data["pages"][page.name]
+        output = entry.get("output")
+        return (entry.get("fingerprint") == fingerprint
+                and output is not None
+                and os.path.exists(os.path.join(output_dir, output)))
+
+    def record(self, page: Path, options_hash: str, output: Optional[str]):
+        fingerprint = self.fingerprint(page, options_hash)
+        entry = self._data["pages"][page.name]
+        entry.update(fingerprint=fingerprint, output=output)
+
+    def prune(self, pages: List[Path], output_dir: str) -> List[str]:
+        """
+        Forget pages that are no longer in the input folder and delete their outputs, so a
+        deleted or renamed page doesn't leave a stale output for later stages.
+
+        Returns:
+            The names of the pruned pages
+        """
+        names = {page.name for page in pages}
+        stale = [name for name in self._data["pages"] if name not in names]
+        kept_outputs = {entry.get("output") for name, entry in self._data["pages"].items() if name in names}
+        for name in stale:
+            output = self._data["pages"].pop(name).get("output")
+            # A renamed page can map to the same output name as its old self
+            if output is not None and output not in kept_outputs:
+                try:
+                    os.remove(os.path.join(output_dir, output))
+                except FileNotFoundError:
+                    pass
+        return stale
+
+    def save(self):
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(self._data, f, indent=1)
+        os.replace(tmp_path, self.path)
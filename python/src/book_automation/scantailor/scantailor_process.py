@@ -0,0 +1,159 @@
+import os
+import queue
+import re
+import subprocess
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional
+
+# Separators around file names in CLI log lines
+_TOKEN_SPLIT = re.compile(r"[\s/\\'\":,;()\[\]]+")
+_EOF = object()
+
+
+class ScanTailorStalled(Exception):
+    pass
+
+
+@dataclass
+class PageEvent:
+    page: str
+    # "started" when the CLI first names the page, "done" when its output appears
+    event: str
+    # For "done": seconds since the page started, or since the previous page finished
+    # when the CLI never named it
+    seconds: Optional[float] = None
+
+
+class ScanTailorProcess:
+    """
+    Runs one ``scantailor-universal-cli`` invocation, streaming its combined stdout and
+    stderr line by line instead of buffering them.
+
+    Lines that name one of ``pages`` mark that page as started; a file with the page's
+    stem appearing in ``output_dir`` marks it as done, unless it was already there with
+    the same mtime when the CLI was launched. Both are reported to
+    ``on_event``. If neither happens for ``stall_timeout`` seconds the CLI is killed and
+    ``ScanTailorStalled`` raised. Only the last ``tail_lines`` lines are kept, for error
+    reports.
+    """
+
+    def __init__(self,
+                 cmd: List[str],
+                 pages: List[str],
+                 output_dir: str,
+                 stall_timeout: Optional[float] = 600,
+                 on_event: Optional[Callable[[PageEvent], None]] = None,
+                 on_line: Optional[Callable[[str], None]] = None,
+                 poll_interval: float = 1.0,
+                 tail_lines: int = 50):
+        self.cmd = cmd
+        self.output_dir = output_dir
+        self.stall_timeout = stall_timeout
+        self.on_event = on_event
+        self.on_line = on_line
+        self.poll_interval = poll_interval
+        self.tail = deque(maxlen=tail_lines)
+
+        self._pages_by_stem: Dict[str, str] = {os.path.splitext(p)[0]: p for p in pages}
+        self._started: Dict[str, float] = {}
+        self._done: Dict[str, float] = {}
+        self._last_done = 0.0
+        # Outputs from an earlier run, by name -> mtime; only new or rewritten files count
+        self._existing: Dict[str, int] = {}
+
+    @property
+    def done_pages(self) -> List[str]:
+        return [self._pages_by_stem[stem] for stem in self._done]
+
+    def run(self) -> int:
+        """
+        Returns:
+            The CLI's exit code
+
+        Raises:
+            ScanTailorStalled: if no page made progress for ``stall_timeout`` seconds
+        """
+        self._existing = {entry.name: entry.stat().st_mtime_ns for entry in self._output_files()}
+        process = subprocess.Popen(self.cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                                   text=True, bufsize=1)
+        lines: "queue.Queue" = queue.Queue()
+        threading.Thread(target=self._pump, args=(process.stdout, lines), daemon=True).start()
+
+        start = time.monotonic()
+        self._last_done = start
+        last_progress = last_scan = start
+        while True:
+            try:
+                line = lines.get(timeout=self.poll_interval)
+            except queue.Empty:
+                line = None
+            if line is _EOF:
+                break
+
+            now = time.monotonic()
+            if line is not None:
+                line = line.rstrip("\n")
+                self.tail.append(line)
+                if self.on_line:
+                    self.on_line(line)
+                if self._parse_line(line, now):
+                    last_progress = now
+            if now - last_scan >= self.poll_interval:
+                last_scan = now
+                if self._scan_outputs(now):
+                    last_progress = now
+
+            if self.stall_timeout and now - last_progress > self.stall_timeout:
+                process.kill()
+                process.wait()
+                raise ScanTailorStalled(f"No page finished for {self.stall_timeout:.0f} s; "
+                                        f"{len(self._done)} of {len(self._pages_by_stem)} pages done")
+
+        returncode = process.wait()
+        self._scan_outputs(time.monotonic())
+        return returncode
+
+    @staticmethod
+    def _pump(stream, lines: "queue.Queue"):
+        for line in stream:
+            lines.put(line)
+        stream.close()
+        lines.put(_EOF)
+
+    def _parse_line(self, line: str, now: float) -> bool:
+        progressed = False
+        for token in _TOKEN_SPLIT.split(line):
+            stem = os.path.splitext(token)[0]
+            if stem in self._pages_by_stem and stem not in self._started and stem not in self._done:
+                self._started[stem] = now
+                self._emit(PageEvent(self._pages_by_stem[stem], "started"))
+                progressed = True
+        return progressed
+
+    def _output_files(self) -> List[os.DirEntry]:
+        if not os.path.isdir(self.output_dir):
+            return []
+        with os.scandir(self.output_dir) as entries:
+            return [entry for entry in entries if entry.is_file()]
+
+    def _scan_outputs(self, now: float) -> bool:
+        progressed = False
+        for entry in self._output_files():
+            stem = os.path.splitext(entry.name)[0]
+            if stem not in self._pages_by_stem or stem in self._done:
+                continue
+            if self._existing.get(entry.name) == entry.stat().st_mtime_ns:
+                continue
+            seconds = now - self._started.get(stem, self._last_done)
+            self._done[stem] = now
+            self._last_done = now
+            self._emit(PageEvent(self._pages_by_stem[stem], "done", seconds))
+            progressed = True
+        return progressed
+
+    def _emit(self, event: PageEvent):
+        if self.on_event:
+            self.on_event(event)
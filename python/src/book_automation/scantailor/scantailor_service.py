@@ -1,7 +1,19 @@
+import math
 import os
-import subprocess
+import shutil
 import time
-from typing import List
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import List, Optional
+
+from tqdm import tqdm
+
+from book_automation.scantailor.scantailor_manifest import ScanTailorManifest
+from book_automation.scantailor.scantailor_process import PageEvent, ScanTailorProcess, ScanTailorStalled
+from book_automation.util.stage_report import StageReport
+
+IMAGE_EXTENSIONS = {'.png', '.jpg', '.jpeg', '.tif', '.tiff', '.bmp'}
+
 
 class ScanTailorService:
     def __init__(self, 
@@ -9,12 +21,29 @@ class ScanTailorService:
                  content_detection: str = "normal",
                  auto_margins: bool = True,
                  dpi: int = 600,
-                 compression: str = 'lzw'):
+                 compression: str = 'lzw',
+                 shards: int = 1,
+                 stall_timeout: Optional[float] = 600,
+                 stall_retries: int = 1,
+                 stage_report: Optional[StageReport] = None,
+                 incremental: bool = False):
         self.enabled = enabled
         self.content_detection = content_detection
         self.auto_margins = auto_margins
         self.dpi = dpi
         self.compression = compression
+        # One CLI process uses only part of the cores; with shards > 1 the pages are
+        # split into that many contiguous chunks, each run by its own CLI process
+        self.shards = shards
+        # A CLI process with no page finishing for stall_timeout seconds is killed and
+        # retried (only its unfinished pages, when staged) up to stall_retries times
+        self.stall_timeout = stall_timeout
+        self.stall_retries = stall_retries
+        self.stage_report = stage_report or StageReport("ScanTailor")
+        # Opt-in: only pages whose content or CLI options changed since the last run are
+        # sent to the CLI; the rest keep their output, and outputs of pages no longer in
+        # the input are deleted (see ScanTailorManifest)
+        self.incremental = incremental
     
     def process_images(self, input_dir: str, output_dir: str) -> bool:
         if not self.enabled:
@@ -25,28 +54,146 @@ class ScanTailorService:
         print(f"Processing images from {input_dir} to {output_dir}")
         
         start_time = time.time()
-        
-        cmd = self._build_scantailor_command(input_dir, output_dir)
+
+        pages = self._list_pages(input_dir)
+        if self.incremental:
+            manifest = ScanTailorManifest.for_output_dir(output_dir)
+            # Whether a run was partial is not an option of the page; see _build_scantailor_command
+            options_hash = manifest.options_hash(self._build_scantailor_command("", "")[:-2])
+            pending = [p for p in pages if not manifest.is_current(p, options_hash, output_dir)]
+            removed = manifest.prune(pages, output_dir)
+            manifest.save()
+            print(f"{len(pages) - len(pending)} of {len(pages)} pages unchanged; reusing their ScanTailor output")
+            if removed:
+                print(f"Removed the ScanTailor output of {len(removed)} pages no longer in {input_dir}")
+        else:
+            pending = pages
+
+        with self.stage_report.stage("scantailor", pages=len(pending)), \
+                tqdm(total=len(pending), desc="ScanTailor", unit="page") as progress:
+            if not pending:
+                success = True
+            elif self.incremental or self.shards > 1:
+                # A CLI that sees only part of the book can't match its layout
+                partial = self.shards > 1 or len(pending) < len(pages)
+                success = self._process_staged(pending, output_dir, progress, partial)
+            else:
+                success = self._run_cli(input_dir, output_dir, progress)
+        print(self.stage_report.summary())
+        if not success:
+            return False
+
+        if self.incremental and pending:
+            outputs = {os.path.splitext(name)[0]: name for name in os.listdir(output_dir)
+                       if os.path.isfile(os.path.join(output_dir, name))}
+            for page in pending:
+                manifest.record(page, options_hash, outputs.get(page.stem))
+            manifest.save()
+
+        elapsed_time = time.time() - start_time
+        print(f"ScanTailor processing completed successfully in {elapsed_time:.2f} seconds")
+
+        output_file_count = len([f for f in os.listdir(output_dir) if os.path.isfile(os.path.join(output_dir, f))])
+        print(f"Generated {output_file_count} output files in {output_dir}")
+
+        return True
+
+    @staticmethod
+    def _list_pages(input_dir: str) -> List[Path]:
+        if not os.path.isdir(input_dir):
+            return []
+        return sorted(p for p in Path(input_dir).iterdir() if p.is_file() and p.suffix.lower() in IMAGE_EXTENSIONS)
+
+    def _run_cli(self, input_dir: str, output_dir: str, progress: Optional[tqdm] = None,
+                 prune_done: bool = False, partial: bool = False) -> bool:
+        """
+        Run the CLI over input_dir, streaming its output into page progress. When
+        prune_done is set, input_dir is a staging folder, so pages that finished before
+        a stall are removed from it before the retry. partial means input_dir holds only
+        part of the book (see _build_scantailor_command).
+        """
+        cmd = self._build_scantailor_command(input_dir, output_dir, partial)
         cmd_str = ' '.join(cmd)
         
         print(f"Starting ScanTailor with command: {cmd_str}")
-        
-        try:
-            result = subprocess.run(cmd, check=True, text=True, capture_output=True)
-            elapsed_time = time.time() - start_time
-            print(f"ScanTailor processing completed successfully in {elapsed_time:.2f} seconds")
-            
-            output_file_count = len([f for f in os.listdir(output_dir) if os.path.isfile(os.path.join(output_dir, f))])
-            print(f"Generated {output_file_count} output files in {output_dir}")
-            
+        finished = set()
+
+        def on_event(event: PageEvent):
+            if event.event == "done" and event.page not in finished:
+                finished.add(event.page)
+                self.stage_report.record_item("scantailor page", event.seconds)
+                if progress is not None:
+                    progress.update(1)
+
+        for attempt in range(self.stall_retries + 1):
+            pages = [p.name for p in self._list_pages(input_dir)]
+            process = ScanTailorProcess(cmd, pages, output_dir, stall_timeout=self.stall_timeout, on_event=on_event)
+            try:
+                returncode = process.run()
+            except ScanTailorStalled as e:
+                print(f"ScanTailor stalled on {input_dir} (attempt {attempt + 1}): {e}")
+                if prune_done:
+                    for page in process.done_pages:
+                        os.remove(os.path.join(input_dir, page))
+                continue
+
+            if returncode != 0:
+                print(f"ScanTailor processing failed with exit code {returncode}")
+                print("Error output:\n" + "\n".join(process.tail))
+                return False
             return True
-            
-        except subprocess.CalledProcessError as e:
-            print(f"ScanTailor processing failed: {e}")
-            print(f"Error output: {e.stderr}")
+
+        print(f"ScanTailor gave up on {input_dir} after {self.stall_retries + 1} stalled attempts")
+        return False
+
+    def _process_staged(self, pages: List[Path], output_dir: str, progress: Optional[tqdm] = None,
+                        partial: bool = False) -> bool:
+        """
+        Stage contiguous chunks of the page list as hardlinks in their own folders, run
+        one CLI per chunk concurrently, then move every chunk's output into output_dir.
+        Outputs keep their page's name, so the merged folder is in the original order.
+        """
+        chunk_size = math.ceil(len(pages) / max(self.shards, 1))
+        chunks = [pages[i:i + chunk_size] for i in range(0, len(pages), chunk_size)]
+        staging_dir = Path(output_dir).parent / f".{Path(output_dir).name}.shards"
+        shutil.rmtree(staging_dir, ignore_errors=True)
+
+        shard_dirs = []
+        for index, chunk in enumerate(chunks):
+            shard_dir = staging_dir / f"shard_{index:03d}"
+            (shard_dir / "in").mkdir(parents=True)
+            (shard_dir / "out").mkdir()
+            for page in chunk:
+                self._link(page, shard_dir / "in" / page.name)
+            shard_dirs.append(shard_dir)
+
+        print(f"Running {len(chunks)} ScanTailor shards of up to {chunk_size} pages")
+        with ThreadPoolExecutor(max_workers=len(shard_dirs)) as executor:
+            results = list(executor.map(
+                lambda d: self._run_cli(str(d / "in"), str(d / "out"), progress, prune_done=True, partial=partial),
+                shard_dirs))
+        if not all(results):
+            print(f"{results.count(False)} of {len(results)} ScanTailor shards failed; "
+                  f"staged shards kept in {staging_dir}")
             return False
+
+        for shard_dir in shard_dirs:
+            for output in sorted((shard_dir / "out").iterdir()):
+                # Only the page files; the CLI's cache folders stay behind
+                if output.is_file():
+                    os.replace(output, Path(output_dir) / output.name)
+        shutil.rmtree(staging_dir, ignore_errors=True)
+        return True
+
+    @staticmethod
+    def _link(source: Path, target: Path):
+        try:
+            os.link(source, target)
+        except OSError:
+            # Different filesystem, or no hardlink support
+            shutil.copy2(source, target)
     
-    def _build_scantailor_command(self, input_dir: str, output_dir: str) -> List[str]:
+    def _build_scantailor_command(self, input_dir: str, output_dir: str, partial: bool = False) -> List[str]:
         cmd = ["scantailor-universal-cli"]
         
         # Basic settings
@@ -55,6 +202,12 @@ class ScanTailorService:
             "--deskew=off",             # Turn off deskew - handled separately in pipeline
             f"--content-detection={self.content_detection}",
         ])
+        if partial:
+            # Matching layout pads every page to the largest one the CLI sees. A shard or an
+            # incremental run sees only part of the book, so its pages would come out at
+            # sizes depending on which chunk they landed in; without matching, each page's
+            # output depends only on that page, whichever way the book is split
+            cmd.append("--match-layout=false")
             
         # Other settings
         cmd.extend([
@@ -0,0 +1,130 @@
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import List, Optional, Dict
+
+from PIL import Image
+from tqdm import tqdm
+
+from book_automation.externals.openai_batch_client import OpenAIBatchClient
+from book_automation.sorter.classifier.gpt_vision_page_type_classifier import \
+    GPTVisionPageTypeClassifier
+from book_automation.sorter.image_sorter import ImageSorter, SortMode
+
+# The Batch API rejects input files above 200 MB
+DEFAULT_MAX_BATCH_FILE_BYTES = 190 * 1024 * 1024
+
+
+class BatchImageSorter(ImageSorter):
+    """
+    Sorts a book through the OpenAI Batch API instead of one request per page.
+
+    All classification requests are written as JSONL, submitted as one or more batches and
+    polled until complete; results are then applied exactly like ImageSorter.sort(). The
+    submitted batch IDs are kept in a state file next to the input directory, so an
+    interrupted run resumes by polling the same batches instead of resubmitting.
+    """
+
+    def __init__(
+        self,
+        input_dir: Path,
+        output_dir: Path,
+        classifier: GPTVisionPageTypeClassifier,
+        batch_client: OpenAIBatchClient,
+        sort_mode: SortMode = SortMode.MOVE,
+        state_path: Optional[Path] = None,
+        max_image_side: int = 1024,
+        max_file_bytes: int = DEFAULT_MAX_BATCH_FILE_BYTES,
+        poll_interval: float = 60
+    ):
+        super().__init__(input_dir, output_dir, classifier, sort_mode=sort_mode)
+        self.batch_client = batch_client
+        self.state_path = Path(state_path) if state_path else \
+            self.input_dir.parent / f"{self.input_dir.name}_batch_state.json"
+        self.max_image_side = max_image_side
+        self.max_file_bytes = max_file_bytes
+        self.poll_interval = poll_interval
+
+    def _load_state(self) -> Dict:
+        if self.state_path.exists():
+            with open(self.state_path) as f:
+                return json.load(f)
+        return {"batch_ids": []}
+
+    def _save_state(self, state: Dict) -> None:
+        tmp_path = self.state_path.with_suffix(".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(state, f, indent=2)
+        os.replace(tmp_path, self.state_path)
+
+    def _request_line(self, img_path: Path) -> str:
+        with Image.open(img_path) as img:
+            # Page type is obvious at thumbnail scale and full-resolution scans would blow
+            # through the batch file size limit
+            img.thumbnail((self.max_image_side, self.max_image_side))
+            return self.batch_client.build_request_line(img_path.name, img, self.classifier.prompt)
+
+    def _write_batch_files(self, image_paths: List[Path], work_dir: Path) -> List[Path]:
+        batch_files: List[Path] = []
+        out = None
+        written = 0
+
+        for img_path in tqdm(image_paths, desc="Writing batch requests"):
+            line = (self._request_line(img_path) + "\n").encode()
+            if out is None or written + len(line) > self.max_file_bytes:
+                if out:
+                    out.close()
+                batch_files.append(work_dir / f"requests_{len(batch_files):03d}.jsonl")
+                out = open(batch_files[-1], "wb")
+                written = 0
+            out.write(line)
+            written += len(line)
+
+        if out:
+            out.close()
+        return batch_files
+
+    def submit(self) -> List[str]:
+        image_paths = self._pending_paths()
+        with tempfile.TemporaryDirectory() as work_dir:
+            batch_files = self._write_batch_files(image_paths, Path(work_dir))
+            batch_ids = []
+            for batch_file in batch_files:
+                batch_ids.append(self.batch_client.submit(batch_file))
+                print(f"Submitted batch {batch_ids[-1]} ({batch_file.name})")
+                # Saved after every submission so a crash never orphans a paid batch
+                self._save_state({"batch_ids": batch_ids})
+        return batch_ids
+
+    def _apply_results(self, results: Dict[str, Optional[str]]) -> None:
+        for name, output_text in results.items():
+            img_path = self.input_dir / name
+            if self._is_placed(img_path):
+                # Already applied by an earlier, interrupted run
+                continue
+            if output_text is None:
+                print(f"Error processing {name}: batch request failed")
+                continue
+            try:
+                self._place(img_path, self.classifier.parse_response(output_text))
+            except Exception as e:
+                print(f"Error processing {name}: {e}")
+
+    def sort(self, batch_ids: Optional[List[str]] = None) -> None:
+        if batch_ids:
+            self._save_state({"batch_ids": list(batch_ids)})
+        else:
+            batch_ids = self._load_state()["batch_ids"]
+            if batch_ids:
+                print(f"Resuming batches {', '.join(batch_ids)}")
+            else:
+                batch_ids = self.submit()
+
+        for batch_id in batch_ids:
+            batch = self.batch_client.wait_for_completion(batch_id, poll_interval=self.poll_interval)
+            if batch.status != "completed":
+                print(f"Batch {batch_id} ended with status {batch.status}")
+            self._apply_results(self.batch_client.fetch_results(batch))
+
+        self.state_path.unlink(missing_ok=True)
@@ -0,0 +1,26 @@
+import asyncio
+from typing import List, Optional
+
+from PIL import Image
+
+from book_automation.externals.async_gpt_vision_client import AsyncGPTVisionClient
+from book_automation.records.page_type import PageType
+from book_automation.sorter.classifier.gpt_vision_page_type_classifier import \
+    GPTVisionPageTypeClassifier
+
+
+class AsyncGPTVisionPageTypeClassifier(GPTVisionPageTypeClassifier):
+
+    def __init__(self, types: List[PageType], vision_client: AsyncGPTVisionClient):
+        super().__init__(types, vision_client)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    async def classify_async(self, image: Image.Image) -> PageType:
+        return self.parse_response(await self.vision_client.invoke(image, self.prompt))
+
+    def classify(self, image: Image.Image) -> PageType:
+        # One loop for every sync call: the OpenAI client's connections and the rate
+        # limiter's lock belong to the loop they were first used on
+        if self._loop is None or self._loop.is_closed():
+            self._loop = asyncio.new_event_loop()
+        return self._loop.run_until_complete(self.classify_async(image))
@@ -0,0 +1,40 @@
+import asyncio
+
+from PIL import Image
+
+from book_automation.records.page_type import PageType
+from book_automation.sorter.classifier.local_page_type_classifier import LocalPageTypeClassifier
+from book_automation.sorter.classifier.page_type_classifier import PageTypeClassifier
+
+
+class ConfidenceFallbackPageTypeClassifier(PageTypeClassifier):
+    """
+    Classifies with a LocalPageTypeClassifier and only asks the fallback classifier
+    (typically GPTVisionPageTypeClassifier) about pages below ``min_confidence``.
+    """
+
+    def __init__(self,
+                 local_classifier: LocalPageTypeClassifier,
+                 fallback_classifier: PageTypeClassifier,
+                 min_confidence: float = 0.9):
+        super().__init__(fallback_classifier.types)
+        self.local_classifier = local_classifier
+        self.fallback_classifier = fallback_classifier
+        self.min_confidence = min_confidence
+        self.local_count = 0
+        self.fallback_count = 0
+
+    def _classify_locally(self, image: Image.Image):
+        page_type, confidence = self.local_classifier.classify_with_confidence(image)
+        if confidence >= self.min_confidence and page_type in self.types:
+            self.local_count += 1
+            return page_type
+        self.fallback_count += 1
+        return None
+
+    def classify(self, image: Image.Image) -> PageType:
+        return self._classify_locally(image) or self.fallback_classifier.classify(image)
+
+    async def classify_async(self, image: Image.Image) -> PageType:
+        page_type = await asyncio.to_thread(self._classify_locally, image)
+        return page_type or await self.fallback_classifier.classify_async(image)
@@ -28,5 +28,8 @@ class GPTVisionPageTypeClassifier(PageTypeClassifier):
         
         """
 
+    def parse_response(self, response: str) -> PageType:
+        return PageType(response.strip())
+
     def classify(self, image: Image.Image) -> PageType:
-        return PageType(self.vision_client.invoke(image, self.prompt))
+        return self.parse_response(self.vision_client.invoke(image, self.prompt))
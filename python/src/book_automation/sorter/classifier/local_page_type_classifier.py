@@ -0,0 +1,102 @@
+from pathlib import Path
+from typing import List, Tuple, Optional
+
+import numpy as np
+from PIL import Image
+
+from book_automation.records.page_type import PageType
+from book_automation.sorter.classifier.page_features import PageFeatureExtractor
+from book_automation.sorter.classifier.page_type_classifier import PageTypeClassifier
+
+
+class LocalPageTypeClassifier(PageTypeClassifier):
+    """
+    CPU-only page-type classifier: a softmax regression over PageFeatureExtractor features.
+    Runs in milliseconds per page with no network access. Models are trained with
+    ``train`` (see scripts/train_page_classifier.py) and stored as ``.npz`` files.
+    """
+
+    def __init__(self,
+                 types: List[PageType],
+                 weights: np.ndarray,
+                 bias: np.ndarray,
+                 feature_mean: np.ndarray,
+                 feature_std: np.ndarray,
+                 extractor: Optional[PageFeatureExtractor] = None):
+        super().__init__(types)
+        self.weights = weights
+        self.bias = bias
+        self.feature_mean = feature_mean
+        self.feature_std = feature_std
+        self.extractor = extractor or PageFeatureExtractor()
+
+    @classmethod
+    def load(cls, model_path: Path) -> "LocalPageTypeClassifier":
+        with np.load(model_path) as model:
+            types = [PageType(value) for value in model["types"]]
+            return cls(types, model["weights"], model["bias"], model["feature_mean"], model["feature_std"])
+
+    def save(self, model_path: Path) -> None:
+        np.savez(
+            model_path,
+            types=np.array([t.value for t in self.types]),
+            weights=self.weights,
+            bias=self.bias,
+            feature_mean=self.feature_mean,
+            feature_std=self.feature_std
+        )
+
+    @staticmethod
+    def _softmax(logits: np.ndarray) -> np.ndarray:
+        logits = logits - logits.max(axis=-1, keepdims=True)
+        exp = np.exp(logits)
+        return exp / exp.sum(axis=-1, keepdims=True)
+
+    def predict_proba(self, features: np.ndarray) -> np.ndarray:
+        normalized = (features - self.feature_mean) / self.feature_std
+        return self._softmax(normalized @ self.weights + self.bias)
+
+    def classify_with_confidence(self, image: Image.Image) -> Tuple[PageType, float]:
+        probabilities = self.predict_proba(self.extractor.extract(image))
+        best = int(np.argmax(probabilities))
+        return self.types[best], float(probabilities[best])
+
+    def classify(self, image: Image.Image) -> PageType:
+        return self.classify_with_confidence(image)[0]
+
+    @classmethod
+    def train(cls,
+              types: List[PageType],
+              features: np.ndarray,
+              labels: np.ndarray,
+              epochs: int = 500,
+              learning_rate: float = 0.5,
+              l2: float = 1e-3) -> "LocalPageTypeClassifier":
+        """
+        Fit a softmax regression by full-batch gradient descent.
+
+        Args:
+            types: Page types, indexed by ``labels``
+            features: (n_samples, n_features) feature matrix
+            labels: (n_samples,) integer class indices into ``types``
+        """
+        feature_mean = features.mean(axis=0)
+        feature_std = features.std(axis=0) + 1e-6
+        x = (features - feature_mean) / feature_std
+
+        n_samples, n_features = x.shape
+        n_classes = len(types)
+        one_hot = np.eye(n_classes)[labels]
+
+        # Inverse-frequency weights so rare title pages are not drowned out by content pages
+        class_counts = np.bincount(labels, minlength=n_classes).astype(np.float64)
+        sample_weights = (n_samples / (n_classes * np.maximum(class_counts, 1)))[labels][:, None]
+
+        weights = np.zeros((n_features, n_classes))
+        bias = np.zeros(n_classes)
+        for _ in range(epochs):
+            error = (cls._softmax(x @ weights + bias) - one_hot) * sample_weights / n_samples
+            weights -= learning_rate * (x.T @ error + l2 * weights)
+            bias -= learning_rate * error.sum(axis=0)
+
+        return cls(types, weights, bias, feature_mean, feature_std)
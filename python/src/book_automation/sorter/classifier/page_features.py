@@ -0,0 +1,68 @@
+import numpy as np
+from PIL import Image
+
+THUMBNAIL_SIZE = 128
+PIXEL_GRID = 16
+HISTOGRAM_BINS = 16
+PROFILE_BINS = 32
+INK_LEVEL = 128
+SUMMARY_STATS = 5
+
+
+class PageFeatureExtractor:
+    """
+    Cheap, resolution-independent page features for page-type classification:
+    a coarse grayscale pixel grid, an intensity histogram, row/column ink projection
+    profiles and a few global ink statistics.
+    """
+
+    @staticmethod
+    def thumbnail(image: Image.Image, size: int = THUMBNAIL_SIZE) -> np.ndarray:
+        gray = image.convert("L")
+        # reduce() box-filters by an integer factor and is much cheaper than resizing
+        # a full-resolution scan directly
+        factor = max(1, min(gray.size) // (size * 2))
+        if factor > 1:
+            gray = gray.reduce(factor)
+        gray = gray.resize((size, size), Image.BILINEAR)
+        return np.asarray(gray, dtype=np.float32) / 255.0
+
+    @staticmethod
+    def _resample(profile: np.ndarray, bins: int) -> np.ndarray:
+        return profile.reshape(bins, -1).mean(axis=1)
+
+    def extract(self, image: Image.Image) -> np.ndarray:
+        return self.extract_from_thumbnail(self.thumbnail(image))
+
+    @staticmethod
+    def summary(features: np.ndarray) -> np.ndarray:
+        """
+        Layout-independent part of extracted features (intensity histogram and global ink
+        statistics): stable across pages of the same type, so jumps mark type changes.
+        """
+        histogram_start = PIXEL_GRID * PIXEL_GRID
+        return np.concatenate([
+            features[..., histogram_start:histogram_start + HISTOGRAM_BINS],
+            features[..., -SUMMARY_STATS:]
+        ], axis=-1)
+
+    def extract_from_thumbnail(self, thumb: np.ndarray) -> np.ndarray:
+        size = thumb.shape[0]
+        grid = thumb.reshape(PIXEL_GRID, size // PIXEL_GRID, PIXEL_GRID, size // PIXEL_GRID).mean(axis=(1, 3))
+
+        histogram, _ = np.histogram(thumb, bins=HISTOGRAM_BINS, range=(0.0, 1.0))
+        histogram = histogram / thumb.size
+
+        ink = thumb < INK_LEVEL / 255.0
+        rows = self._resample(ink.mean(axis=1), PROFILE_BINS)
+        cols = self._resample(ink.mean(axis=0), PROFILE_BINS)
+
+        stats = np.array([
+            ink.mean(),
+            thumb.mean(),
+            thumb.std(),
+            (rows > 0.01).mean(),
+            (cols > 0.01).mean(),
+        ], dtype=np.float32)
+
+        return np.concatenate([grid.ravel(), histogram, rows, cols, stats]).astype(np.float32)
@@ -1,3 +1,4 @@
+import asyncio
 from abc import ABC
 from enum import Enum
 from typing import Protocol, Generic, TypeVar, List
@@ -13,4 +14,7 @@ class PageTypeClassifier(ABC):
         self.types = types
 
     def classify(self, image: Image.Image) -> PageType:
-        pass
\ No newline at end of file
+        pass
+
+    async def classify_async(self, image: Image.Image) -> PageType:
+        return await asyncio.to_thread(self.classify, image)
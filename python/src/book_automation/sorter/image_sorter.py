@@ -1,11 +1,25 @@
+import asyncio
 from concurrent.futures import ThreadPoolExecutor
+from enum import Enum
 from pathlib import Path
 from typing import List
 
 from PIL import Image
 from tqdm import tqdm
 
+from book_automation.records.page_type import PageType
 from book_automation.sorter.classifier.page_type_classifier import PageTypeClassifier
+from book_automation.sorter.sort_index import SortIndex, LinkMode, INDEX_FILENAME
+
+
+class SortMode(Enum):
+    # Rename each page into its type directory
+    MOVE = "move"
+    # Leave pages in place and only record page -> type in the sort index
+    INDEX = "index"
+    # Record in the sort index and link pages into their type directory
+    HARDLINK = "hardlink"
+    SYMLINK = "symlink"
 
 
 class ImageSorter:
@@ -14,30 +28,59 @@ class ImageSorter:
         input_dir: Path,
         output_dir: Path,
         classifier: PageTypeClassifier,
-        max_workers: int = None
+        max_workers: int = None,
+        max_in_flight: int = 64,
+        sort_mode: SortMode = SortMode.MOVE
     ):
         self.input_dir = Path(input_dir)
         self.output_dir = Path(output_dir)
         self.classifier = classifier
         self.max_workers = max_workers
+        self.max_in_flight = max_in_flight
+        self.sort_mode = sort_mode
+        self.index = SortIndex(self.output_dir / INDEX_FILENAME) if sort_mode != SortMode.MOVE else None
 
         # Ensure output subdirectories exist for each page type
         for pt in classifier.types:
             (self.output_dir / pt.value).mkdir(parents=True, exist_ok=True)
 
+    def _image_paths(self) -> List[Path]:
+        return sorted(p for p in self.input_dir.iterdir() if p.is_file())
+
+    def _is_placed(self, img_path: Path) -> bool:
+        if self.index is None:
+            return not img_path.exists()
+        return img_path in self.index
+
+    def _pending_paths(self) -> List[Path]:
+        return [p for p in self._image_paths() if not self._is_placed(p)]
+
+    def _place(self, img_path: Path, page_type: PageType) -> None:
+        dest_dir = self.output_dir / page_type.value
+        if self.sort_mode == SortMode.MOVE:
+            img_path.rename(dest_dir / img_path.name)
+            return
+
+        link_mode = {
+            SortMode.HARDLINK: LinkMode.HARDLINK,
+            SortMode.SYMLINK: LinkMode.SYMLINK,
+        }.get(self.sort_mode, LinkMode.NONE)
+        SortIndex.link(img_path, dest_dir / img_path.name, link_mode)
+        # Recorded last so an indexed page always has its link
+        self.index.record(img_path, page_type)
+
     def _process_image(self, img_path: Path) -> None:
         try:
             with Image.open(img_path) as img:
                 page_type = self.classifier.classify(img)
 
-            dest_dir = self.output_dir / page_type.value
-            img_path.rename(dest_dir / img_path.name)
+            self._place(img_path, page_type)
         except Exception as e:
             # Consider logging instead of printing in production
             print(f"Error processing {img_path.name}: {e}")
 
     def sort(self) -> None:
-        image_paths: List[Path] = [p for p in self.input_dir.iterdir() if p.is_file()]
+        image_paths = self._pending_paths()
         total = len(image_paths)
 
         # Use ThreadPoolExecutor for I/O-bound tasks
@@ -45,3 +88,29 @@ class ImageSorter:
             # executor.map returns an iterator; wrap with tqdm for progress
             for _ in tqdm(executor.map(self._process_image, image_paths), total=total, desc="Sorting images"):
                 pass
+
+    @staticmethod
+    def _load_image(img_path: Path) -> Image.Image:
+        with Image.open(img_path) as img:
+            img.load()
+            return img
+
+    async def _process_image_async(self, img_path: Path, semaphore: asyncio.Semaphore) -> None:
+        try:
+            # The semaphore only bounds decoded images held in memory; request pacing is
+            # left to the classifier's client
+            async with semaphore:
+                img = await asyncio.to_thread(self._load_image, img_path)
+                page_type = await self.classifier.classify_async(img)
+
+            await asyncio.to_thread(self._place, img_path, page_type)
+        except Exception as e:
+            print(f"Error processing {img_path.name}: {e}")
+
+    async def sort_async(self) -> None:
+        image_paths = self._pending_paths()
+        semaphore = asyncio.Semaphore(self.max_in_flight)
+
+        tasks = [asyncio.ensure_future(self._process_image_async(p, semaphore)) for p in image_paths]
+        for task in tqdm(asyncio.as_completed(tasks), total=len(tasks), desc="Sorting images"):
+            await task
@@ -0,0 +1,65 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+from book_automation.records.page_type import PageType
+from book_automation.sorter.classifier.page_features import PageFeatureExtractor
+from book_automation.sorter.classifier.page_type_classifier import PageTypeClassifier
+from book_automation.sorter.image_sorter import ImageSorter, SortMode
+from book_automation.sorter.sequence_labeler import SequenceLabeler, SequenceSortReport
+
+
+class SequenceImageSorter(ImageSorter):
+    """
+    ImageSorter that exploits page order: a cheap local signal splits the book into runs of
+    similar pages and the classifier is only asked about run boundaries and a sample of each
+    run (see SequenceLabeler). The sort report shows how many classifier calls were saved.
+    """
+
+    def __init__(
+        self,
+        input_dir: Path,
+        output_dir: Path,
+        classifier: PageTypeClassifier,
+        labeler: SequenceLabeler = None,
+        max_workers: int = None,
+        sort_mode: SortMode = SortMode.MOVE
+    ):
+        super().__init__(input_dir, output_dir, classifier, max_workers=max_workers, sort_mode=sort_mode)
+        self.labeler = labeler or SequenceLabeler()
+        self.extractor = PageFeatureExtractor()
+
+    def _signal(self, img_path: Path) -> np.ndarray:
+        with Image.open(img_path) as img:
+            return PageFeatureExtractor.summary(self.extractor.extract(img))
+
+    async def sort_async(self) -> SequenceSortReport:
+        image_paths = self._pending_paths()
+        if not image_paths:
+            return SequenceSortReport(pages=0, api_calls=0, segments=0)
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            signals = np.stack(list(executor.map(self._signal, image_paths)))
+
+        async def classify(index: int) -> PageType:
+            img = await asyncio.to_thread(self._load_image, image_paths[index])
+            return await self.classifier.classify_async(img)
+
+        page_types, report = await self.labeler.label(signals, classify)
+
+        for img_path, page_type in zip(image_paths, page_types):
+            if page_type is None:
+                continue
+            try:
+                self._place(img_path, page_type)
+            except Exception as e:
+                print(f"Error processing {img_path.name}: {e}")
+
+        print(f"Sequence sort: {report.summary()}")
+        return report
+
+    def sort(self) -> SequenceSortReport:
+        return asyncio.run(self.sort_async())
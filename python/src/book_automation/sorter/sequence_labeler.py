@@ -0,0 +1,134 @@
+import asyncio
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, List, Tuple
+
+import numpy as np
+
+from book_automation.records.page_type import PageType
+
+
+@dataclass
+class SequenceSortReport:
+    pages: int
+    api_calls: int
+    segments: int
+
+    @property
+    def saved_calls(self) -> int:
+        return self.pages - self.api_calls
+
+    def summary(self) -> str:
+        saved = self.saved_calls / self.pages if self.pages else 0.0
+        return (f"{self.pages} pages in {self.segments} runs: {self.api_calls} classifier calls, "
+                f"{self.saved_calls} saved ({saved:.0%})")
+
+
+class SequenceLabeler:
+    """
+    Labels a book's pages in reading order while calling the (expensive) classifier on as
+    few pages as possible.
+
+    A cheap per-page signal splits the book into runs of similar-looking pages: a run
+    ends wherever the signal jumps by more than ``boundary_factor`` times the book's typical
+    page-to-page change. Inside a run only the first and last page and every
+    ``sample_every``-th page are classified. Where two neighbouring probes agree, every page
+    between them takes their label; where they disagree, the gap is bisected until the
+    boundary between the two types is pinned to adjacent pages.
+    """
+
+    def __init__(self,
+                 sample_every: int = 8,
+                 boundary_factor: float = 3.0,
+                 min_boundary_distance: float = 0.5,
+                 max_concurrency: int = 32):
+        self.sample_every = max(1, sample_every)
+        self.boundary_factor = boundary_factor
+        self.min_boundary_distance = min_boundary_distance
+        self.max_concurrency = max_concurrency
+
+    def segment(self, signals: np.ndarray) -> List[Tuple[int, int]]:
+        """
+        Split pages into runs, returned as inclusive (start, end) index pairs.
+        """
+        n_pages = len(signals)
+        if n_pages == 0:
+            return []
+
+        normalized = (signals - signals.mean(axis=0)) / (signals.std(axis=0) + 1e-6)
+        scale = np.sqrt(normalized.shape[1])
+        distances = np.linalg.norm(np.diff(normalized, axis=0), axis=1) / scale
+        if len(distances) == 0:
+            return [(0, 0)]
+
+        # Typical same-type change. Lag-2 distances cover books where almost every page
+        # changes type (e.g. blank versos alternating with plates)
+        noise = float(np.median(distances))
+        if n_pages > 2:
+            lag2 = np.linalg.norm(normalized[2:] - normalized[:-2], axis=1) / scale
+            noise = min(noise, float(np.median(lag2)))
+
+        threshold = max(self.min_boundary_distance, self.boundary_factor * noise)
+        boundaries = [i + 1 for i, d in enumerate(distances) if d > threshold]
+
+        starts = [0] + boundaries
+        ends = [b - 1 for b in boundaries] + [n_pages - 1]
+        return list(zip(starts, ends))
+
+    def _initial_probes(self, start: int, end: int) -> List[int]:
+        return sorted(set(range(start, end + 1, self.sample_every)) | {end})
+
+    @staticmethod
+    def _missing_probes(probes: List[int], labels: Dict[int, PageType]) -> List[int]:
+        missing = []
+        for left, right in zip(probes, probes[1:]):
+            if right - left > 1 and labels[left] != labels[right]:
+                missing.append((left + right) // 2)
+        return missing
+
+    async def label(self,
+                    signals: np.ndarray,
+                    classify: Callable[[int], Awaitable[PageType]]) -> Tuple[List[PageType], SequenceSortReport]:
+        """
+        Args:
+            signals: (n_pages, n_features) cheap per-page signal, in reading order
+            classify: coroutine returning the page type of the page at an index
+
+        Returns:
+            The page type of every page (None where it could not be determined) and a
+            report of classifier calls made
+        """
+        segments = self.segment(signals)
+        labels: Dict[int, PageType] = {}
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def probe(index: int):
+            async with semaphore:
+                try:
+                    labels[index] = await classify(index)
+                except Exception as e:
+                    # Left unlabelled; neighbouring probes then disagree and get bisected
+                    print(f"Error classifying page {index}: {e}")
+                    labels[index] = None
+
+        segment_probes = [self._initial_probes(start, end) for start, end in segments]
+        pending = [i for probes in segment_probes for i in probes]
+
+        # Each round classifies every probe we currently need, then bisects disagreements
+        while pending:
+            await asyncio.gather(*(probe(i) for i in pending))
+            pending = []
+            for probes in segment_probes:
+                missing = self._missing_probes(probes, labels)
+                probes.extend(missing)
+                probes.sort()
+                pending.extend(missing)
+
+        page_types: List[PageType] = [None] * len(signals)
+        for probes in segment_probes:
+            for left, right in zip(probes, probes[1:]):
+                if labels[left] is not None and labels[left] == labels[right]:
+                    page_types[left:right + 1] = [labels[left]] * (right - left + 1)
+            for index in probes:
+                page_types[index] = labels[index]
+
+        return page_types, SequenceSortReport(pages=len(signals), api_calls=len(labels), segments=len(segments))
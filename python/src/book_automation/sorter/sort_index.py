@@ -0,0 +1,121 @@
+import json
+import os
+import threading
+from enum import Enum
+from pathlib import Path
+from typing import Dict, List, Iterable
+
+from book_automation.records.page_type import PageType
+
+INDEX_FILENAME = "index.jsonl"
+
+
+class LinkMode(Enum):
+    NONE = "none"
+    HARDLINK = "hardlink"
+    SYMLINK = "symlink"
+
+
+class SortIndex:
+    """
+    Append-only ``page -> page type`` index written by ImageSorter instead of moving files.
+
+    Each classification is appended as one JSON line and flushed immediately, so a crash
+    loses at most the page being written and a re-run only classifies pages missing from
+    the index. Pages are stored relative to the index file, which keeps the index valid
+    when the book folder is moved. If a page appears twice the last entry wins.
+    """
+
+    def __init__(self, index_path: Path):
+        self.index_path = Path(index_path)
+        self._lock = threading.Lock()
+        self._entries: Dict[str, PageType] = self._read()
+        self._torn_tail = self._ends_mid_line()
+
+    def _read(self) -> Dict[str, PageType]:
+        entries: Dict[str, PageType] = {}
+        if not self.index_path.exists():
+            return entries
+
+        with open(self.index_path) as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                    entries[record["page"]] = PageType(record["type"])
+                except (ValueError, KeyError):
+                    # A torn final line from an interrupted write; that page is redone
+                    continue
+        return entries
+
+    def _ends_mid_line(self) -> bool:
+        if not self.index_path.exists() or self.index_path.stat().st_size == 0:
+            return False
+        with open(self.index_path, "rb") as f:
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) != b"\n"
+
+    def _relative(self, page_path: Path) -> str:
+        return os.path.relpath(Path(page_path).absolute(), self.index_path.parent.absolute())
+
+    def resolve(self, page: str) -> Path:
+        return self.index_path.parent / page
+
+    def __contains__(self, page_path: Path) -> bool:
+        return self._relative(page_path) in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def covers(self, page_paths: Iterable[Path]) -> bool:
+        return all(p in self for p in page_paths)
+
+    def entries(self) -> Dict[Path, PageType]:
+        return {self.resolve(page): page_type for page, page_type in self._entries.items()}
+
+    def record(self, page_path: Path, page_type: PageType) -> None:
+        page = self._relative(page_path)
+        line = json.dumps({"page": page, "type": page_type.value}) + "\n"
+
+        with self._lock:
+            self.index_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.index_path, "a") as f:
+                if self._torn_tail:
+                    # Terminate the torn line so it cannot swallow this entry
+                    f.write("\n")
+                    self._torn_tail = False
+                f.write(line)
+                f.flush()
+                os.fsync(f.fileno())
+            self._entries[page] = page_type
+
+    def select(self, page_type: PageType) -> List[Path]:
+        """
+        Paths of every indexed page of ``page_type``, in page order.
+        """
+        return sorted(self.resolve(page) for page, t in self._entries.items() if t == page_type)
+
+    @staticmethod
+    def link(source: Path, dest: Path, link_mode: LinkMode) -> None:
+        if link_mode == LinkMode.NONE:
+            return
+        if dest.exists() or dest.is_symlink():
+            dest.unlink()
+
+        if link_mode == LinkMode.HARDLINK:
+            try:
+                os.link(source, dest)
+                return
+            except OSError:
+                # Cross-device or unsupported filesystem (e.g. synced cloud folders)
+                pass
+        os.symlink(Path(source).absolute(), dest)
+
+    def materialize(self, page_type: PageType, dest_dir: Path, link_mode: LinkMode = LinkMode.HARDLINK) -> Path:
+        """
+        Expose the pages of ``page_type`` as links in ``dest_dir`` for stages that take a folder.
+        """
+        dest_dir = Path(dest_dir)
+        dest_dir.mkdir(parents=True, exist_ok=True)
+        for page_path in self.select(page_type):
+            self.link(page_path, dest_dir / page_path.name, link_mode)
+        return dest_dir
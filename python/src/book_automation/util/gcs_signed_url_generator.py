@@ -24,3 +24,6 @@ class GcsSignedUrlGenerator:
         )
 
         return url
+
+    def blob_exists(self, bucket_name, blob_name) -> bool:
+        return self.client.bucket(bucket_name).blob(blob_name).exists()
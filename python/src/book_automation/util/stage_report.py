@@ -0,0 +1,60 @@
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Dict, List
+
+
+class StageReport:
+    """
+    Collects wall-clock timings of pipeline stages, plus optional per-item timings
+    (e.g. per page or per shard), and prints them as one summary table.
+    """
+
+    def __init__(self, title: str = "Stage report"):
+        self.title = title
+        self._lock = threading.Lock()
+        self._stages: "OrderedDict[str, Dict]" = OrderedDict()
+        self._items: Dict[str, List[float]] = {}
+
+    @contextmanager
+    def stage(self, name: str, **details):
+        """
+        Time a block as stage ``name``. The yielded dict can be filled with details
+        (page counts, bytes, ...) that are shown next to the timing.
+        """
+        start = time.perf_counter()
+        try:
+            yield details
+        finally:
+            self.record(name, time.perf_counter() - start, **details)
+
+    def record(self, name: str, seconds: float, **details) -> None:
+        with self._lock:
+            stage = self._stages.setdefault(name, {"seconds": 0.0, "details": {}})
+            stage["seconds"] += seconds
+            stage["details"].update(details)
+
+    def record_item(self, stage: str, seconds: float) -> None:
+        with self._lock:
+            self._items.setdefault(stage, []).append(seconds)
+
+    def seconds(self, name: str) -> float:
+        stage = self._stages.get(name)
+        return stage["seconds"] if stage else 0.0
+
+    def item_timings(self, stage: str) -> List[float]:
+        return list(self._items.get(stage, []))
+
+    def summary(self) -> str:
+        lines = [self.title]
+        with self._lock:
+            for name, stage in self._stages.items():
+                details = ", ".join(f"{k}={v}" for k, v in stage["details"].items())
+                lines.append(f"  {name:<24} {stage['seconds']:>9.2f} s" + (f"  ({details})" if details else ""))
+            for name, timings in self._items.items():
+                if timings:
+                    ordered = sorted(timings)
+                    lines.append(f"  {name + ' per item':<24} n={len(ordered)} "
+                                 f"median={ordered[len(ordered) // 2]:.2f} s max={ordered[-1]:.2f} s")
+        return "\n".join(lines)
@@ -0,0 +1,274 @@
+import io
+import json
+import os
+import re
+import shutil
+import stat
+import sys
+import tempfile
+import threading
+import time
+import uuid
+import zipfile
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, Optional
+
+from PIL import Image
+
+# Fake CLIs put on PATH. They only touch the stand-in's workspace folder, which plays
+# the pod's /workspace volume
+_FAKE_RUNPODCTL = """#!{python}
+import sys
+sys.exit(0)
+"""
+
+_FAKE_SCP = """#!{python}
+import os, shutil, sys, time
+source, target = sys.argv[-2], sys.argv[-1]
+bandwidth = float(os.environ.get("RUNPOD_STANDIN_UPLOAD_BPS") or 0)
+if bandwidth:
+    time.sleep(os.path.getsize(source) / bandwidth)
+remote = target.split(":", 1)[1]
+shutil.copy(source, os.path.join(os.environ["RUNPOD_STANDIN_WORKSPACE"], os.path.basename(remote)))
+"""
+
+_FAKE_SSH = """#!{python}
+import os, sys
+command = sys.argv[-1].split()
+if command[:2] == ["test", "-f"]:
+    path = os.path.join(os.environ["RUNPOD_STANDIN_WORKSPACE"], os.path.basename(command[2]))
+    sys.exit(0 if os.path.isfile(path) else 1)
+sys.exit(1)
+"""
+
+
+class RunPodStandIn:
+    """
+    Local stand-in for a Real-ESRGAN pod, the RunPod GraphQL API, the ``runpodctl`` /
+    ``scp`` / ``ssh`` CLIs and the GCS output bucket, for end-to-end runs of
+    ``RunPodBatchRunner`` without a pod or credentials.
+
+    The server implements ``/health``, ``POST /jobs``, ``/jobs/{id}/status``,
+    ``/jobs/{id}/events`` and range-capable downloads of ``jobs/{id}_out.zip``. A job
+    "upscales" every page of its input zip with a nearest-neighbour resize by ``scale``,
+    taking ``seconds_per_page`` per page one job at a time, like a single GPU.
+    Downloads (and uploads through the fake scp) are throttled to ``bandwidth`` bytes per
+    second per connection when set.
+
+    Used as a context manager, it points the RunPod clients at itself through the
+    ``RUNPOD_PROXY_URL_TEMPLATE`` and ``RUNPOD_GRAPHQL_URL`` environment variables and puts
+    the fake CLIs first on PATH; ``url_generator`` stands in for GcsSignedUrlGenerator.
+    """
+
+    def __init__(self,
+                 seconds_per_page: float = 0.0,
+                 scale: int = 1,
+                 bandwidth: Optional[float] = None,
+                 startup_seconds: float = 0.0,
+                 gpu_util_percent: float = 0.0):
+        self.seconds_per_page = seconds_per_page
+        self.scale = scale
+        self.bandwidth = bandwidth
+        self.startup_seconds = startup_seconds
+        self.gpu_util_percent = gpu_util_percent
+
+        self.root = Path(tempfile.mkdtemp(prefix="runpod_standin_"))
+        self.workspace = self.root / "workspace"
+        self.bucket = self.root / "bucket"
+        self.bin_dir = self.root / "bin"
+        for d in (self.workspace, self.bucket / "jobs", self.bin_dir):
+            d.mkdir(parents=True)
+
+        self.jobs: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+        self._gpu = threading.Lock()
+        self._started_at = time.monotonic()
+        self._saved_env: Dict[str, Optional[str]] = {}
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self.url = f"http://127.0.0.1:{self.httpd.server_port}"
+        self.url_generator = _StandInUrlGenerator(self)
+
+    def __enter__(self):
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+        self._write_fake_clis()
+        credentials = self.root / "gcs_credentials.json"
+        credentials.write_text("{}")
+        self._set_env({
+            "PATH": f"{self.bin_dir}{os.pathsep}{os.environ.get('PATH', '')}",
+            "RUNPOD_PROXY_URL_TEMPLATE": self.url + "/",
+            "RUNPOD_GRAPHQL_URL": self.url + "/graphql",
+            "RUNPOD_API_KEY": "stand-in",
+            "RUNPOD_STANDIN_WORKSPACE": str(self.workspace),
+            "RUNPOD_STANDIN_UPLOAD_BPS": str(self.bandwidth or ""),
+            "GCS_CREDENTIALS_PATH": str(credentials),
+        })
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        for key, value in self._saved_env.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def _set_env(self, values: Dict[str, str]):
+        for key, value in values.items():
+            self._saved_env.setdefault(key, os.environ.get(key))
+            os.environ[key] = value
+
+    def _write_fake_clis(self):
+        for name, script in (("runpodctl", _FAKE_RUNPODCTL), ("scp", _FAKE_SCP), ("ssh", _FAKE_SSH)):
+            path = self.bin_dir / name
+            path.write_text(script.format(python=sys.executable))
+            path.chmod(path.stat().st_mode | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH)
+
+    def _run_job(self, job_id: str, input_path: Path):
+        job = self.jobs[job_id]
+        try:
+            with zipfile.ZipFile(input_path) as zin:
+                members = [i for i in zin.infolist() if not i.is_dir()]
+                job["total"] = len(members)
+                buffer = io.BytesIO()
+                # One job on the GPU at a time
+                with self._gpu, zipfile.ZipFile(buffer, "w", zipfile.ZIP_STORED) as zout:
+                    job["status"] = "processing"
+                    for info in members:
+                        time.sleep(self.seconds_per_page)
+                        with Image.open(zin.open(info)) as img:
+                            out = img.resize((img.width * self.scale, img.height * self.scale), Image.NEAREST)
+                            page = io.BytesIO()
+                            out.save(page, format="PNG")
+                        zout.writestr(f"output/{Path(info.filename).stem}.png", page.getvalue())
+                        job["processed"] += 1
+            (self.bucket / "jobs" / f"{job_id}_out.zip").write_bytes(buffer.getvalue())
+            job["status"] = "completed"
+        except Exception as e:
+            job["status"] = "error"
+            job["error"] = str(e)
+
+    def _handler(self):
+        standin = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def _json(self, payload, status=200):
+                body = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _body(self):
+                return json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+
+            def do_POST(self):
+                if self.path == "/graphql":
+                    self._json({"data": {"pod": {
+                        "id": "stand-in",
+                        "name": "stand-in",
+                        "runtime": {
+                            "uptimeInSeconds": int(time.monotonic() - standin._started_at),
+                            "ports": [{"ip": "127.0.0.1", "isIpPublic": True, "privatePort": 22,
+                                       "publicPort": 22, "type": "tcp"}],
+                            "gpus": [{"id": "gpu0", "gpuUtilPercent": standin.gpu_util_percent,
+                                      "memoryUtilPercent": 0}],
+                            "container": {"cpuPercent": 0, "memoryPercent": 0},
+                        },
+                    }}})
+                elif self.path == "/jobs":
+                    payload = self._body()
+                    input_path = standin.workspace / payload["input_filename"]
+                    if not input_path.exists():
+                        self._json({"error": f"{payload['input_filename']} not found"}, 404)
+                        return
+                    job_id = uuid.uuid4().hex
+                    standin.jobs[job_id] = {"status": "queued", "processed": 0, "total": None}
+                    threading.Thread(target=standin._run_job, args=(job_id, input_path), daemon=True).start()
+                    self._json({"job_id": job_id})
+                else:
+                    self.send_error(404)
+
+            def do_GET(self):
+                if self.path == "/health":
+                    ready = time.monotonic() - standin._started_at >= standin.startup_seconds
+                    self._json({"status": "ok" if ready else "starting"}, 200 if ready else 503)
+                    return
+
+                match = re.match(r"^/jobs/([0-9a-f]+)/(status|events)$", self.path)
+                if match:
+                    job = standin.jobs.get(match.group(1))
+                    if job is None:
+                        self._json({"error": "unknown job"}, 404)
+                    elif match.group(2) == "status":
+                        self._json(dict(job))
+                    else:
+                        self._events(job)
+                    return
+
+                if self.path.startswith("/outputs/"):
+                    self._download(standin.bucket / self.path[len("/outputs/"):])
+                    return
+                self.send_error(404)
+
+            def _events(self, job):
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.end_headers()
+                last = None
+                while True:
+                    snapshot = dict(job)
+                    if snapshot != last:
+                        self.wfile.write(f"data: {json.dumps(snapshot)}\n\n".encode())
+                        self.wfile.flush()
+                        last = snapshot
+                    if snapshot["status"] in ("completed", "error"):
+                        return
+                    time.sleep(0.05)
+
+            def _download(self, path: Path):
+                if not path.is_file():
+                    self.send_error(404)
+                    return
+                data = path.read_bytes()
+                start, end, status = 0, len(data) - 1, 200
+                range_header = self.headers.get("Range")
+                if range_header:
+                    first, last = re.match(r"bytes=(\d*)-(\d*)", range_header).groups()
+                    if first == "":
+                        start = max(0, len(data) - int(last))
+                    else:
+                        start, end = int(first), min(int(last), end) if last else end
+                    status = 206
+                body = data[start:end + 1]
+
+                self.send_response(status)
+                self.send_header("Accept-Ranges", "bytes")
+                if status == 206:
+                    self.send_header("Content-Range", f"bytes {start}-{end}/{len(data)}")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                chunk = 1 << 16
+                for offset in range(0, len(body), chunk):
+                    if standin.bandwidth:
+                        time.sleep(min(chunk, len(body) - offset) / standin.bandwidth)
+                    self.wfile.write(body[offset:offset + chunk])
+
+        return Handler
+
+
+class _StandInUrlGenerator:
+    def __init__(self, standin: RunPodStandIn):
+        self.standin = standin
+
+    def generate_signed_url(self, bucket_name, blob_name, expiration_minutes=60):
+        return f"{self.standin.url}/outputs/{blob_name}"
+
+    def blob_exists(self, bucket_name, blob_name) -> bool:
+        return (self.standin.bucket / blob_name).is_file()
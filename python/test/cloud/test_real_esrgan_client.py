@@ -0,0 +1,97 @@
+import json
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from book_automation.externals.real_esrgan_client import RealESRGANClient
+
+
+class JobServer:
+    """
+    Minimal job server; ``statuses`` are returned by successive /status calls and, when
+    ``events`` is set, streamed from /events.
+    """
+
+    def __init__(self, statuses, events=False):
+        self.statuses = list(statuses)
+        self.events = events
+        self.status_calls = 0
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                if self.path.endswith("/events"):
+                    if not server.events:
+                        self.send_error(404)
+                        return
+                    self.send_response(200)
+                    self.send_header("Content-Type", "text/event-stream")
+                    self.end_headers()
+                    for status in server.statuses:
+                        self.wfile.write(f"data: {json.dumps(status)}\n\n".encode())
+                        self.wfile.flush()
+                    return
+                server.status_calls += 1
+                status = server.statuses[min(server.status_calls, len(server.statuses)) - 1]
+                body = json.dumps(status).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_port}"
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+class TestRealESRGANClient(unittest.TestCase):
+
+    def server(self, statuses, events=False):
+        server = JobServer(statuses, events)
+        self.addCleanup(server.close)
+        return server
+
+    def client(self, url, **kwargs):
+        return RealESRGANClient(url, min_poll_interval=0.01, max_poll_interval=0.05, **kwargs)
+
+    def test_follows_event_stream(self):
+        server = self.server([
+            {"status": "processing", "processed": 1, "total": 2},
+            {"status": "completed", "processed": 2, "total": 2},
+        ], events=True)
+        status = self.client(server.url).wait_for_completion("job", show_progress=False)
+        self.assertEqual(status["status"], "completed")
+        self.assertEqual(server.status_calls, 0)
+
+    def test_falls_back_to_polling_without_events(self):
+        server = self.server([{"status": "processing"}] * 3 + [{"status": "completed"}])
+        client = self.client(server.url)
+        status = client.wait_for_completion("job", show_progress=False)
+        self.assertEqual(status["status"], "completed")
+        self.assertEqual(server.status_calls, 4)
+        self.assertFalse(client._events_supported)
+
+    def test_times_out(self):
+        server = self.server([{"status": "processing"}])
+        with self.assertRaises(TimeoutError):
+            self.client(server.url).wait_for_completion("job", timeout=0.2, show_progress=False)
+
+    def test_dead_server_fails_fast(self):
+        server = self.server([{"status": "processing"}])
+        url = server.url
+        server.close()
+        client = self.client(url, request_timeout=1, max_consecutive_errors=3)
+        with self.assertRaises(ConnectionError):
+            client.wait_for_completion("job", show_progress=False)
+
+
+if __name__ == "__main__":
+    unittest.main()
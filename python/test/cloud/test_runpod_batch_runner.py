@@ -0,0 +1,148 @@
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from PIL import Image
+
+from book_automation.externals.real_esrgan_client import RealESRGANClient
+from book_automation.processor.cloud.runpod.runpod_batch_runner import RunPodBatchRunner
+from book_automation.processor.cloud.runpod.runpod_pod_pool import RunPodPodPool
+from book_automation.processor.cloud.runpod.runpod_session_factory import RunPodClientSessionFactory
+from book_automation.processor.cloud.shard_uploader import Shard
+from book_automation.processor.cloud.upscale_manifest import UpscaleManifest
+from .runpod_standin import RunPodStandIn
+
+
+class TestRunPodBatchRunner(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        root = Path(self.tmp.name)
+        self.input_dir = root / "content_page"
+        self.output_dir = root / "content_page_upscaled"
+        self.input_dir.mkdir()
+        for i in range(7):
+            Image.new("L", (20, 30), color=i * 30).save(self.input_dir / f"page_{i:04d}.tif")
+
+    def runner(self, standin, pod_ids="pod-a", **kwargs):
+        return RunPodBatchRunner(
+            runpod_pod_id=pod_ids,
+            input_dir=self.input_dir,
+            output_dir=self.output_dir,
+            shard_size=3,
+            url_generator=standin.url_generator,
+            **kwargs
+        )
+
+    def test_upscales_every_page_across_shards(self):
+        with RunPodStandIn(scale=2) as standin:
+            self.runner(standin).run()
+            self.assertEqual(len(standin.jobs), 3)
+
+        outputs = sorted(p.name for p in self.output_dir.iterdir())
+        self.assertEqual(outputs, [f"page_{i:04d}.png" for i in range(7)])
+        with Image.open(self.output_dir / "page_0003.png") as img:
+            self.assertEqual(img.size, (40, 60))
+            self.assertEqual(img.getpixel((0, 0)), 90)
+        self.assertTrue(UpscaleManifest.for_output_dir(self.output_dir).complete)
+
+    def test_shard_zip_work_dirs_are_removed(self):
+        scratch = Path(self.tmp.name) / "scratch"
+        scratch.mkdir()
+        with RunPodStandIn() as standin:
+            with mock.patch("tempfile.tempdir", str(scratch)):
+                self.runner(standin, pod_ids=["pod-a", "pod-b"]).run()
+        self.assertEqual(list(scratch.iterdir()), [])
+
+    def test_unreadable_page_fails_the_run_instead_of_hanging(self):
+        def pending_pages(pages):
+            yield from list(pages)[:4]
+            raise OSError("unreadable page")
+
+        with RunPodStandIn() as standin:
+            runner = self.runner(standin)
+            runner._pending_pages = pending_pages
+            with self.assertRaises(OSError):
+                runner.run()
+
+    def test_retried_shard_keeps_its_content_addressed_name(self):
+        names = []
+
+        def upload_shard(shard):
+            names.append(shard.name)
+            raise IOError("pod went away")
+
+        with RunPodStandIn() as standin:
+            runner = self.runner(standin)
+            runner.manifest = UpscaleManifest.for_output_dir(self.output_dir)
+            runner._transfer_slots = threading.Semaphore(1)
+            uploader = mock.Mock(upload_shard=upload_shard)
+            shard = Shard(0, "content_page_0000", sorted(self.input_dir.iterdir())[:3])
+            for _ in range(2):
+                with self.assertRaises(IOError):
+                    runner._process_shard(mock.Mock(), uploader, shard)
+
+        self.assertEqual(shard.name, "content_page_0000")
+        self.assertEqual(names[0], names[1])
+        self.assertRegex(names[0], r"^content_page_0000_[0-9a-f]{12}$")
+
+    def test_pod_that_died_is_not_handed_to_the_next_book(self):
+        started = []
+
+        def start_session(**kwargs):
+            started.append(RunPodClientSessionFactory.create_session(**kwargs))
+            return started[-1]
+
+        with RunPodStandIn() as standin, \
+                RunPodPodPool(["pod-a"], session_factory=start_session, reap_interval=3600) as pool:
+            runner = self.runner(standin, pod_pool=pool)
+            with mock.patch.object(RunPodBatchRunner, "_process_shard", side_effect=IOError("connection reset")), \
+                    mock.patch.object(RealESRGANClient, "is_healthy", return_value=False):
+                with self.assertRaises(RuntimeError):
+                    runner.run()
+
+            self.assertFalse(pool.has_warm_pod())
+            self.assertIsNot(pool.acquire(), started[0])
+            self.assertEqual(len(started), 2)
+
+    def test_multiple_pods_share_the_book(self):
+        with RunPodStandIn() as standin:
+            self.runner(standin, pod_ids=["pod-a", "pod-b"]).run()
+        self.assertEqual(len(list(self.output_dir.iterdir())), 7)
+
+    def test_rerun_only_redoes_missing_pages(self):
+        with RunPodStandIn() as standin:
+            self.runner(standin).run()
+            (self.output_dir / "page_0004.png").unlink()
+            self.runner(standin).run()
+            # Only the missing page is sent again
+            self.assertEqual([job["total"] for job in standin.jobs.values()][3:], [1])
+
+        self.assertTrue((self.output_dir / "page_0004.png").exists())
+
+    def test_rerun_after_failed_download_reuses_job_output(self):
+        with RunPodStandIn() as standin:
+            class FailingUrlGenerator:
+                def generate_signed_url(self, bucket_name, blob_name, expiration_minutes=60):
+                    raise IOError("network down")
+
+                def blob_exists(self, bucket_name, blob_name):
+                    return standin.url_generator.blob_exists(bucket_name, blob_name)
+
+            runner = self.runner(standin)
+            runner.url_generator = FailingUrlGenerator()
+            with self.assertRaises(RuntimeError):
+                runner.run()
+            self.assertFalse(UpscaleManifest.for_output_dir(self.output_dir).complete)
+
+            self.runner(standin).run()
+            self.assertEqual(len(standin.jobs), 3)
+
+        self.assertEqual(len(list(self.output_dir.iterdir())), 7)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,120 @@
+import threading
+import unittest
+
+from book_automation.processor.cloud.runpod.runpod_pod_pool import RunPodPodPool
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeSession:
+    def __init__(self, pod_id):
+        self.pod_id = pod_id
+        self.stopped = False
+
+    def stop_pod(self):
+        self.stopped = True
+
+
+class TestRunPodPodPool(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.started = []
+
+    def factory(self, pod_id, **kwargs):
+        session = FakeSession(pod_id)
+        self.started.append(session)
+        return session
+
+    def pool(self, pod_ids, **kwargs):
+        pool = RunPodPodPool(pod_ids, session_factory=self.factory, clock=self.clock,
+                             reap_interval=3600, **kwargs)
+        self.addCleanup(pool.shutdown)
+        return pool
+
+    def test_reuses_warm_session_across_books(self):
+        pool = self.pool(["pod-a"])
+        with pool.session() as first:
+            pass
+        with pool.session() as second:
+            pass
+        self.assertIs(first, second)
+        self.assertEqual(len(self.started), 1)
+        self.assertFalse(first.stopped)
+
+    def test_concurrent_runners_get_different_pods(self):
+        pool = self.pool(["pod-a", "pod-b"])
+        first = pool.acquire()
+        second = pool.acquire()
+        self.assertNotEqual(first.pod_id, second.pod_id)
+
+    def test_acquire_waits_for_release(self):
+        pool = self.pool(["pod-a"])
+        held = pool.acquire()
+        acquired = []
+        waiter = threading.Thread(target=lambda: acquired.append(pool.acquire()))
+        waiter.start()
+        waiter.join(0.1)
+        self.assertEqual(acquired, [])
+
+        pool.release(held)
+        waiter.join(5)
+        self.assertEqual(acquired, [held])
+
+    def test_acquire_times_out_when_all_pods_busy(self):
+        pool = RunPodPodPool(["pod-a"], session_factory=self.factory, reap_interval=3600)
+        self.addCleanup(pool.shutdown)
+        pool.acquire()
+        with self.assertRaises(TimeoutError):
+            pool.acquire(timeout=0.05)
+
+    def test_idle_pods_are_stopped(self):
+        pool = self.pool(["pod-a"], idle_timeout=60)
+        with pool.session() as session:
+            pass
+        self.clock.now = 30
+        pool.reap()
+        self.assertFalse(session.stopped)
+
+        self.clock.now = 61
+        pool.reap()
+        self.assertTrue(session.stopped)
+        with pool.session() as fresh:
+            pass
+        self.assertIsNot(fresh, session)
+
+    def test_max_lifetime_stops_pod_on_release(self):
+        pool = self.pool(["pod-a"], max_lifetime=100)
+        session = pool.acquire()
+        self.clock.now = 150
+        pool.release(session)
+        self.assertTrue(session.stopped)
+
+    def test_unhealthy_pod_is_stopped_instead_of_kept_warm(self):
+        pool = self.pool(["pod-a"])
+        dead = pool.acquire()
+        pool.release(dead, healthy=False)
+        self.assertTrue(dead.stopped)
+        self.assertFalse(pool.has_warm_pod())
+
+        fresh = pool.acquire()
+        self.assertIsNot(fresh, dead)
+        self.assertEqual(len(self.started), 2)
+
+    def test_shutdown_stops_every_pod(self):
+        pool = self.pool(["pod-a", "pod-b"])
+        sessions = [pool.acquire(), pool.acquire()]
+        pool.shutdown()
+        self.assertTrue(all(s.stopped for s in sessions))
+        with self.assertRaises(RuntimeError):
+            pool.acquire()
+
+
+if __name__ == "__main__":
+    unittest.main()
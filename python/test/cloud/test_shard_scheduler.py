@@ -0,0 +1,87 @@
+import threading
+import unittest
+from pathlib import Path
+
+from book_automation.processor.cloud.shard_scheduler import ShardScheduler, gpu_headroom, worker_slots
+from book_automation.processor.cloud.shard_uploader import iter_shards
+
+
+def pod_info(*utilisation):
+    return {"runtime": {"gpus": [{"gpuUtilPercent": u} for u in utilisation]}}
+
+
+class TestShardScheduler(unittest.TestCase):
+
+    def shards(self, n_pages=10, shard_size=2):
+        return list(iter_shards([Path(f"page_{i:04d}.png") for i in range(n_pages)], shard_size, "book"))
+
+    def test_gpu_headroom(self):
+        self.assertEqual(gpu_headroom(pod_info(20)), 80)
+        self.assertEqual(gpu_headroom(pod_info(50, 50)), 100)
+        self.assertEqual(gpu_headroom(pod_info(100)), 10)
+        self.assertEqual(gpu_headroom({"runtime": None}), 10)
+
+    def test_worker_slots_follow_weights(self):
+        self.assertEqual(worker_slots({"a": 90, "b": 30}, 8), {"a": 6, "b": 2})
+        self.assertEqual(worker_slots({"a": 100, "b": 1}, 4), {"a": 4, "b": 1})
+
+    def test_pods_share_one_queue(self):
+        scheduler = ShardScheduler()
+        shards = self.shards()
+        processed = {"a": [], "b": []}
+
+        def worker(pod_id):
+            while (shard := scheduler.take(pod_id)) is not None:
+                processed[pod_id].append(shard.index)
+                scheduler.done(shard)
+
+        threads = [threading.Thread(target=worker, args=(pod_id,)) for pod_id in processed]
+        for t in threads:
+            t.start()
+        scheduler.add_all(shards)
+        for t in threads:
+            t.join(5)
+
+        self.assertEqual(sorted(processed["a"] + processed["b"]), [s.index for s in shards])
+        self.assertEqual(scheduler.unfinished(), [])
+
+    def test_shard_of_dead_pod_goes_to_another_pod(self):
+        scheduler = ShardScheduler()
+        scheduler.add_all(self.shards(n_pages=4))
+
+        first = scheduler.take("a")
+        scheduler.pod_died("a", first)
+        self.assertIsNone(scheduler.take("a"))
+
+        retried = scheduler.take("b")
+        self.assertEqual(retried.index, first.index)
+        scheduler.done(retried)
+        scheduler.done(scheduler.take("b"))
+        self.assertIsNone(scheduler.take("b"))
+        self.assertEqual(scheduler.unfinished(), [])
+
+    def test_gives_up_after_max_attempts(self):
+        scheduler = ShardScheduler(max_attempts=2)
+        scheduler.add_all(self.shards(n_pages=2))
+
+        scheduler.pod_died("a", scheduler.take("a"))
+        scheduler.pod_died("b", scheduler.take("b"))
+        self.assertIsNone(scheduler.take("c"))
+        self.assertEqual([s.index for s in scheduler.unfinished()], [0])
+
+    def test_queue_left_when_every_pod_died(self):
+        scheduler = ShardScheduler()
+        scheduler.add_all(self.shards(n_pages=6))
+        scheduler.pod_died("a", scheduler.take("a"))
+        self.assertEqual(len(scheduler.unfinished()), 3)
+
+    def test_failed_job_is_not_retried(self):
+        scheduler = ShardScheduler()
+        scheduler.add_all(self.shards(n_pages=2))
+        scheduler.fail(scheduler.take("a"))
+        self.assertIsNone(scheduler.take("a"))
+        self.assertEqual([s.index for s in scheduler.unfinished()], [0])
+
+
+if __name__ == "__main__":
+    unittest.main()
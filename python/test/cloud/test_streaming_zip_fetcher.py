@@ -0,0 +1,106 @@
+import io
+import os
+import re
+import tempfile
+import threading
+import unittest
+import zipfile
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+from book_automation.processor.cloud.streaming_zip_fetcher import RangeNotSupported, StreamingZipFetcher
+
+
+class ZipServer:
+    def __init__(self, body: bytes, ranges: bool = True):
+        self.body = body
+        self.ranges = ranges
+        self.requests = []
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                range_header = self.headers.get("Range")
+                server.requests.append(range_header)
+                body, status = server.body, 200
+                headers = {}
+                if server.ranges and range_header:
+                    start, end = re.match(r"bytes=(\d*)-(\d*)", range_header).groups()
+                    size = len(server.body)
+                    if start == "":
+                        start, end = max(0, size - int(end)), size - 1
+                    else:
+                        start, end = int(start), int(end) if end else size - 1
+                    body, status = server.body[start:end + 1], 206
+                    headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+                self.send_response(status)
+                for k, v in headers.items():
+                    self.send_header(k, v)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_port}/out.zip"
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def make_zip(pages):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as zf:
+        for i, (name, data) in enumerate(pages.items()):
+            compression = zipfile.ZIP_DEFLATED if i % 2 else zipfile.ZIP_STORED
+            zf.writestr(f"content_page/{name}", data, compress_type=compression)
+    return buffer.getvalue()
+
+
+class TestStreamingZipFetcher(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.output_dir = Path(self.tmp.name) / "out"
+        self.pages = {f"page_{i:04d}.png": os.urandom(3000) + bytes(50000 * i) for i in range(5)}
+
+    def server(self, ranges=True):
+        server = ZipServer(make_zip(self.pages), ranges)
+        self.addCleanup(server.close)
+        return server
+
+    def test_unpacks_members_into_output_dir(self):
+        server = self.server()
+        written = StreamingZipFetcher(self.output_dir, connections=3).fetch(server.url)
+
+        self.assertEqual(written, sorted(self.pages))
+        for name, data in self.pages.items():
+            self.assertEqual((self.output_dir / name).read_bytes(), data)
+        self.assertEqual(list(self.output_dir.glob("*.part")), [])
+
+    def test_resume_skips_complete_pages(self):
+        server = self.server()
+        self.output_dir.mkdir()
+        (self.output_dir / "page_0000.png").write_bytes(self.pages["page_0000.png"])
+        (self.output_dir / "page_0001.png").write_bytes(b"truncated")
+
+        StreamingZipFetcher(self.output_dir).fetch(server.url)
+
+        # tail + central directory reads, then only the four incomplete members
+        member_requests = [r for r in server.requests if r and not r.startswith("bytes=-")]
+        self.assertEqual(len(member_requests), 4)
+        self.assertEqual((self.output_dir / "page_0001.png").read_bytes(), self.pages["page_0001.png"])
+
+    def test_server_without_ranges(self):
+        server = self.server(ranges=False)
+        with self.assertRaises(RangeNotSupported):
+            StreamingZipFetcher(self.output_dir).fetch(server.url)
+
+
+if __name__ == "__main__":
+    unittest.main()
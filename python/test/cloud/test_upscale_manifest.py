@@ -0,0 +1,78 @@
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+from book_automation.processor.cloud.shard_uploader import iter_shards
+from book_automation.processor.cloud.upscale_manifest import UpscaleManifest
+
+
+class TestUpscaleManifest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        root = Path(self.tmp.name)
+        self.input_dir = root / "content_page"
+        self.output_dir = root / "content_page_upscaled"
+        self.input_dir.mkdir()
+        self.output_dir.mkdir()
+        self.pages = []
+        for i in range(4):
+            page = self.input_dir / f"page_{i:04d}.tif"
+            page.write_bytes(f"page {i}".encode())
+            self.pages.append(page)
+
+    def manifest(self):
+        return UpscaleManifest.for_output_dir(self.output_dir)
+
+    def shards(self):
+        return list(iter_shards(self.pages, 2, "content_page"))
+
+    def test_shard_keys_depend_only_on_content(self):
+        first = [self.manifest().shard_key(s) for s in self.shards()]
+        self.assertEqual(first, [self.manifest().shard_key(s) for s in self.shards()])
+        self.assertNotEqual(first[0], first[1])
+
+        self.pages[0].write_bytes(b"rescanned")
+        changed = [self.manifest().shard_key(s) for s in self.shards()]
+        self.assertNotEqual(changed[0], first[0])
+        self.assertEqual(changed[1], first[1])
+
+    def test_progress_survives_reload(self):
+        manifest = self.manifest()
+        shard = self.shards()[0]
+        key = manifest.shard_key(shard)
+        manifest.update_shard(key, remote_path="/workspace/a.zip", job_id="job-1")
+        (self.output_dir / "page_0000.png").write_bytes(b"up")
+        (self.output_dir / "page_0001.png").write_bytes(b"up")
+        manifest.record_outputs(shard.pages, ["page_0000.png", "page_0001.png"])
+
+        reloaded = self.manifest()
+        self.assertEqual(reloaded.shard(key), {"remote_path": "/workspace/a.zip", "job_id": "job-1"})
+        self.assertTrue(reloaded.page_done(self.pages[0], self.output_dir))
+        self.assertFalse(reloaded.page_done(self.pages[2], self.output_dir))
+        self.assertFalse(reloaded.complete)
+
+    def test_changed_or_missing_output_is_redone(self):
+        manifest = self.manifest()
+        shard = self.shards()[0]
+        manifest.shard_key(shard)
+        (self.output_dir / "page_0000.png").write_bytes(b"up")
+        manifest.record_outputs(shard.pages, ["page_0000.png", "page_0001.png"])
+
+        # page_0001's output never arrived
+        self.assertTrue(manifest.page_done(self.pages[0], self.output_dir))
+        self.assertFalse(manifest.page_done(self.pages[1], self.output_dir))
+
+        self.pages[0].write_bytes(b"rescanned")
+        os.utime(self.pages[0], ns=(1, 1))
+        self.assertFalse(self.manifest().page_done(self.pages[0], self.output_dir))
+
+    def test_mark_complete(self):
+        self.manifest().mark_complete()
+        self.assertTrue(self.manifest().complete)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,56 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+from PIL import Image
+
+from python.src.book_automation.processor.converter.bilevel_image_converter import BilevelImageConverter
+
+
+class TestBilevelImageConverter(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        rng = np.random.default_rng(0)
+        self.pixels = rng.random((120, 90)) > 0.3
+        self.page = os.path.join(self.tmp.name, "page_0001.png")
+        Image.fromarray(self.pixels).save(self.page, dpi=(600, 600))
+
+    def test_writes_group4_tiff_with_dpi(self):
+        output = BilevelImageConverter().process(self.page)
+
+        self.assertEqual(output, os.path.join(self.tmp.name, "page_0001.tiff"))
+        self.assertFalse(os.path.exists(self.page))
+        with Image.open(output) as img:
+            self.assertEqual(img.info["compression"], "group4")
+            self.assertEqual(img.info["dpi"], (600, 600))
+            np.testing.assert_array_equal(np.asarray(img), self.pixels)
+
+    def test_falls_back_to_configured_dpi(self):
+        Image.fromarray(self.pixels).save(self.page)
+        output = BilevelImageConverter(dpi=400).process(self.page, os.path.join(self.tmp.name, "out", "p.tiff"))
+
+        self.assertTrue(os.path.exists(self.page))
+        with Image.open(output) as img:
+            self.assertEqual(img.info["dpi"], (400, 400))
+
+    def test_writes_pbm_from_grayscale(self):
+        gray = os.path.join(self.tmp.name, "gray.png")
+        Image.fromarray(np.where(self.pixels, 230, 20).astype(np.uint8)).save(gray)
+
+        output = BilevelImageConverter(output_format="pbm").process(gray)
+
+        self.assertTrue(output.endswith("gray.pbm"))
+        with Image.open(output) as img:
+            self.assertEqual(img.mode, "1")
+            np.testing.assert_array_equal(np.asarray(img), self.pixels)
+
+    def test_rejects_non_bilevel_format(self):
+        with self.assertRaises(ValueError):
+            BilevelImageConverter(output_format="JPEG")
+
+
+if __name__ == "__main__":
+    unittest.main()
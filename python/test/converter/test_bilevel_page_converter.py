@@ -0,0 +1,94 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import textwrap
+import unittest
+
+import numpy as np
+from PIL import Image
+
+from book_automation.processor.converter.bilevel_page_converter import BilevelPageConverter
+from book_automation.processor.image.adaptive_threshold_processor import AdaptiveThresholdProcessor, \
+    ThresholdMethod
+from book_automation.processor.image.fast_deskew_processor import FastDeskewProcessor
+
+
+class TestBilevelPageConverter(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        rng = np.random.default_rng(0)
+        page = np.full((500, 400, 3), 235, dtype=np.uint8)
+        for y in range(50, 450, 20):
+            x = 40
+            while x < 330:
+                width = int(rng.integers(15, 50))
+                page[y:y + 8, x:x + width] = 30
+                x += width + 10
+        self.jp2 = os.path.join(self.tmp.name, "book_0001.jp2")
+        Image.fromarray(page).rotate(2, fillcolor=(235, 235, 235)).save(self.jp2)
+
+    def test_jp2_to_deskewed_group4_page(self):
+        log_path = os.path.join(self.tmp.name, "angles.jsonl")
+        converter = BilevelPageConverter(
+            processors=[FastDeskewProcessor(log_path=log_path),
+                        AdaptiveThresholdProcessor(method=ThresholdMethod.OTSU)],
+            output_format="tiff",
+            dpi=300)
+
+        output = converter.process(self.jp2, os.path.join(self.tmp.name, "processed", "book_0001.tiff"))
+
+        with Image.open(output) as img:
+            self.assertEqual(img.mode, "1")
+            self.assertEqual(img.info["compression"], "group4")
+            self.assertEqual(img.info["dpi"], (300, 300))
+            self.assertAlmostEqual(FastDeskewProcessor().estimate_angle(img), 0.0, delta=0.15)
+        with open(log_path) as f:
+            entry = json.loads(f.read())
+        self.assertEqual(entry["page"], "book_0001.jp2")
+        self.assertAlmostEqual(entry["angle"], 2.0, delta=0.15)
+
+    def test_binarizes_when_chain_leaves_grayscale(self):
+        output = BilevelPageConverter(processors=[]).process(self.jp2)
+
+        self.assertTrue(output.endswith("book_0001.png"))
+        self.assertFalse(os.path.exists(self.jp2))
+        with Image.open(output) as img:
+            self.assertEqual(img.mode, "1")
+
+    @unittest.skipUnless(os.path.exists("/proc/self/clear_refs"), "needs Linux peak RSS accounting")
+    def test_jpeg_decodes_without_an_rgb_copy(self):
+        # A 48 MB RGB scan converted in a fresh interpreter; decoding to RGB first
+        # would add about 60 MB on top of the gray page and the bilevel output.
+        # The child inherits this process's peak through ru_maxrss, so it resets
+        # and reads its own high-water mark instead
+        jpeg = os.path.join(self.tmp.name, "book_0002.jpg")
+        Image.new("RGB", (4000, 4000), (235, 230, 225)).save(jpeg, quality=90)
+        script = textwrap.dedent("""
+            import sys
+            from PIL import Image
+            from book_automation.processor.converter.bilevel_page_converter import BilevelPageConverter
+
+            def peak_mb():
+                with open("/proc/self/status") as f:
+                    return next(int(line.split()[1]) for line in f if line.startswith("VmHWM")) // 1024
+
+            with open("/proc/self/clear_refs", "w") as f:
+                f.write("5")
+            before = peak_mb()
+            output = BilevelPageConverter(processors=[]).process(sys.argv[1])
+            after = peak_mb()
+            with Image.open(output) as img:
+                assert img.mode == "1" and img.size == (4000, 4000)
+            print(after - before)
+        """)
+        result = subprocess.run([sys.executable, "-c", script, jpeg], capture_output=True, text=True,
+                                env=dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path)))
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertLess(int(result.stdout), 60)
+
+if __name__ == '__main__':
+    unittest.main()
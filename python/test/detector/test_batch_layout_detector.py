@@ -0,0 +1,100 @@
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+from typing import List
+
+from PIL import Image
+
+from book_automation.processor.detector.batch_layout_detector import BatchLayoutDetector
+from book_automation.processor.detector.layout_detector import LayoutDetector
+from book_automation.records.layout_elements import LayoutElement
+
+
+def element_for(image: Image.Image) -> LayoutElement:
+    # The page width identifies the page
+    return LayoutElement(type="paragraph", bbox=(0, 0, image.width, image.height), confidence=1.0)
+
+
+class RemoteDetector(LayoutDetector):
+    remote = True
+
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.calls = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.lock = threading.Lock()
+
+    def detect(self, image: Image.Image) -> List[LayoutElement]:
+        with self.lock:
+            self.calls += 1
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        # Later pages answer faster, so results complete out of order
+        time.sleep(self.latency / image.width)
+        with self.lock:
+            self.in_flight -= 1
+        return [element_for(image)]
+
+
+class LocalBatchDetector(LayoutDetector):
+
+    def __init__(self):
+        self.batch_sizes = []
+
+    def detect(self, image: Image.Image) -> List[LayoutElement]:
+        raise AssertionError("batched detector should not be called page by page")
+
+    def detect_batch(self, images: List[Image.Image]) -> List[List[LayoutElement]]:
+        self.batch_sizes.append(len(images))
+        return [[element_for(image)] for image in images]
+
+
+class TestBatchLayoutDetector(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.input_dir = Path(self.tmp.name)
+        for i in range(1, 13):
+            Image.new("L", (i, 5), 255).save(self.input_dir / f"page_{i:02d}.png")
+        (self.input_dir / "notes.txt").write_text("not an image")
+
+    def widths(self, results):
+        return [(path.name, elements[0].bbox[2]) for path, elements in results]
+
+    def expected(self):
+        return [(f"page_{i:02d}.png", i) for i in range(1, 13)]
+
+    def test_remote_detector_runs_bounded_concurrent_requests_in_order(self):
+        detector = RemoteDetector(latency=0.3)
+        start = time.perf_counter()
+        results = list(BatchLayoutDetector(self.input_dir, detector, max_in_flight=4).detect_iter())
+        elapsed = time.perf_counter() - start
+
+        self.assertEqual(self.widths(results), self.expected())
+        self.assertEqual(detector.max_in_flight, 4)
+        # Serially the latencies would add up to about 0.9 s
+        self.assertLess(elapsed, 0.6)
+
+    def test_local_detector_gets_batches_one_at_a_time(self):
+        detector = LocalBatchDetector()
+        results = BatchLayoutDetector(self.input_dir, detector, batch_size=5, max_in_flight=4).detect()
+
+        self.assertEqual(detector.batch_sizes, [5, 5, 2])
+        self.assertEqual(self.widths(results.items()), self.expected())
+
+    def test_results_stream_before_all_pages_are_done(self):
+        detector = RemoteDetector(latency=0.1)
+        results = BatchLayoutDetector(self.input_dir, detector, max_in_flight=2).detect_iter()
+        path, _ = next(results)
+        self.assertEqual(path.name, "page_01.png")
+        # Only the pages within the in-flight window have been requested so far
+        self.assertLessEqual(detector.calls, 3)
+        results.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
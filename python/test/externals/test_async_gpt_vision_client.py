@@ -0,0 +1,80 @@
+import asyncio
+import os
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+from PIL import Image
+
+from book_automation.externals.async_gpt_vision_client import AsyncGPTVisionClient
+from book_automation.externals.openai_rate_limiter import OpenAIRateLimiter
+
+
+class TestAsyncGPTVisionClient(unittest.TestCase):
+
+    def setUp(self):
+        env = mock.patch.dict(os.environ, {"OPENAI_API_KEY": "test"})
+        env.start()
+        self.addCleanup(env.stop)
+        self.limiter = OpenAIRateLimiter(max_concurrency=1)
+        self.client = AsyncGPTVisionClient(rate_limiter=self.limiter, max_attempts=2)
+        self.img = Image.new("RGB", (20, 20))
+
+    def respond_with(self, create):
+        self.client.client = SimpleNamespace(responses=SimpleNamespace(with_raw_response=SimpleNamespace(create=create)))
+
+    def assert_released(self):
+        self.assertEqual(self.limiter.in_flight, 0)
+        self.assertEqual(self.limiter.reserved_tokens, 0)
+
+    def test_unexpected_error_releases_the_slot(self):
+        async def create(**kwargs):
+            raise ValueError("400 bad request")
+        self.respond_with(create)
+
+        with self.assertRaises(ValueError):
+            asyncio.run(self.client.invoke(self.img, "prompt"))
+        self.assert_released()
+
+    def test_failing_parse_releases_the_slot(self):
+        def parse():
+            raise ValueError("malformed body")
+
+        async def create(**kwargs):
+            return SimpleNamespace(headers={}, parse=parse)
+        self.respond_with(create)
+
+        with self.assertRaises(ValueError):
+            asyncio.run(self.client.invoke(self.img, "prompt"))
+        self.assert_released()
+
+    def test_cancellation_releases_the_slot(self):
+        async def create(**kwargs):
+            await asyncio.sleep(10)
+        self.respond_with(create)
+
+        async def cancel_midway():
+            task = asyncio.create_task(self.client.invoke(self.img, "prompt"))
+            await asyncio.sleep(0.05)
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+
+        asyncio.run(cancel_midway())
+        self.assert_released()
+
+    def test_success_releases_once(self):
+        async def create(**kwargs):
+            return SimpleNamespace(headers={}, parse=lambda: SimpleNamespace(output_text="content_page"))
+        self.respond_with(create)
+
+        async def twice():
+            # With max_concurrency=1 the second call would hang if the first kept its slot
+            return [await self.client.invoke(self.img, "prompt") for _ in range(2)]
+
+        self.assertEqual(asyncio.run(twice()), ["content_page", "content_page"])
+        self.assert_released()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+import os
+import subprocess
+import sys
+import tempfile
+import textwrap
+import unittest
+from pathlib import Path
+from types import SimpleNamespace
+
+from PIL import Image
+from PIL.PdfParser import PdfParser
+
+from book_automation.externals.document_ai_pages import chunked, images_to_pdf, map_pages, write_pdf
+
+
+class TestDocumentAIPages(unittest.TestCase):
+
+    def test_chunks_respect_page_limit(self):
+        self.assertEqual([len(c) for c in chunked(list(range(32)), 15)], [15, 15, 2])
+
+    def test_images_pack_into_one_pdf(self):
+        images = [Image.new("RGB", (40, 60)), Image.new("L", (40, 60)), Image.new("RGBA", (40, 60))]
+        data = images_to_pdf(images)
+        self.assertTrue(data.startswith(b"%PDF"))
+        self.assertEqual(len(PdfParser(buf=data).pages), 3)
+
+    def test_pdf_from_files(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            paths = []
+            for i in range(4):
+                paths.append(Path(tmp) / f"page_{i}.png")
+                Image.new("1", (30, 30), 1).save(paths[-1])
+            write_pdf(paths, Path(tmp) / "book.pdf")
+            data = (Path(tmp) / "book.pdf").read_bytes()
+        self.assertEqual(len(PdfParser(buf=data).pages), 4)
+
+    def test_pdf_from_files_holds_one_page_at_a_time(self):
+        # 24 RGB pages of 12 MB each, written in a fresh interpreter so its peak RSS is
+        # this write alone; holding every page would add about 290 MB
+        script = textwrap.dedent("""
+            import resource, tempfile
+            from pathlib import Path
+            from PIL import Image
+            from PIL.PdfParser import PdfParser
+            from book_automation.externals.document_ai_pages import write_pdf
+
+            with tempfile.TemporaryDirectory() as tmp:
+                paths = [Path(tmp) / f"page_{i}.png" for i in range(24)]
+                page = Image.new("RGB", (2000, 2000), (250, 250, 250))
+                for path in paths:
+                    page.save(path)
+                del page
+                before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+                write_pdf(paths, Path(tmp) / "book.pdf")
+                after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+                assert len(PdfParser(Path(tmp) / "book.pdf").pages) == 24
+            print((after - before) // 1024)
+        """)
+        result = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True,
+                                env=dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path)))
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertLess(int(result.stdout), 80)
+
+    def test_pages_map_back_to_source_order(self):
+        pages = [SimpleNamespace(page_number=n, name=f"p{n}") for n in (3, 1, 2)]
+        self.assertEqual([p.name for p in map_pages(pages, 3)], ["p1", "p2", "p3"])
+
+    def test_missing_page_is_an_error(self):
+        with self.assertRaises(ValueError):
+            map_pages([SimpleNamespace(page_number=1)], 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
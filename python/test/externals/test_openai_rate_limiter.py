@@ -0,0 +1,76 @@
+import asyncio
+import unittest
+
+from book_automation.externals.openai_rate_limiter import OpenAIRateLimiter, parse_reset_duration
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestOpenAIRateLimiter(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.limiter = OpenAIRateLimiter(max_concurrency=10, headroom=0.9, clock=self.clock)
+
+    def test_parse_reset_duration(self):
+        self.assertEqual(parse_reset_duration("1s"), 1.0)
+        self.assertEqual(parse_reset_duration("6m0s"), 360.0)
+        self.assertAlmostEqual(parse_reset_duration("20ms"), 0.02)
+        self.assertAlmostEqual(parse_reset_duration("1h2m3.5s"), 3723.5)
+        self.assertIsNone(parse_reset_duration(None))
+        self.assertIsNone(parse_reset_duration("soon"))
+
+    def test_unknown_budget_only_limited_by_concurrency(self):
+        self.assertEqual(self.limiter.wait_time(1000), 0.0)
+        self.limiter.in_flight = 10
+        self.assertEqual(self.limiter.wait_time(1000), float("inf"))
+
+    def test_waits_for_request_reset_when_under_headroom(self):
+        self.limiter.update_from_headers({
+            "x-ratelimit-limit-requests": "100",
+            "x-ratelimit-remaining-requests": "10",
+            "x-ratelimit-reset-requests": "2s",
+        })
+        self.assertEqual(self.limiter.wait_time(10), 2.0)
+
+        self.clock.now = 2.0
+        self.assertEqual(self.limiter.wait_time(10), 0.0)
+        self.assertEqual(self.limiter.remaining_requests, 100)
+
+    def test_token_budget_accounts_for_in_flight_reservations(self):
+        self.limiter.update_from_headers({
+            "x-ratelimit-limit-tokens": "10000",
+            "x-ratelimit-remaining-tokens": "5000",
+            "x-ratelimit-reset-tokens": "500ms",
+        })
+        self.assertEqual(self.limiter.wait_time(2000), 0.0)
+
+        self.limiter.in_flight = 1
+        self.limiter.reserved_tokens = 3500
+        self.assertEqual(self.limiter.wait_time(2000), 0.5)
+
+    def test_pause_blocks_until_retry_after(self):
+        self.limiter.pause(self.limiter.retry_after_seconds({"retry-after-ms": "1500"}))
+        self.assertEqual(self.limiter.wait_time(1), 1.5)
+
+    def test_acquire_and_release_track_reservations(self):
+        async def run():
+            await self.limiter.acquire(100)
+            self.assertEqual(self.limiter.in_flight, 1)
+            self.assertEqual(self.limiter.reserved_tokens, 100)
+            await self.limiter.release(100, {"x-ratelimit-remaining-requests": "42"})
+
+        asyncio.run(run())
+        self.assertEqual(self.limiter.in_flight, 0)
+        self.assertEqual(self.limiter.reserved_tokens, 0)
+        self.assertEqual(self.limiter.remaining_requests, 42)
+
+
+if __name__ == '__main__':
+    unittest.main()
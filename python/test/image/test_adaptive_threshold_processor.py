@@ -0,0 +1,59 @@
+import unittest
+
+import numpy as np
+from PIL import Image
+
+from book_automation.processor.image.adaptive_threshold_processor import (
+    AdaptiveThresholdProcessor, ThresholdMethod, otsu_threshold
+)
+
+
+def sauvola_reference(gray, window, k, dynamic_range):
+    half = window // 2
+    height, width = gray.shape
+    mask = np.zeros(gray.shape, dtype=bool)
+    for y in range(height):
+        for x in range(width):
+            patch = gray[max(y - half, 0):y + half + 1, max(x - half, 0):x + half + 1].astype(np.float64)
+            threshold = patch.mean() * (1 + k * (patch.std() / dynamic_range - 1))
+            mask[y, x] = gray[y, x] > threshold
+    return mask
+
+
+class TestAdaptiveThresholdProcessor(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        # Uneven lighting: the page darkens towards the right, with dark "text" blocks
+        page = np.tile(np.linspace(230, 140, 60), (45, 1))
+        for _ in range(25):
+            y, x = rng.integers(0, 42), rng.integers(0, 55)
+            page[y:y + 3, x:x + 5] -= 110
+        self.gray = np.clip(page + rng.normal(0, 4, page.shape), 0, 255).astype(np.uint8)
+
+    def test_otsu_splits_bimodal_histogram(self):
+        histogram = np.zeros(256)
+        histogram[40:60] = 100
+        histogram[200:220] = 300
+        self.assertTrue(59 <= otsu_threshold(histogram) < 200)
+
+    def test_sauvola_matches_reference(self):
+        processor = AdaptiveThresholdProcessor(window=9, band_rows=7)
+        expected = sauvola_reference(self.gray, 9, processor.k, processor.dynamic_range)
+        actual = np.asarray(processor.process(Image.fromarray(self.gray)))
+        self.assertEqual(np.count_nonzero(actual != expected), 0)
+
+    def test_process_returns_packed_bilevel_image(self):
+        img = Image.fromarray(self.gray).convert("RGB")
+        img.info["dpi"] = (600, 600)
+        binary = AdaptiveThresholdProcessor(method=ThresholdMethod.OTSU).process(img)
+
+        self.assertEqual(binary.mode, "1")
+        self.assertEqual(binary.size, img.size)
+        self.assertEqual(binary.info["dpi"], (600, 600))
+        threshold = otsu_threshold(Image.fromarray(self.gray).histogram())
+        np.testing.assert_array_equal(np.asarray(binary), self.gray > threshold)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+from book_automation.processor.image.content_bounds_cropper import ContentBoundsCropper
+
+
+def scanned_page():
+    # Dark scanner bed around a white page with a block of "text" in the middle
+    scan = np.full((1200, 900), 30, dtype=np.uint8)
+    scan[50:1150, 60:840] = 250
+    rng = np.random.default_rng(0)
+    for y in range(300, 800, 25):
+        x = 200
+        while x < 650:
+            width = int(rng.integers(15, 60))
+            scan[y:y + 10, x:x + width] = 20
+            x += width + 12
+    return Image.fromarray(scan)
+
+
+class TestContentBoundsCropper(unittest.TestCase):
+
+    def test_box_hugs_content_inside_scanner_bed(self):
+        left, top, right, bottom = ContentBoundsCropper(margin=0).content_box(scanned_page())
+        self.assertAlmostEqual(top, 300, delta=4)
+        self.assertAlmostEqual(bottom, 785, delta=4)
+        self.assertAlmostEqual(left, 200, delta=4)
+        self.assertLessEqual(right, 720)
+        self.assertGreater(right, 600)
+
+    def test_crops_with_margin_and_logs_box(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "page_0007.png"
+            scanned_page().save(path)
+            log_path = Path(tmp) / "crop_boxes.jsonl"
+
+            with Image.open(path) as img:
+                cropped = ContentBoundsCropper(margin=20, log_path=str(log_path)).process(img)
+
+            entry = json.loads(log_path.read_text())
+        box = entry["box"]
+        self.assertEqual(entry["page"], "page_0007.png")
+        self.assertEqual(entry["size"], [900, 1200])
+        self.assertEqual(cropped.size, (box[2] - box[0], box[3] - box[1]))
+        self.assertAlmostEqual(box[1], 280, delta=4)
+
+    def test_blank_page_is_left_alone(self):
+        noise = np.random.default_rng(0).normal(245, 4, (400, 300))
+        blank = Image.fromarray(np.clip(noise, 0, 255).astype(np.uint8))
+        self.assertIs(ContentBoundsCropper().process(blank), blank)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,58 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+from book_automation.processor.image.fast_deskew_processor import FastDeskewProcessor
+
+
+def text_page(size=(1100, 850)):
+    rng = np.random.default_rng(0)
+    page = np.full(size, 255, dtype=np.uint8)
+    for y in range(80, size[0] - 80, 30):
+        x = 80
+        while x < size[1] - 120:
+            width = int(rng.integers(20, 80))
+            page[y:y + 12, x:x + width] = 0
+            x += width + 15
+    return Image.fromarray(page)
+
+
+class TestFastDeskewProcessor(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.page = text_page()
+
+    def test_estimates_skew_in_both_directions(self):
+        processor = FastDeskewProcessor()
+        for angle in (2.0, -1.3, 3.7):
+            skewed = self.page.rotate(angle, resample=Image.BICUBIC, fillcolor=255)
+            self.assertAlmostEqual(processor.estimate_angle(skewed), angle, delta=0.1)
+
+    def test_straightens_page_and_logs_angle(self):
+        path = Path(self.tmp.name) / "page_0001.png"
+        self.page.rotate(2.5, resample=Image.BICUBIC, fillcolor=255).save(path, dpi=(300, 300))
+        log_path = Path(self.tmp.name) / "angles.jsonl"
+        processor = FastDeskewProcessor(log_path=str(log_path))
+
+        with Image.open(path) as img:
+            result = processor.process(img)
+
+        self.assertEqual(result.size, self.page.size)
+        self.assertAlmostEqual(processor.estimate_angle(result), 0.0, delta=0.1)
+        entry = json.loads(log_path.read_text())
+        self.assertEqual(entry["page"], "page_0001.png")
+        self.assertTrue(entry["rotated"])
+        self.assertAlmostEqual(entry["angle"], 2.5, delta=0.1)
+
+    def test_straight_page_is_not_rotated(self):
+        self.assertIs(FastDeskewProcessor().process(self.page), self.page)
+
+
+if __name__ == '__main__':
+    unittest.main()
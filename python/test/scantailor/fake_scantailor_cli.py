@@ -0,0 +1,50 @@
+import os
+import stat
+import sys
+from pathlib import Path
+
+# Stands in for scantailor-universal-cli: prints a line per page and writes <stem>.tif
+# for every page of the input folder, logging each invocation's input folder to
+# $FAKE_SCANTAILOR_LOG. Unless --match-layout=false is given, every output is padded to
+# the largest page of the invocation, as layout matching does. The first invocation that
+# reaches the page named in $FAKE_SCANTAILOR_HANG_ON hangs there; $FAKE_SCANTAILOR_FAIL
+# makes it exit with an error
+_FAKE_CLI = """#!{python}
+import os, shutil, sys, time
+input_dir, output_dir = sys.argv[-2], sys.argv[-1]
+log_path = os.environ["FAKE_SCANTAILOR_LOG"]
+with open(log_path, "a") as log:
+    log.write(input_dir + "\\n")
+if os.environ.get("FAKE_SCANTAILOR_FAIL"):
+    print("error: cannot open project", flush=True)
+    sys.exit(3)
+os.makedirs(os.path.join(output_dir, "cache"), exist_ok=True)
+names = sorted(os.listdir(input_dir))
+match_size = 0
+if "--match-layout=false" not in sys.argv:
+    match_size = max(os.path.getsize(os.path.join(input_dir, name)) for name in names)
+for name in names:
+    stem = os.path.splitext(name)[0]
+    print(f"Processing: {{os.path.join(input_dir, name)}}", flush=True)
+    hang_marker = log_path + ".hung"
+    if stem == os.environ.get("FAKE_SCANTAILOR_HANG_ON") and not os.path.exists(hang_marker):
+        open(hang_marker, "w").close()
+        time.sleep(60)
+    with open(os.path.join(input_dir, name), "rb") as page:
+        content = page.read()
+    with open(os.path.join(output_dir, stem + ".tif"), "wb") as out:
+        out.write(content.ljust(match_size, b" "))
+"""
+
+
+def install_fake_cli(bin_dir: Path, log_path: Path) -> dict:
+    """
+    Write the fake CLI into bin_dir and return the environment to run it with.
+    """
+    path = bin_dir / "scantailor-universal-cli"
+    path.write_text(_FAKE_CLI.format(python=sys.executable))
+    path.chmod(path.stat().st_mode | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH)
+    return {
+        "PATH": f"{bin_dir}{os.pathsep}{os.environ.get('PATH', '')}",
+        "FAKE_SCANTAILOR_LOG": str(log_path),
+    }
@@ -0,0 +1,177 @@
+import os
+from collections import Counter
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from book_automation.scantailor.scantailor_process import ScanTailorProcess, ScanTailorStalled
+from book_automation.scantailor.scantailor_service import ScanTailorService
+from book_automation.util.stage_report import StageReport
+from .fake_scantailor_cli import install_fake_cli
+
+
+class TestScanTailorService(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.root = Path(self.tmp.name)
+        self.input_dir = self.root / "deskewed"
+        self.output_dir = self.root / "scantailor"
+        self.input_dir.mkdir()
+        for i in range(10):
+            (self.input_dir / f"page_{i:04d}.png").write_bytes(f"page {i}".encode())
+
+        (self.root / "bin").mkdir()
+        self.log_path = self.root / "cli.log"
+        env = mock.patch.dict(os.environ, install_fake_cli(self.root / "bin", self.log_path))
+        env.start()
+        self.addCleanup(env.stop)
+
+    def invocations(self):
+        return self.log_path.read_text().splitlines()
+
+    def test_single_process_over_input_dir_when_not_incremental(self):
+        self.assertTrue(ScanTailorService().process_images(str(self.input_dir), str(self.output_dir)))
+        self.assertEqual(self.invocations(), [str(self.input_dir)])
+        self.assertEqual(len(list(self.output_dir.glob("*.tif"))), 10)
+
+    def test_outputs_from_an_earlier_run_are_not_counted_as_done(self):
+        self.output_dir.mkdir()
+        for i in range(10):
+            (self.output_dir / f"page_{i:04d}.tif").write_bytes(b"old output")
+        cmd = ScanTailorService()._build_scantailor_command(str(self.input_dir), str(self.output_dir))
+        process = ScanTailorProcess(cmd, [f"page_{i:04d}.png" for i in range(10)], str(self.output_dir),
+                                    stall_timeout=1, poll_interval=0.01)
+        with mock.patch.dict(os.environ, {"FAKE_SCANTAILOR_HANG_ON": "page_0004"}):
+            with self.assertRaises(ScanTailorStalled):
+                process.run()
+
+        # Only the pages the CLI rewrote before hanging are done
+        self.assertEqual(sorted(process.done_pages), [f"page_{i:04d}.png" for i in range(4)])
+
+    def test_sharded_run_merges_outputs_in_page_order(self):
+        service = ScanTailorService(shards=3)
+        self.assertTrue(service.process_images(str(self.input_dir), str(self.output_dir)))
+
+        self.assertEqual(len(self.invocations()), 3)
+        outputs = sorted(p.name for p in self.output_dir.iterdir())
+        self.assertEqual(outputs, [f"page_{i:04d}.tif" for i in range(10)])
+        self.assertEqual((self.output_dir / "page_0007.tif").read_bytes(), b"page 7")
+        # Staged hardlinks and per-shard output are cleaned up; the inputs are untouched
+        self.assertFalse((self.root / ".scantailor.shards").exists())
+        self.assertEqual(len(list(self.input_dir.iterdir())), 10)
+
+    def test_full_book_run_keeps_the_baseline_command(self):
+        self.assertEqual(ScanTailorService()._build_scantailor_command("in", "out"), [
+            "scantailor-universal-cli", "--layout=1", "--deskew=off", "--content-detection=normal",
+            "--white-margins", "--normalize-illumination", "--despeckle=normal", "--color-mode=mixed",
+            "--output-dpi=600", "--tiff-compression=lzw", "--tiff-force-keep-color-space",
+            "--enable-page-detection", "in", "out",
+        ])
+
+        # A single run over the whole book still matches layout: every page comes out padded
+        (self.input_dir / "page_0008.png").write_bytes(b"a much larger page 8")
+        ScanTailorService().process_images(str(self.input_dir), str(self.output_dir))
+        self.assertEqual({len(p.read_bytes()) for p in self.output_dir.glob("*.tif")}, {20})
+
+    def test_partial_runs_do_not_depend_on_how_the_book_is_split(self):
+        (self.input_dir / "page_0008.png").write_bytes(b"a much larger page 8")
+        split_in_two = self.root / "split_in_two"
+        ScanTailorService(shards=2).process_images(str(self.input_dir), str(split_in_two))
+        ScanTailorService(shards=3, incremental=True).process_images(str(self.input_dir), str(self.output_dir))
+        (self.input_dir / "page_0002.png").write_bytes(b"rescanned page 2")
+        ScanTailorService(shards=2).process_images(str(self.input_dir), str(split_in_two))
+        # Only page 2 goes to the CLI this time
+        ScanTailorService(incremental=True).process_images(str(self.input_dir), str(self.output_dir))
+
+        for output in split_in_two.glob("*.tif"):
+            self.assertEqual((self.output_dir / output.name).read_bytes(), output.read_bytes(), output.name)
+
+    def test_records_per_page_timings(self):
+        report = StageReport()
+        service = ScanTailorService(stage_report=report)
+        self.assertTrue(service.process_images(str(self.input_dir), str(self.output_dir)))
+
+        self.assertEqual(len(report.item_timings("scantailor page")), 10)
+        self.assertGreater(report.seconds("scantailor"), 0)
+
+    def test_stalled_shard_is_killed_and_retried_with_unfinished_pages(self):
+        report = StageReport()
+        service = ScanTailorService(shards=2, stall_timeout=1, stage_report=report)
+        with mock.patch.dict(os.environ, {"FAKE_SCANTAILOR_HANG_ON": "page_0002"}):
+            self.assertTrue(service.process_images(str(self.input_dir), str(self.output_dir)))
+
+        # The shard holding page_0002 runs twice, the other once
+        self.assertEqual(sorted(Counter(self.invocations()).values()), [1, 2])
+        self.assertEqual(len(list(self.output_dir.glob("*.tif"))), 10)
+        # Pages finished before the stall are not redone or counted twice
+        self.assertEqual(len(report.item_timings("scantailor page")), 10)
+
+    def test_cli_failure_is_reported(self):
+        with mock.patch.dict(os.environ, {"FAKE_SCANTAILOR_FAIL": "1"}):
+            self.assertFalse(ScanTailorService().process_images(str(self.input_dir), str(self.output_dir)))
+
+    def test_rerun_only_processes_new_and_changed_pages(self):
+        ScanTailorService(incremental=True).process_images(str(self.input_dir), str(self.output_dir))
+        (self.input_dir / "page_0003.png").write_bytes(b"rescanned page 3")
+        (self.input_dir / "page_0010.png").write_bytes(b"page 10")
+
+        self.assertTrue(ScanTailorService(incremental=True).process_images(str(self.input_dir), str(self.output_dir)))
+
+        staged = self.invocations()[1]
+        self.assertEqual((self.output_dir / "page_0003.tif").read_bytes(), b"rescanned page 3")
+        self.assertEqual(len(list(self.output_dir.glob("*.tif"))), 11)
+        self.assertEqual(len(self.invocations()), 2)
+        self.assertIn(".shards", staged)
+
+        # Nothing changed: the CLI isn't started at all
+        self.assertTrue(ScanTailorService(incremental=True).process_images(str(self.input_dir), str(self.output_dir)))
+        self.assertEqual(len(self.invocations()), 2)
+
+    def test_outputs_of_deleted_and_renamed_pages_are_removed(self):
+        ScanTailorService(incremental=True).process_images(str(self.input_dir), str(self.output_dir))
+        (self.input_dir / "page_0003.png").unlink()
+        (self.input_dir / "page_0005.png").rename(self.input_dir / "page_0011.png")
+        ScanTailorService(incremental=True).process_images(str(self.input_dir), str(self.output_dir))
+
+        outputs = sorted(p.stem for p in self.output_dir.glob("*.tif"))
+        self.assertEqual(outputs, sorted(p.stem for p in self.input_dir.iterdir()))
+        self.assertNotIn("page_0003.png", (self.root / ".scantailor.scantailor_manifest.json").read_text())
+
+    def test_changed_options_reprocess_every_page(self):
+        ScanTailorService(incremental=True).process_images(str(self.input_dir), str(self.output_dir))
+        report = StageReport()
+        ScanTailorService(dpi=300, incremental=True, stage_report=report).process_images(str(self.input_dir), str(self.output_dir))
+        self.assertEqual(len(report.item_timings("scantailor page")), 10)
+
+    def test_missing_output_is_redone(self):
+        ScanTailorService(incremental=True).process_images(str(self.input_dir), str(self.output_dir))
+        (self.output_dir / "page_0005.tif").unlink()
+        report = StageReport()
+        ScanTailorService(incremental=True, stage_report=report).process_images(str(self.input_dir), str(self.output_dir))
+        self.assertEqual(len(report.item_timings("scantailor page")), 1)
+        self.assertTrue((self.output_dir / "page_0005.tif").exists())
+
+    def test_chunks_are_contiguous(self):
+        staged = []
+        service = ScanTailorService(shards=4)
+
+        def run_cli(input_dir, output_dir, *args, **kwargs):
+            staged.append(sorted(os.listdir(input_dir)))
+            return True
+
+        with mock.patch.object(service, "_run_cli", side_effect=run_cli):
+            service.process_images(str(self.input_dir), str(self.output_dir))
+
+        self.assertEqual(sorted(staged), [
+            [f"page_{i:04d}.png" for i in range(0, 3)],
+            [f"page_{i:04d}.png" for i in range(3, 6)],
+            [f"page_{i:04d}.png" for i in range(6, 9)],
+            ["page_0009.png"],
+        ])
+
+
+if __name__ == '__main__':
+    unittest.main()
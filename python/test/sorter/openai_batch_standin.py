@@ -0,0 +1,137 @@
+import itertools
+import json
+import threading
+import time
+from email.parser import BytesParser
+from email.policy import HTTP
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict
+
+
+class OpenAIBatchStandIn:
+    """
+    Local stand-in for the OpenAI Files and Batches endpoints used by OpenAIBatchClient.
+
+    Uploaded request files are answered with ``responder(request_body) -> output_text``.
+    A batch reports ``in_progress`` for ``polls_until_complete`` retrievals before it
+    completes, so polling and resume paths get exercised.
+    """
+
+    def __init__(self, responder: Callable[[Dict], str], polls_until_complete: int = 2):
+        self.responder = responder
+        self.polls_until_complete = polls_until_complete
+        self.files: Dict[str, bytes] = {}
+        self.batches: Dict[str, Dict] = {}
+        self.created_batches = 0
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler_class())
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.server.server_port}/v1"
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def _next_id(self, prefix: str) -> str:
+        return f"{prefix}_{next(self._ids)}"
+
+    def _file_object(self, file_id: str, purpose: str) -> Dict:
+        return {"id": file_id, "object": "file", "bytes": len(self.files[file_id]),
+                "created_at": int(time.time()), "filename": f"{file_id}.jsonl",
+                "purpose": purpose, "status": "processed"}
+
+    def _run_batch(self, batch: Dict) -> None:
+        lines = []
+        requests = [json.loads(line) for line in self.files[batch["input_file_id"]].splitlines() if line.strip()]
+        for request in requests:
+            lines.append(json.dumps({
+                "id": self._next_id("batch_req"),
+                "custom_id": request["custom_id"],
+                "response": {"status_code": 200, "body": {"output": [{
+                    "type": "message",
+                    "content": [{"type": "output_text", "text": self.responder(request["body"])}]
+                }]}},
+                "error": None
+            }))
+        output_id = self._next_id("file")
+        self.files[output_id] = "\n".join(lines).encode()
+        batch.update(status="completed", output_file_id=output_id,
+                     request_counts={"total": len(requests), "completed": len(requests), "failed": 0})
+
+    def _handler_class(self):
+        standin = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def _send_json(self, payload, status=200):
+                body = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _body(self) -> bytes:
+                return self.rfile.read(int(self.headers.get("Content-Length", 0)))
+
+            def do_POST(self):
+                with standin._lock:
+                    if self.path == "/v1/files":
+                        header = f"Content-Type: {self.headers['Content-Type']}\r\n\r\n".encode()
+                        message = BytesParser(policy=HTTP).parsebytes(header + self._body())
+                        fields = {part.get_param("name", header="content-disposition"): part.get_payload(decode=True)
+                                  for part in message.iter_parts()}
+                        file_id = standin._next_id("file")
+                        standin.files[file_id] = fields["file"]
+                        return self._send_json(standin._file_object(file_id, fields["purpose"].decode()))
+
+                    if self.path == "/v1/batches":
+                        request = json.loads(self._body())
+                        batch_id = standin._next_id("batch")
+                        standin.created_batches += 1
+                        standin.batches[batch_id] = {
+                            "id": batch_id, "object": "batch", "endpoint": request["endpoint"],
+                            "input_file_id": request["input_file_id"],
+                            "completion_window": request["completion_window"],
+                            "created_at": int(time.time()), "status": "validating", "polls": 0,
+                            "output_file_id": None, "error_file_id": None,
+                        }
+                        return self._send_json(standin.batches[batch_id])
+
+                self._send_json({"error": {"message": "not found"}}, status=404)
+
+            def do_GET(self):
+                with standin._lock:
+                    parts = self.path.strip("/").split("/")
+                    if parts[:2] == ["v1", "batches"] and len(parts) == 3 and parts[2] in standin.batches:
+                        batch = standin.batches[parts[2]]
+                        batch["polls"] += 1
+                        if batch["status"] != "completed":
+                            if batch["polls"] > standin.polls_until_complete:
+                                standin._run_batch(batch)
+                            else:
+                                batch["status"] = "in_progress"
+                        return self._send_json(batch)
+
+                    if parts[:2] == ["v1", "files"] and len(parts) == 4 and parts[3] == "content":
+                        content = standin.files[parts[2]]
+                        self.send_response(200)
+                        self.send_header("Content-Type", "application/octet-stream")
+                        self.send_header("Content-Length", str(len(content)))
+                        self.end_headers()
+                        self.wfile.write(content)
+                        return
+
+                self._send_json({"error": {"message": "not found"}}, status=404)
+
+        return Handler
@@ -0,0 +1,58 @@
+import asyncio
+import os
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+from PIL import Image
+
+from book_automation.externals.async_gpt_vision_client import AsyncGPTVisionClient
+from book_automation.externals.openai_rate_limiter import OpenAIRateLimiter
+from book_automation.records.page_type import PageType
+from book_automation.sorter.classifier.async_gpt_vision_page_type_classifier import \
+    AsyncGPTVisionPageTypeClassifier
+
+
+class TestAsyncGPTVisionPageTypeClassifier(unittest.TestCase):
+
+    def setUp(self):
+        env = mock.patch.dict(os.environ, {"OPENAI_API_KEY": "test"})
+        env.start()
+        self.addCleanup(env.stop)
+        self.limiter = OpenAIRateLimiter(max_concurrency=1)
+        client = AsyncGPTVisionClient(rate_limiter=self.limiter, max_attempts=1)
+        self.page_type = list(PageType)[0]
+        self.loops = []
+
+        async def create(**kwargs):
+            self.loops.append(asyncio.get_running_loop())
+            await asyncio.sleep(0.01)
+            return SimpleNamespace(headers={"x-ratelimit-remaining-requests": "100"},
+                                   parse=lambda: SimpleNamespace(output_text=self.page_type.value))
+        client.client = SimpleNamespace(responses=SimpleNamespace(with_raw_response=SimpleNamespace(create=create)))
+        self.classifier = AsyncGPTVisionPageTypeClassifier(list(PageType), client)
+        self.img = Image.new("RGB", (20, 20))
+
+    def test_consecutive_sync_calls_share_one_loop(self):
+        self.assertEqual(self.classifier.classify(self.img), self.page_type)
+        self.assertEqual(self.classifier.classify(self.img), self.page_type)
+
+        self.assertEqual(len(self.loops), 2)
+        self.assertIs(self.loops[0], self.loops[1])
+        self.assertEqual(self.limiter.in_flight, 0)
+
+    def test_limiter_follows_a_new_event_loop(self):
+        async def two_pages():
+            # One slot, so the second page waits on the limiter's condition
+            return await asyncio.gather(self.classifier.classify_async(self.img),
+                                        self.classifier.classify_async(self.img))
+
+        self.assertEqual(asyncio.run(two_pages()), [self.page_type] * 2)
+        self.assertEqual(asyncio.run(two_pages()), [self.page_type] * 2)
+
+        self.assertIsNot(self.loops[0], self.loops[2])
+        self.assertEqual(self.limiter.in_flight, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,93 @@
+import base64
+import io
+import os
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from PIL import Image, ImageDraw, ImageStat
+
+from book_automation.externals.openai_batch_client import OpenAIBatchClient
+from book_automation.records.page_type import PageType
+from book_automation.sorter.batch_image_sorter import BatchImageSorter
+from book_automation.sorter.classifier.gpt_vision_page_type_classifier import \
+    GPTVisionPageTypeClassifier
+from .openai_batch_standin import OpenAIBatchStandIn
+
+
+def classify_by_brightness(body) -> str:
+    image_url = body["input"][0]["content"][1]["image_url"]
+    png = base64.b64decode(image_url.split(",", 1)[1])
+    with Image.open(io.BytesIO(png)) as img:
+        mean = ImageStat.Stat(img.convert("L")).mean[0]
+    return PageType.BLANK_PAGE.value if mean > 250 else f"{PageType.CONTENT_PAGE.value}\n"
+
+
+class TestBatchImageSorter(unittest.TestCase):
+
+    def setUp(self):
+        self.test_dir = Path(tempfile.mkdtemp())
+        self.input_dir = self.test_dir / "deskewed"
+        self.output_dir = self.test_dir / "sorted"
+        self.input_dir.mkdir()
+
+        for i in range(4):
+            img = Image.new("L", (400, 600), color=255)
+            if i % 2:
+                ImageDraw.Draw(img).rectangle((50, 50, 350, 550), fill=0)
+            img.save(self.input_dir / f"page_{i:04d}.png")
+
+        self.env = patch.dict(os.environ, {"OPENAI_API_KEY": "test"})
+        self.env.start()
+
+    def tearDown(self):
+        self.env.stop()
+        shutil.rmtree(self.test_dir)
+
+    def _sorter(self, standin, **kwargs):
+        return BatchImageSorter(
+            input_dir=self.input_dir,
+            output_dir=self.output_dir,
+            classifier=GPTVisionPageTypeClassifier(
+                types=[PageType.BLANK_PAGE, PageType.CONTENT_PAGE], vision_client=None),
+            batch_client=OpenAIBatchClient(base_url=standin.base_url),
+            poll_interval=0,
+            **kwargs
+        )
+
+    def _sorted_names(self, page_type: PageType):
+        return sorted(p.name for p in (self.output_dir / page_type.value).iterdir())
+
+    def test_sort_applies_batch_results(self):
+        with OpenAIBatchStandIn(classify_by_brightness) as standin:
+            sorter = self._sorter(standin)
+            sorter.sort()
+
+        self.assertEqual(self._sorted_names(PageType.BLANK_PAGE), ["page_0000.png", "page_0002.png"])
+        self.assertEqual(self._sorted_names(PageType.CONTENT_PAGE), ["page_0001.png", "page_0003.png"])
+        self.assertEqual(list(self.input_dir.iterdir()), [])
+        self.assertFalse(sorter.state_path.exists())
+
+    def test_resume_polls_existing_batch(self):
+        with OpenAIBatchStandIn(classify_by_brightness) as standin:
+            batch_ids = self._sorter(standin).submit()
+            self.assertEqual(len(batch_ids), 1)
+
+            # A fresh sorter, as after a crash, picks the batch up from the state file
+            self._sorter(standin).sort()
+            self.assertEqual(standin.created_batches, 1)
+
+        self.assertEqual(len(self._sorted_names(PageType.CONTENT_PAGE)), 2)
+
+    def test_large_books_are_split_across_batches(self):
+        with OpenAIBatchStandIn(classify_by_brightness) as standin:
+            self._sorter(standin, max_file_bytes=1).sort()
+            self.assertEqual(standin.created_batches, 4)
+
+        self.assertEqual(len(self._sorted_names(PageType.BLANK_PAGE)), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
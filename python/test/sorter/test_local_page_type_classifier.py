@@ -0,0 +1,82 @@
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+from PIL import Image, ImageDraw
+
+from book_automation.records.page_type import PageType
+from book_automation.sorter.classifier.confidence_fallback_page_type_classifier import \
+    ConfidenceFallbackPageTypeClassifier
+from book_automation.sorter.classifier.local_page_type_classifier import LocalPageTypeClassifier
+from book_automation.sorter.classifier.page_features import PageFeatureExtractor
+from book_automation.sorter.classifier.page_type_classifier import PageTypeClassifier
+
+
+def blank_page(seed: int) -> Image.Image:
+    rng = np.random.default_rng(seed)
+    noise = rng.normal(240, 6, size=(600, 400)).clip(0, 255).astype(np.uint8)
+    return Image.fromarray(noise, mode="L")
+
+
+def content_page(seed: int) -> Image.Image:
+    img = blank_page(seed)
+    draw = ImageDraw.Draw(img)
+    for y in range(60, 540, 18):
+        draw.rectangle((40, y, 360 - (seed * 7 + y) % 60, y + 8), fill=20)
+    return img
+
+
+class FixedClassifier(PageTypeClassifier):
+
+    def __init__(self, page_type: PageType):
+        super().__init__([PageType.BLANK_PAGE, PageType.CONTENT_PAGE])
+        self.page_type = page_type
+        self.calls = 0
+
+    def classify(self, image):
+        self.calls += 1
+        return self.page_type
+
+
+class TestLocalPageTypeClassifier(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        extractor = PageFeatureExtractor()
+        pages = [blank_page(i) for i in range(10)] + [content_page(i) for i in range(10)]
+        features = np.stack([extractor.extract(p) for p in pages])
+        labels = np.array([0] * 10 + [1] * 10)
+        cls.classifier = LocalPageTypeClassifier.train([PageType.BLANK_PAGE, PageType.CONTENT_PAGE], features, labels)
+
+    def test_classifies_unseen_pages(self):
+        self.assertEqual(self.classifier.classify(blank_page(100)), PageType.BLANK_PAGE)
+        self.assertEqual(self.classifier.classify(content_page(100)), PageType.CONTENT_PAGE)
+
+    def test_save_and_load_round_trip(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            model_path = Path(tmp) / "model.npz"
+            self.classifier.save(model_path)
+            loaded = LocalPageTypeClassifier.load(model_path)
+
+        page = content_page(101)
+        self.assertEqual(loaded.types, self.classifier.types)
+        self.assertAlmostEqual(loaded.classify_with_confidence(page)[1],
+                               self.classifier.classify_with_confidence(page)[1], places=6)
+
+    def test_low_confidence_pages_fall_back(self):
+        fallback = FixedClassifier(PageType.CONTENT_PAGE)
+
+        confident = ConfidenceFallbackPageTypeClassifier(self.classifier, fallback, min_confidence=0.5)
+        self.assertEqual(confident.classify(blank_page(102)), PageType.BLANK_PAGE)
+        self.assertEqual(fallback.calls, 0)
+
+        never_confident = ConfidenceFallbackPageTypeClassifier(self.classifier, fallback, min_confidence=1.1)
+        self.assertEqual(never_confident.classify(blank_page(102)), PageType.CONTENT_PAGE)
+        self.assertEqual(fallback.calls, 1)
+        self.assertEqual(never_confident.fallback_count, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+import asyncio
+import unittest
+
+import numpy as np
+
+from book_automation.records.page_type import PageType
+from book_automation.sorter.sequence_labeler import SequenceLabeler
+
+BLANK, CONTENT, TITLE = PageType.BLANK_PAGE, PageType.CONTENT_PAGE, PageType.TITLE_PAGE
+
+
+def signals_for(truth, seed=0):
+    rng = np.random.default_rng(seed)
+    centres = {BLANK: [0.95, 0.0], CONTENT: [0.8, 0.15], TITLE: [0.9, 0.05]}
+    return np.array([centres[t] for t in truth]) + rng.normal(0, 0.002, size=(len(truth), 2))
+
+
+class TestSequenceLabeler(unittest.TestCase):
+
+    def _label(self, truth, signals, **kwargs):
+        calls = []
+
+        async def oracle(index):
+            calls.append(index)
+            return truth[index]
+
+        labels, report = asyncio.run(SequenceLabeler(**kwargs).label(signals, oracle))
+        return labels, report, calls
+
+    def test_uniform_runs_are_sampled(self):
+        truth = [TITLE] + [BLANK] + [CONTENT] * 100 + [BLANK] * 3 + [CONTENT] * 60
+        labels, report, calls = self._label(truth, signals_for(truth), sample_every=10)
+
+        self.assertEqual(labels, truth)
+        self.assertEqual(report.api_calls, len(set(calls)))
+        self.assertLess(report.api_calls, len(truth) // 4)
+        self.assertEqual(report.saved_calls, len(truth) - report.api_calls)
+
+    def test_disagreement_inside_a_run_is_bisected(self):
+        # Identical signals hide the boundary, so it must be found by bisection
+        truth = [CONTENT] * 37 + [BLANK] * 27
+        signals = np.zeros((len(truth), 2))
+        labels, report, _ = self._label(truth, signals, sample_every=16)
+
+        self.assertEqual(labels, truth)
+        self.assertLess(report.api_calls, 16)
+
+    def test_alternating_pages_are_all_classified(self):
+        truth = [BLANK, CONTENT] * 10
+        labels, report, _ = self._label(truth, signals_for(truth))
+
+        self.assertEqual(labels, truth)
+        self.assertEqual(report.api_calls, len(truth))
+
+    def test_failed_probe_leaves_pages_unlabelled(self):
+        truth = [CONTENT] * 20
+
+        async def flaky(index):
+            if index == 19:
+                raise RuntimeError("timeout")
+            return truth[index]
+
+        labels, report = asyncio.run(SequenceLabeler(sample_every=8).label(np.zeros((20, 2)), flaky))
+
+        self.assertEqual(labels[:17], truth[:17])
+        self.assertIsNone(labels[19])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+import os
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+from PIL import Image
+
+from book_automation.records.page_type import PageType
+from book_automation.sorter.classifier.page_type_classifier import PageTypeClassifier
+from book_automation.sorter.image_sorter import ImageSorter, SortMode
+from book_automation.sorter.sort_index import SortIndex, LinkMode, INDEX_FILENAME
+
+
+class EvenOddClassifier(PageTypeClassifier):
+    """Even pages are blank, odd pages are content."""
+
+    def __init__(self):
+        super().__init__([PageType.BLANK_PAGE, PageType.CONTENT_PAGE])
+        self.calls = 0
+
+    def classify(self, image):
+        self.calls += 1
+        return PageType.CONTENT_PAGE if image.getpixel((0, 0)) % 2 else PageType.BLANK_PAGE
+
+
+class TestSortIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.test_dir = Path(tempfile.mkdtemp())
+        self.input_dir = self.test_dir / "deskewed"
+        self.output_dir = self.test_dir / "sorted"
+        self.input_dir.mkdir()
+        for i in range(6):
+            Image.new("L", (8, 8), color=i).save(self.input_dir / f"page_{i:04d}.png")
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def test_index_mode_leaves_pages_in_place(self):
+        ImageSorter(self.input_dir, self.output_dir, EvenOddClassifier(), sort_mode=SortMode.INDEX).sort()
+
+        self.assertEqual(len(list(self.input_dir.iterdir())), 6)
+        self.assertEqual(list((self.output_dir / PageType.CONTENT_PAGE.value).iterdir()), [])
+
+        index = SortIndex(self.output_dir / INDEX_FILENAME)
+        self.assertEqual([p.name for p in index.select(PageType.CONTENT_PAGE)],
+                         ["page_0001.png", "page_0003.png", "page_0005.png"])
+        self.assertTrue(all(p.exists() for p in index.select(PageType.BLANK_PAGE)))
+
+    def test_hardlink_mode_links_without_copying(self):
+        ImageSorter(self.input_dir, self.output_dir, EvenOddClassifier(), sort_mode=SortMode.HARDLINK).sort()
+
+        linked = self.output_dir / PageType.BLANK_PAGE.value / "page_0002.png"
+        self.assertTrue(os.path.samefile(linked, self.input_dir / "page_0002.png"))
+
+    def test_rerun_only_classifies_missing_pages(self):
+        index = SortIndex(self.output_dir / INDEX_FILENAME)
+        index.record(self.input_dir / "page_0000.png", PageType.BLANK_PAGE)
+        index.record(self.input_dir / "page_0001.png", PageType.CONTENT_PAGE)
+        # Simulate a write torn by a crash
+        with open(index.index_path, "a") as f:
+            f.write('{"page": "../deskewed/page_00')
+
+        classifier = EvenOddClassifier()
+        ImageSorter(self.input_dir, self.output_dir, classifier, sort_mode=SortMode.INDEX).sort()
+
+        self.assertEqual(classifier.calls, 4)
+        index = SortIndex(self.output_dir / INDEX_FILENAME)
+        self.assertEqual(len(index), 6)
+        self.assertTrue(index.covers(self.input_dir.iterdir()))
+
+    def test_materialize_selects_pages_into_folder(self):
+        ImageSorter(self.input_dir, self.output_dir, EvenOddClassifier(), sort_mode=SortMode.INDEX).sort()
+
+        view = SortIndex(self.output_dir / INDEX_FILENAME).materialize(
+            PageType.CONTENT_PAGE, self.test_dir / "content_view", LinkMode.SYMLINK)
+
+        self.assertEqual(sorted(p.name for p in view.iterdir()),
+                         ["page_0001.png", "page_0003.png", "page_0005.png"])
+        self.assertTrue(all(p.is_symlink() for p in view.iterdir()))
+
+
+if __name__ == '__main__':
+    unittest.main()
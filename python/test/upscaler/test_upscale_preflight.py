@@ -0,0 +1,102 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+from book_automation.processor.upscaler.upscale_preflight import UpscalePreflight, laplacian_variance
+from book_automation.util.stage_report import StageReport
+
+
+def text_like(size=(200, 300)):
+    rng = np.random.default_rng(0)
+    page = np.full(size, 255, dtype=np.uint8)
+    for _ in range(300):
+        y, x = rng.integers(0, size[0] - 4), rng.integers(0, size[1] - 10)
+        page[y:y + 3, x:x + 8] = 0
+    return page
+
+
+class TestUpscalePreflight(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.root = Path(self.tmp.name)
+        self.preflight = UpscalePreflight(target_dpi=600, workers=1)
+
+    def save(self, name, array, dpi=None, mode="RGB"):
+        path = self.root / name
+        img = Image.fromarray(array).convert(mode)
+        img.save(path, dpi=dpi) if dpi else img.save(path)
+        return path
+
+    def test_laplacian_variance_prefers_sharp_pages(self):
+        sharp = text_like()
+        blurred = np.asarray(Image.fromarray(sharp).resize((75, 50)).resize((300, 200), Image.BILINEAR))
+        self.assertGreater(laplacian_variance(sharp), 10 * laplacian_variance(blurred))
+
+    def test_sharp_high_dpi_page_bypasses(self):
+        hi_res = self.save("p1.tif", text_like(), dpi=(600, 600))
+        lo_res = self.save("p2.png", text_like(), dpi=(300, 300))
+        unknown = self.save("p3.png", text_like())
+
+        staged, bypassed = self.preflight.run([hi_res, lo_res, unknown], self.root / "staging")
+
+        self.assertEqual(bypassed, [hi_res])
+        self.assertEqual([p.name for p in staged], ["p2.png", "p3.png"])
+        # Grey pages saved as RGB go up as L
+        for p in staged:
+            with Image.open(p) as img:
+                self.assertEqual(img.mode, "L")
+
+    def test_colour_pages_stay_rgb_and_savings_are_reported(self):
+        colour = text_like()[:, :, None].repeat(3, axis=2)
+        colour[50:80, 50:80] = (200, 30, 30)
+        gray = self.save("gray.png", text_like(), dpi=(300, 300))
+        red = self.save("red.png", colour, dpi=(300, 300))
+
+        report = StageReport()
+        staged, _ = self.preflight.run([gray, red], self.root / "staging", stage_report=report)
+
+        with Image.open(staged[0]) as img:
+            self.assertEqual(img.mode, "L")
+        with Image.open(staged[1]) as img:
+            self.assertEqual(img.mode, "RGB")
+        self.assertLess(staged[0].stat().st_size, gray.stat().st_size)
+        self.assertIn("staged_mb=", report.summary())
+        self.assertIn("source_mb=", report.summary())
+
+    def test_dpi_from_page_height(self):
+        preflight = UpscalePreflight(target_dpi=600, page_height_inches=0.25, workers=1)
+        page = self.save("p1.png", text_like())
+        _, bypassed = preflight.run([page], self.root / "staging")
+        self.assertEqual(bypassed, [page])
+
+    def test_bypassed_pages_merge_under_upscaled_names(self):
+        page = self.save("p1.tif", text_like(), dpi=(600, 600))
+        UpscalePreflight.merge_bypassed([page], self.root / "out")
+        self.assertTrue((self.root / "out" / "p1.png").exists())
+
+    def test_bypassed_pages_match_the_upscaled_scale(self):
+        bypassed = self.save("p1.tif", text_like(), dpi=(600, 600))
+        staged, _ = self.preflight.run([self.save("p2.png", text_like(), dpi=(300, 300))],
+                                       self.root / "staging")
+        out = self.root / "out"
+        out.mkdir()
+        # What a 2x upscaler leaves behind
+        with Image.open(staged[0]) as img:
+            img.resize((img.width * 2, img.height * 2)).save(out / "p2.png")
+
+        scale = UpscalePreflight.output_scale(staged, out)
+        UpscalePreflight.merge_bypassed([bypassed], out, scale)
+
+        self.assertEqual(scale, 2)
+        with Image.open(out / "p1.png") as img:
+            self.assertEqual(img.size, (600, 400))
+            self.assertEqual(tuple(round(d) for d in img.info["dpi"]), (1200, 1200))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,49 @@
+import unittest
+
+import numpy as np
+
+from book_automation.processor.upscaler.tiling import tiled_inference
+from book_automation.processor.upscaler.upscaler_policy import UpscalerBackend, UpscalerPolicy
+
+
+def nearest_x2(batch):
+    return batch.repeat(2, axis=2).repeat(2, axis=3)
+
+
+class TestTiledInference(unittest.TestCase):
+
+    def test_matches_whole_image_inference(self):
+        image = np.random.default_rng(0).random((3, 70, 45)).astype(np.float32)
+        expected = nearest_x2(image[None])[0]
+        for tile, pad in [(16, 4), (32, 0), (100, 8)]:
+            np.testing.assert_array_equal(tiled_inference(image, nearest_x2, tile=tile, pad=pad), expected)
+
+    def test_tiles_see_padding(self):
+        shapes = []
+
+        def record(batch):
+            shapes.append(batch.shape[2:])
+            return nearest_x2(batch)
+
+        tiled_inference(np.zeros((3, 64, 64), dtype=np.float32), record, tile=32, pad=8)
+        self.assertEqual(shapes, [(40, 40), (40, 40), (40, 40), (40, 40)])
+
+
+class TestUpscalerPolicy(unittest.TestCase):
+
+    def test_small_books_stay_local_and_large_go_to_gpu(self):
+        policy = UpscalerPolicy()
+        self.assertEqual(policy.choose(20), UpscalerBackend.CPU)
+        self.assertEqual(policy.choose(1000), UpscalerBackend.RUNPOD)
+
+    def test_warm_pod_shifts_the_break_even(self):
+        policy = UpscalerPolicy()
+        self.assertEqual(policy.choose(40), UpscalerBackend.CPU)
+        self.assertEqual(policy.choose(40, pod_warm=True), UpscalerBackend.RUNPOD)
+
+    def test_no_pod_means_cpu(self):
+        self.assertEqual(UpscalerPolicy().choose(1000, pod_available=False), UpscalerBackend.CPU)
+
+
+if __name__ == "__main__":
+    unittest.main()
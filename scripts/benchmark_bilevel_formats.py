@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Compare the final bilevel page formats: 1-bit PNG (what the threshold stage writes), CCITT
+Group 4 TIFF and PBM. For each format the report gives the total size on disk, write time
+and load time. Pages come from --input-dir (e.g. a book's *_threshold or processed folder),
+or are synthesized when none is given.
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+
+# The converter package imports through python.src, so the repo root goes on the path too
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'python', 'src')))
+
+from book_automation.processor.converter.bilevel_image_converter import BilevelImageConverter
+
+IMAGE_SUFFIXES = {'.png', '.tif', '.tiff', '.pbm'}
+
+
+def synthetic_pages(folder: Path, count: int, height: int):
+    rng = np.random.default_rng(0)
+    width = int(height * 0.7)
+    line_height = height // 60
+    font = ImageFont.load_default(size=line_height)
+    letters = np.array(list("abcdefghijklmnopqrstuvwxyz"))
+    for i in range(count):
+        page = Image.new("L", (width, height), 255)
+        draw = ImageDraw.Draw(page)
+        for y in range(height // 10, height - height // 10, int(line_height * 1.5)):
+            words = ("".join(rng.choice(letters, rng.integers(2, 10))) for _ in range(200))
+            draw.text((width // 10, y), " ".join(words), fill=0, font=font)
+        # Ragged edges like a thresholded scan
+        noise = rng.normal(0, 40, (height, width))
+        pixels = (np.asarray(page) + noise) > 128
+        Image.fromarray(pixels).save(folder / f"page_{i:04d}.png", dpi=(600, 600))
+
+
+def measure(pages, output_dir: Path, output_format: str):
+    output_dir.mkdir()
+    converter = BilevelImageConverter(output_format=output_format) if output_format != "PNG" else None
+
+    start = time.perf_counter()
+    outputs = []
+    for page in pages:
+        target = output_dir / f"{page.stem}.{output_format.lower()}"
+        if converter:
+            converter.process(str(page), str(target))
+        else:
+            with Image.open(page) as img:
+                img.convert("1").save(target, format="PNG", dpi=img.info.get("dpi", (600, 600)))
+        outputs.append(target)
+    write_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for output in outputs:
+        with Image.open(output) as img:
+            img.load()
+    load_seconds = time.perf_counter() - start
+    return sum(o.stat().st_size for o in outputs), write_seconds, load_seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare final bilevel page formats')
+    parser.add_argument('--input-dir', help='Folder of bilevel (or grayscale) pages')
+    parser.add_argument('--limit', type=int, default=20, help='Pages to use from --input-dir')
+    parser.add_argument('--pages', type=int, default=5, help='Synthetic pages to generate')
+    parser.add_argument('--page-height', type=int, default=6600, help='Synthetic page height (600 dpi letter)')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        if args.input_dir:
+            pages = sorted(p for p in Path(args.input_dir).iterdir() if p.suffix.lower() in IMAGE_SUFFIXES)
+            pages = pages[:args.limit]
+        else:
+            source = tmp / "source"
+            source.mkdir()
+            synthetic_pages(source, args.pages, args.page_height)
+            pages = sorted(source.iterdir())
+        if not pages:
+            print("❌ No pages found")
+            return 1
+
+        results = {fmt: measure(pages, tmp / fmt.lower(), fmt) for fmt in ("PNG", "TIFF", "PBM")}
+
+    png_bytes = results["PNG"][0]
+    print(f"{len(pages)} pages")
+    print(f"{'format':6} {'MB':>8} {'vs PNG':>7} {'write s':>8} {'load s':>7}")
+    for fmt, (size, write_seconds, load_seconds) in results.items():
+        print(f"{fmt:6} {size / 1e6:8.2f} {size / png_bytes:6.2f}x {write_seconds:8.2f} {load_seconds:7.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Compare pages/s and peak memory of the threshold stage: the pipeline's threshold_method
+"fixed" chain (ThresholdProcessor, then ImageModeConverter to mode "1", built exactly as
+BookAutomationPipeline builds it) against AdaptiveThresholdProcessor with Otsu and Sauvola. Each method runs in its own process so peak RSS is measured per method. Pages come
+from --input-dir, or are synthesized when none is given.
+"""
+
+import argparse
+import multiprocessing
+import os
+import resource
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+from batch_image_processor.processors.image.image_mode_converter import ImageModeConverter
+from batch_image_processor.processors.image.threshold_processor import ThresholdProcessor
+from PIL import Image
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'python', 'src')))
+
+from book_automation.processor.image.adaptive_threshold_processor import AdaptiveThresholdProcessor, \
+    ThresholdMethod
+
+IMAGE_SUFFIXES = {'.png', '.jpg', '.jpeg', '.tif', '.tiff', '.bmp'}
+
+
+def fixed_chain(threshold: int = 120):
+    # The processors BookAutomationPipeline._threshold_processors returns for "fixed",
+    # applied in order the way ImagePipeline applies them
+    processors = [ThresholdProcessor(threshold_value=threshold), ImageModeConverter(mode="1")]
+
+    def process(img: Image.Image) -> Image.Image:
+        for processor in processors:
+            img = processor.process(img)
+        return img
+    return process
+
+
+def synthetic_page(height: int) -> Image.Image:
+    rng = np.random.default_rng(0)
+    width = int(height * 0.7)
+    # Uneven paper tone with dark "words"
+    page = np.linspace(200, 240, width)[None, :] + rng.normal(0, 8, (height, width))
+    for _ in range(height // 4):
+        y, x = rng.integers(0, height - 20), rng.integers(0, width - 60)
+        page[y:y + 12, x:x + rng.integers(10, 60)] = rng.integers(20, 80)
+    return Image.fromarray(np.clip(page, 0, 255).astype(np.uint8))
+
+
+def save_synthetic_page(height: int, path: Path):
+    synthetic_page(height).save(path)
+
+
+def run_method(method: str, pages, queue):
+    process = {
+        "fixed": fixed_chain(),
+        "otsu": AdaptiveThresholdProcessor(method=ThresholdMethod.OTSU).process,
+        "sauvola": AdaptiveThresholdProcessor(method=ThresholdMethod.SAUVOLA).process,
+    }[method]
+    baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    start = time.perf_counter()
+    count = 0
+    for page in pages:
+        with Image.open(page) as img:
+            img.load()
+            process(img)
+        count += 1
+    elapsed = time.perf_counter() - start
+
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - baseline
+    peak_mb = peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+    queue.put((count / elapsed, peak_mb))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark binarization methods')
+    parser.add_argument('--input-dir', help='Folder of grayscale or RGB pages')
+    parser.add_argument('--limit', type=int, default=20, help='Pages to use from --input-dir')
+    parser.add_argument('--page-height', type=int, default=6600, help='Synthetic page height (600 dpi letter)')
+    args = parser.parse_args()
+
+    context = multiprocessing.get_context("spawn")
+    tmp = tempfile.TemporaryDirectory()
+    if args.input_dir:
+        pages = sorted(p for p in Path(args.input_dir).iterdir() if p.suffix.lower() in IMAGE_SUFFIXES)[:args.limit]
+    else:
+        page = Path(tmp.name) / "synthetic.png"
+        # Built in a child process: peak RSS carries over to processes this one starts
+        maker = context.Process(target=save_synthetic_page, args=(args.page_height, page))
+        maker.start()
+        maker.join()
+        pages = [page] * 5
+
+    print(f"{'method':10} {'pages/s':>8} {'peak MB':>8}")
+    for method in ("fixed", "otsu", "sauvola"):
+        queue = context.Queue()
+        worker = context.Process(target=run_method, args=(method, pages, queue))
+        worker.start()
+        pages_per_second, peak_mb = queue.get()
+        worker.join()
+        print(f"{method:10} {pages_per_second:8.2f} {peak_mb:8.0f}")
+    tmp.cleanup()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
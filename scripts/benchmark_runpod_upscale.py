@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Benchmark RunPodBatchRunner end to end against the local RunPod stand-in, with a simulated
+GPU time per page and network bandwidth. The book is upscaled twice: once with one shard in
+flight at a time, and once pipelined as configured. The script exits non-zero when the
+pipelined run is not at least --min-speedup times faster, so pipelining regressions show up
+without a live pod or bucket.
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'python', 'src')))
+
+from book_automation.processor.cloud.runpod.runpod_batch_runner import RunPodBatchRunner
+from book_automation.util.stage_report import StageReport
+from python.test.cloud.runpod_standin import RunPodStandIn
+
+
+def make_pages(input_dir: Path, count: int, size: int):
+    rng = np.random.default_rng(0)
+    input_dir.mkdir(parents=True)
+    for i in range(count):
+        # Noise compresses badly, so page sizes are close to real scans
+        page = rng.integers(0, 256, (size, int(size * 0.7)), dtype=np.uint8)
+        Image.fromarray(page).save(input_dir / f"page_{i:04d}.png")
+
+
+def run_once(standin: RunPodStandIn, input_dir: Path, output_dir: Path, args, max_concurrent_shards: int):
+    report = StageReport(f"RunPod upscale, {max_concurrent_shards} shards in flight")
+    start = time.perf_counter()
+    RunPodBatchRunner(
+        runpod_pod_id=[f"pod-{i}" for i in range(args.pods)],
+        input_dir=input_dir,
+        output_dir=output_dir,
+        shard_size=args.shard_size,
+        max_concurrent_shards=max_concurrent_shards,
+        stage_report=report,
+        url_generator=standin.url_generator
+    ).run()
+    wall = time.perf_counter() - start
+
+    outputs = len(list(output_dir.iterdir()))
+    if outputs != args.pages:
+        raise RuntimeError(f"{outputs} of {args.pages} pages came back")
+    return wall
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark RunPod upscaling against a local stand-in')
+    parser.add_argument('--pages', type=int, default=60)
+    parser.add_argument('--page-size', type=int, default=400, help='Page height in pixels')
+    parser.add_argument('--shard-size', type=int, default=10)
+    parser.add_argument('--pods', type=int, default=1)
+    parser.add_argument('--max-concurrent-shards', type=int, default=8)
+    parser.add_argument('--seconds-per-page', type=float, default=0.05, help='Simulated GPU time per page')
+    parser.add_argument('--bandwidth', type=float, default=1e6, help='Bytes per second per connection')
+    parser.add_argument('--scale', type=int, default=2)
+    parser.add_argument('--min-speedup', type=float, default=1.3,
+                        help='Fail if the pipelined run is not this much faster than the serial one')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp, \
+            RunPodStandIn(seconds_per_page=args.seconds_per_page, scale=args.scale,
+                          bandwidth=args.bandwidth) as standin:
+        input_dir = Path(tmp) / "content_page"
+        make_pages(input_dir, args.pages, args.page_size)
+
+        serial = run_once(standin, input_dir, Path(tmp) / "serial", args, 1)
+        pipelined = run_once(standin, input_dir, Path(tmp) / "pipelined", args, args.max_concurrent_shards)
+
+    speedup = serial / pipelined if pipelined else 0.0
+    print(f"\n{args.pages} pages: serial {serial:.2f} s, pipelined {pipelined:.2f} s "
+          f"({args.pages / pipelined:.1f} pages/s), speedup {speedup:.2f}x")
+    if speedup < args.min_speedup:
+        print(f"❌ Speedup below {args.min_speedup:.2f}x: upload, upscale and download are not overlapping")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
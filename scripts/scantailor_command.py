@@ -7,10 +7,16 @@ common errors and provides a more user-friendly interface.
 
 import os
 import argparse
-import subprocess
 import logging
 import sys
 
+from tqdm import tqdm
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'python', 'src')))
+
+from book_automation.scantailor.scantailor_process import ScanTailorProcess, ScanTailorStalled
+from book_automation.scantailor.scantailor_service import IMAGE_EXTENSIONS
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -34,6 +40,10 @@ def main():
                         help='TIFF compression')
     parser.add_argument('--force-color', action='store_true', 
                         help='Force RGB color space')
+    parser.add_argument('--stall-timeout', type=float, default=600,
+                        help='Kill ScanTailor when no page finishes for this many seconds')
+    parser.add_argument('--retries', type=int, default=1,
+                        help='Times to restart ScanTailor after a stall')
     
     args = parser.parse_args()
     
@@ -52,18 +62,30 @@ def main():
     logger.info(f"Running command: {cmd_str}")
     print(f"\nCommand:\n{cmd_str}\n")
     
-    # Run the command
-    try:
-        result = subprocess.run(cmd, check=True, text=True, capture_output=True)
+    # Run the command, streaming its output and page progress as it goes
+    pages = sorted(f for f in os.listdir(args.input_dir) if os.path.splitext(f)[1].lower() in IMAGE_EXTENSIONS)
+    for attempt in range(args.retries + 1):
+        with tqdm(total=len(pages), desc="ScanTailor", unit="page") as progress:
+            process = ScanTailorProcess(
+                cmd, pages, args.output_dir,
+                stall_timeout=args.stall_timeout,
+                on_event=lambda event: progress.update(1) if event.event == "done" else None,
+                on_line=progress.write)
+            try:
+                returncode = process.run()
+            except ScanTailorStalled as e:
+                logger.error(f"ScanTailor stalled (attempt {attempt + 1}): {e}")
+                continue
+
+        if returncode != 0:
+            logger.error(f"ScanTailor processing failed with exit code {returncode}")
+            logger.error("Error output:\n" + "\n".join(process.tail))
+            return 1
         logger.info("ScanTailor processing completed successfully")
-        print(result.stdout)
         return 0
-    except subprocess.CalledProcessError as e:
-        logger.error(f"ScanTailor processing failed: {e}")
-        logger.error(f"Error output: {e.stderr}")
-        print(f"Error: {e}")
-        print(e.stderr)
-        return 1
+
+    logger.error(f"ScanTailor stalled {args.retries + 1} times; giving up")
+    return 1
 
 def build_scantailor_command(args):
     """Build the ScanTailor command from the provided arguments."""
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Replay sequence-aware sorting on books that were already fully classified, to measure how
+many classifier calls SequenceImageSorter would have saved and how often its labels differ
+from the page-by-page result. No API calls are made: the existing labels act as the
+classifier. Each --sorted-dir is a book's ``sorted`` folder, either with an index.jsonl or
+with pages moved into per-type subfolders.
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'python', 'src')))
+
+from book_automation.records.page_type import PageType
+from book_automation.sorter.classifier.page_features import PageFeatureExtractor
+from book_automation.sorter.sequence_labeler import SequenceLabeler
+from book_automation.sorter.sort_index import SortIndex, INDEX_FILENAME
+
+IMAGE_SUFFIXES = {'.png', '.jpg', '.jpeg', '.tif', '.tiff', '.bmp'}
+
+
+def load_labels(sorted_dir: Path):
+    index_path = sorted_dir / INDEX_FILENAME
+    if index_path.exists():
+        entries = SortIndex(index_path).entries()
+    else:
+        entries = {
+            p: page_type
+            for page_type in PageType
+            for p in (sorted_dir / page_type.value).glob("*")
+            if p.suffix.lower() in IMAGE_SUFFIXES
+        }
+    # Page names carry the reading order
+    return sorted(entries.items(), key=lambda item: item[0].name)
+
+
+def page_signal(path: Path) -> np.ndarray:
+    with Image.open(path) as img:
+        return PageFeatureExtractor.summary(PageFeatureExtractor().extract(img))
+
+
+def replay(sorted_dir: Path, labeler: SequenceLabeler, jobs: int):
+    pages = load_labels(sorted_dir)
+    truth = [page_type for _, page_type in pages]
+
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        signals = np.stack(list(executor.map(page_signal, [p for p, _ in pages], chunksize=16)))
+
+    async def oracle(index: int) -> PageType:
+        return truth[index]
+
+    labels, report = asyncio.run(labeler.label(signals, oracle))
+    mismatches = sum(1 for predicted, actual in zip(labels, truth) if predicted != actual)
+    return report, mismatches
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Report classifier calls saved by sequence-aware sorting')
+    parser.add_argument('--sorted-dir', action='append', required=True, help='A sorted book folder (repeatable)')
+    parser.add_argument('--sample-every', type=int, default=8, help='Probe spacing inside uniform runs')
+    parser.add_argument('--boundary-factor', type=float, default=3.0,
+                        help='Signal jump, in multiples of the median, that starts a new run')
+    parser.add_argument('--jobs', type=int, default=os.cpu_count(), help='Feature extraction processes')
+    args = parser.parse_args()
+
+    labeler = SequenceLabeler(sample_every=args.sample_every, boundary_factor=args.boundary_factor)
+
+    total_pages = total_calls = total_mismatches = 0
+    print(f"{'book':40} {'pages':>6} {'runs':>5} {'calls':>6} {'saved':>6} {'wrong':>6}")
+    for sorted_dir in args.sorted_dir:
+        report, mismatches = replay(Path(sorted_dir), labeler, args.jobs)
+        book = Path(sorted_dir).absolute().parent.name
+        print(f"{book[:40]:40} {report.pages:6d} {report.segments:5d} {report.api_calls:6d} "
+              f"{report.saved_calls:6d} {mismatches:6d}")
+        total_pages += report.pages
+        total_calls += report.api_calls
+        total_mismatches += mismatches
+
+    if total_pages:
+        print(f"\nTotal: {total_calls}/{total_pages} calls ({1 - total_calls / total_pages:.0%} saved), "
+              f"{total_mismatches} pages labelled differently from the full sort")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Train the CPU-only LocalPageTypeClassifier from books that were already sorted by
+GPTVisionPageTypeClassifier. Each --sorted-dir is a book's ``sorted`` folder whose
+subfolders are named after PageType values (blank_page, content_page, title_page).
+"""
+
+import argparse
+import logging
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'python', 'src')))
+
+from book_automation.records.page_type import PageType
+from book_automation.sorter.classifier.local_page_type_classifier import LocalPageTypeClassifier
+from book_automation.sorter.classifier.page_features import PageFeatureExtractor
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+IMAGE_SUFFIXES = {'.png', '.jpg', '.jpeg', '.tif', '.tiff', '.bmp'}
+
+
+def extract_features(path: Path) -> np.ndarray:
+    with Image.open(path) as img:
+        return PageFeatureExtractor().extract(img)
+
+
+def collect_labelled_pages(sorted_dirs, max_per_class):
+    types = []
+    paths = []
+    labels = []
+
+    for page_type in PageType:
+        class_paths = sorted(
+            p for sorted_dir in sorted_dirs
+            for p in (Path(sorted_dir) / page_type.value).glob("*")
+            if p.suffix.lower() in IMAGE_SUFFIXES
+        )
+        if not class_paths:
+            continue
+        if max_per_class and len(class_paths) > max_per_class:
+            rng = np.random.default_rng(0)
+            class_paths = [class_paths[i] for i in sorted(rng.choice(len(class_paths), max_per_class, replace=False))]
+
+        logger.info(f"{page_type.value}: {len(class_paths)} pages")
+        labels.extend([len(types)] * len(class_paths))
+        paths.extend(class_paths)
+        types.append(page_type)
+
+    return types, paths, np.array(labels)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Train the local page-type classifier from GPT-sorted books')
+    parser.add_argument('--sorted-dir', action='append', required=True,
+                        help='A book\'s sorted folder (repeatable)')
+    parser.add_argument('--output', required=True, help='Path of the .npz model to write')
+    parser.add_argument('--max-per-class', type=int, default=5000, help='Cap on pages sampled per type')
+    parser.add_argument('--validation-split', type=float, default=0.2, help='Fraction held out for evaluation')
+    parser.add_argument('--jobs', type=int, default=os.cpu_count(), help='Feature extraction processes')
+    args = parser.parse_args()
+
+    types, paths, labels = collect_labelled_pages(args.sorted_dir, args.max_per_class)
+    if len(types) < 2:
+        logger.error("Need pages for at least two page types to train")
+        return 1
+
+    with ProcessPoolExecutor(max_workers=args.jobs) as executor:
+        features = np.stack(list(executor.map(extract_features, paths, chunksize=16)))
+
+    order = np.random.default_rng(0).permutation(len(labels))
+    n_validation = int(len(order) * args.validation_split)
+    validation, training = order[:n_validation], order[n_validation:]
+
+    classifier = LocalPageTypeClassifier.train(types, features[training], labels[training])
+
+    if n_validation:
+        probabilities = classifier.predict_proba(features[validation])
+        predicted = probabilities.argmax(axis=1)
+        confidence = probabilities.max(axis=1)
+        accuracy = (predicted == labels[validation]).mean()
+        logger.info(f"Validation accuracy: {accuracy:.3f} on {n_validation} pages")
+        for threshold in (0.8, 0.9, 0.95, 0.99):
+            confident = confidence >= threshold
+            if confident.any():
+                confident_accuracy = (predicted[confident] == labels[validation][confident]).mean()
+                logger.info(f"  confidence >= {threshold}: {confident.mean():.1%} of pages handled locally, "
+                            f"accuracy {confident_accuracy:.3f}")
+
+    classifier = LocalPageTypeClassifier.train(types, features, labels)
+    classifier.save(args.output)
+    logger.info(f"Model written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())